@@ -0,0 +1,433 @@
+"""
+Stand-in Kubernetes API server for the benchmarks.
+
+Serves a synthetic cluster of a given number of pods (plus the nodes,
+namespaces, deployments, replicasets, services, events and metrics.k8s.io
+objects that go with them) with the parts of the API the OKE MCP server uses:
+LIST with label/field selectors and pagination, GET, PATCH and DELETE of
+single objects, server-side printed Tables, pod logs and WATCH (a bookmark,
+then an idle stream). The cluster is generated from a fixed seed, so every run
+sees the same data. Full list responses are serialized once and reused, so the
+fake server stays cheap next to the server being measured.
+
+    python fake_apiserver.py --pods 1000 --port 0
+
+prints "listening on http://127.0.0.1:<port>" once it accepts requests.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PODS_PER_DEPLOYMENT = 5
+PODS_PER_NODE = 30
+PODS_PER_NAMESPACE = 200
+UNHEALTHY_SHARE = 0.1
+APP_KINDS = ("web", "api", "nginx", "worker", "cache")
+POD_TEMPLATE_HASH = "5d8f7c9b6"
+CREATED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# plural -> (api group path, kind, namespaced)
+RESOURCES = {
+    "pods": ("/api/v1", "Pod", True),
+    "services": ("/api/v1", "Service", True),
+    "events": ("/api/v1", "Event", True),
+    "nodes": ("/api/v1", "Node", False),
+    "namespaces": ("/api/v1", "Namespace", False),
+    "persistentvolumeclaims": ("/api/v1", "PersistentVolumeClaim", True),
+    "deployments": ("/apis/apps/v1", "Deployment", True),
+    "replicasets": ("/apis/apps/v1", "ReplicaSet", True),
+    "nodemetrics": ("/apis/metrics.k8s.io/v1beta1", "NodeMetrics", False),
+    "podmetrics": ("/apis/metrics.k8s.io/v1beta1", "PodMetrics", True),
+}
+_PATH = re.compile(
+    r"^(?P<prefix>/api/v1|/apis/[^/]+/[^/]+)(?:/namespaces/(?P<namespace>[^/]+))?"
+    r"/(?P<plural>[^/]+)(?:/(?P<name>[^/]+))?(?:/(?P<subresource>[^/]+))?$"
+)
+
+
+def timestamp(offset_seconds: int = 0) -> str:
+    return (CREATED + timedelta(seconds=offset_seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def deployment_name(index: int) -> str:
+    return f"{APP_KINDS[index % len(APP_KINDS)]}-{index:04d}"
+
+
+def pod_name(deployment_index: int, replica: int) -> str:
+    return f"{deployment_name(deployment_index)}-{POD_TEMPLATE_HASH}-{replica:02d}"
+
+
+def metadata(name: str, namespace: str | None = None, serial: int = 0, **extra) -> dict:
+    meta = {
+        "name": name,
+        "uid": f"00000000-0000-4000-8000-{serial:012d}",
+        "resourceVersion": str(1000 + serial),
+        "creationTimestamp": timestamp(serial),
+    }
+    if namespace is not None:
+        meta["namespace"] = namespace
+    meta.update(extra)
+    return meta
+
+
+def build_cluster(pod_count: int, seed: int = 7) -> dict:
+    """
+    Returns {plural: [objects]} for a cluster with pod_count pods.
+    """
+    rng = random.Random(seed)
+    serial = iter(range(1, 10 ** 9))
+    namespaces = ["default"] + [f"team-{index:03d}" for index in range(pod_count // PODS_PER_NAMESPACE)]
+    nodes = [f"10.0.{index // 250}.{index % 250 + 2}" for index in range(max(1, pod_count // PODS_PER_NODE))]
+    cluster = {plural: [] for plural in RESOURCES}
+
+    cluster["namespaces"] = [
+        {"metadata": metadata(name, serial=next(serial)), "status": {"phase": "Active"}} for name in namespaces
+    ]
+    for name in nodes:
+        cluster["nodes"].append({
+            "metadata": metadata(name, serial=next(serial), labels={
+                "kubernetes.io/hostname": name, "node.kubernetes.io/instance-type": "VM.Standard.E4.Flex",
+            }),
+            "spec": {"providerID": f"ocid1.instance.oc1.eu-frankfurt-1.{name}"},
+            "status": {
+                "conditions": [
+                    {"type": "MemoryPressure", "status": "False"},
+                    {"type": "DiskPressure", "status": "False"},
+                    {"type": "PIDPressure", "status": "False"},
+                    {"type": "Ready", "status": "True"},
+                ],
+                "capacity": {"cpu": "4", "memory": "32Gi", "pods": "110"},
+                "allocatable": {"cpu": "3800m", "memory": "29Gi", "pods": "110"},
+                "nodeInfo": {"kubeletVersion": "v1.30.1", "osImage": "Oracle Linux Server 8.9"},
+            },
+        })
+        cluster["nodemetrics"].append({
+            "metadata": metadata(name, serial=next(serial)),
+            "timestamp": timestamp(), "window": "30s",
+            "usage": {"cpu": f"{rng.randint(200, 3500)}m", "memory": f"{rng.randint(2, 28)}Gi"},
+        })
+
+    deployment_count = max(1, -(-pod_count // PODS_PER_DEPLOYMENT))
+    for index in range(deployment_count):
+        name = deployment_name(index)
+        namespace = namespaces[index % len(namespaces)]
+        replicas = min(PODS_PER_DEPLOYMENT, pod_count - index * PODS_PER_DEPLOYMENT)
+        labels = {"app": name, "tier": APP_KINDS[index % len(APP_KINDS)]}
+        image = f"{'nginx' if labels['tier'] == 'nginx' else 'ocir.io/bench/' + labels['tier']}:1.{index % 7}"
+        template = {
+            "metadata": {"labels": labels},
+            "spec": {"containers": [{
+                "name": labels["tier"], "image": image,
+                "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+                "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"memory": "512Mi"}},
+            }]},
+        }
+        status = {
+            "observedGeneration": 1, "replicas": replicas, "updatedReplicas": replicas,
+            "readyReplicas": replicas, "availableReplicas": replicas,
+            "conditions": [{"type": "Available", "status": "True"},
+                           {"type": "Progressing", "status": "True", "reason": "NewReplicaSetAvailable"}],
+        }
+        cluster["deployments"].append({
+            "metadata": metadata(name, namespace, next(serial), generation=1, labels=labels,
+                                 annotations={"meta.helm.sh/release-name": "bench"} if index == 0 else {}),
+            "spec": {"replicas": replicas, "selector": {"matchLabels": labels}, "template": template},
+            "status": status,
+        })
+        replicaset = f"{name}-{POD_TEMPLATE_HASH}"
+        cluster["replicasets"].append({
+            "metadata": metadata(replicaset, namespace, next(serial), labels=labels, ownerReferences=[
+                {"kind": "Deployment", "name": name, "controller": True},
+            ]),
+            "spec": {"replicas": replicas, "template": template},
+            "status": {"replicas": replicas, "readyReplicas": replicas, "availableReplicas": replicas},
+        })
+        cluster["services"].append({
+            "metadata": metadata(name, namespace, next(serial), labels=labels),
+            "spec": {"type": "ClusterIP", "clusterIP": f"10.96.{index // 250}.{index % 250 + 1}",
+                     "selector": labels, "ports": [{"port": 80, "targetPort": 8080, "protocol": "TCP"}]},
+        })
+
+        for replica in range(replicas):
+            pod_serial = next(serial)
+            unhealthy = rng.random() < UNHEALTHY_SHARE
+            restarts = rng.randint(5, 40) if unhealthy else rng.randint(0, 1)
+            node = nodes[pod_serial % len(nodes)]
+            container_status = {
+                "name": labels["tier"], "image": image, "ready": not unhealthy, "restartCount": restarts,
+                "state": ({"waiting": {"reason": "CrashLoopBackOff", "message": "back-off restarting failed container"}}
+                          if unhealthy else {"running": {"startedAt": timestamp(pod_serial)}}),
+            }
+            name_of_pod = pod_name(index, replica)
+            cluster["pods"].append({
+                "metadata": metadata(name_of_pod, namespace, pod_serial,
+                                     labels=labels | {"pod-template-hash": POD_TEMPLATE_HASH},
+                                     ownerReferences=[{"kind": "ReplicaSet", "name": replicaset, "controller": True}]),
+                "spec": template["spec"] | {"nodeName": node, "restartPolicy": "Always"},
+                "status": {
+                    "phase": "Running",
+                    "hostIP": node,
+                    "podIP": f"10.244.{pod_serial // 250 % 250}.{pod_serial % 250 + 2}",
+                    "startTime": timestamp(pod_serial),
+                    "conditions": [
+                        {"type": "Initialized", "status": "True"},
+                        {"type": "Ready", "status": "False" if unhealthy else "True"},
+                        {"type": "ContainersReady", "status": "False" if unhealthy else "True"},
+                        {"type": "PodScheduled", "status": "True"},
+                    ],
+                    "containerStatuses": [container_status],
+                },
+            })
+            cluster["podmetrics"].append({
+                "metadata": metadata(name_of_pod, namespace, next(serial), labels=labels),
+                "timestamp": timestamp(), "window": "30s",
+                "containers": [{"name": labels["tier"], "usage": {
+                    "cpu": f"{rng.randint(1, 900)}m", "memory": f"{rng.randint(20, 480)}Mi",
+                }}],
+            })
+            if unhealthy or replica == 0:
+                reason, event_type, message = (
+                    ("BackOff", "Warning", "Back-off restarting failed container") if unhealthy
+                    else ("Pulled", "Normal", f'Container image "{image}" already present on machine')
+                )
+                cluster["events"].append({
+                    "metadata": metadata(f"{name_of_pod}.{pod_serial:x}", namespace, next(serial)),
+                    "involvedObject": {"kind": "Pod", "name": name_of_pod, "namespace": namespace},
+                    "reason": reason, "type": event_type, "message": message,
+                    "count": restarts or 1, "firstTimestamp": timestamp(pod_serial),
+                    "lastTimestamp": timestamp(pod_serial + 60),
+                    "source": {"component": "kubelet", "host": node},
+                })
+
+    for plural, objects in cluster.items():
+        prefix, kind, _ = RESOURCES[plural]
+        for obj in objects:
+            obj["apiVersion"] = prefix.removeprefix("/api/").removeprefix("/apis/")
+            obj["kind"] = kind
+    return cluster
+
+
+def field_value(obj: dict, path: str):
+    value = obj
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def matches(obj: dict, label_selector: str | None, field_selector: str | None) -> bool:
+    """
+    Equality-based selectors only: "a=b,c!=d".
+    """
+    labels = obj["metadata"].get("labels", {})
+    for requirement in filter(None, (label_selector or "").split(",")):
+        key, negated, value = re.match(r"([^!=]+)(!?=+)(.*)", requirement).groups()
+        if (labels.get(key.strip()) == value.strip()) == negated.startswith("!"):
+            return False
+    for requirement in filter(None, (field_selector or "").split(",")):
+        key, negated, value = re.match(r"([^!=]+)(!?=+)(.*)", requirement).groups()
+        if (str(field_value(obj, key.strip())) == value.strip()) == negated.startswith("!"):
+            return False
+    return True
+
+
+def table(plural: str, objects: list) -> dict:
+    """
+    A meta.k8s.io Table with the columns kubectl prints for the common kinds.
+    """
+    columns = [("Name", "name", 0)]
+    if plural == "pods":
+        columns += [("Ready", "", 0), ("Status", "", 0), ("Restarts", "", 0), ("Age", "date", 0),
+                    ("IP", "", 1), ("Node", "", 1)]
+    elif plural == "deployments":
+        columns += [("Ready", "", 0), ("Up-to-date", "", 0), ("Available", "", 0), ("Age", "date", 0)]
+    elif plural == "nodes":
+        columns += [("Status", "", 0), ("Age", "date", 0), ("Version", "", 0)]
+    else:
+        columns += [("Age", "date", 0)]
+    rows = []
+    for obj in objects:
+        meta, status = obj["metadata"], obj.get("status", {})
+        if plural == "pods":
+            statuses = status.get("containerStatuses", [])
+            waiting = next((s["state"]["waiting"]["reason"] for s in statuses if "waiting" in s["state"]), None)
+            cells = [meta["name"], f"{sum(s['ready'] for s in statuses)}/{len(statuses)}",
+                     waiting or status.get("phase"), sum(s["restartCount"] for s in statuses),
+                     meta["creationTimestamp"], status.get("podIP"), obj["spec"].get("nodeName")]
+        elif plural == "deployments":
+            cells = [meta["name"], f"{status.get('readyReplicas', 0)}/{obj['spec']['replicas']}",
+                     status.get("updatedReplicas", 0), status.get("availableReplicas", 0), meta["creationTimestamp"]]
+        elif plural == "nodes":
+            cells = [meta["name"], "Ready", meta["creationTimestamp"], status["nodeInfo"]["kubeletVersion"]]
+        else:
+            cells = [meta["name"], meta["creationTimestamp"]]
+        rows.append({"cells": cells, "object": {"kind": "PartialObjectMetadata", "metadata": {
+            key: meta[key] for key in ("name", "namespace") if key in meta
+        }}})
+    return {
+        "kind": "Table", "apiVersion": "meta.k8s.io/v1", "metadata": {},
+        "columnDefinitions": [
+            {"name": name, "type": "string", "format": fmt, "priority": priority}
+            for name, fmt, priority in columns
+        ],
+        "rows": rows,
+    }
+
+
+class FakeCluster:
+    def __init__(self, pod_count: int):
+        self.objects = build_cluster(pod_count)
+        self.by_name = {
+            (plural, obj["metadata"].get("namespace"), obj["metadata"]["name"]): obj
+            for plural, objects in self.objects.items() for obj in objects
+        }
+        self.resource_version = str(max(int(obj["metadata"]["resourceVersion"]) for _, _, obj in self._all()))
+        self._serialized: dict = {}
+        self._lock = threading.Lock()
+
+    def _all(self):
+        for plural, objects in self.objects.items():
+            for obj in objects:
+                yield plural, obj["metadata"].get("namespace"), obj
+
+    def select(self, plural: str, namespace: str | None) -> list:
+        objects = self.objects[plural]
+        if namespace is not None and RESOURCES[plural][2]:
+            objects = [obj for obj in objects if obj["metadata"].get("namespace") == namespace]
+        return objects
+
+    def list_bytes(self, plural: str, namespace: str | None) -> bytes:
+        """
+        The unfiltered LIST response, serialized once.
+        """
+        key = (plural, namespace)
+        with self._lock:
+            body = self._serialized.get(key)
+        if body is None:
+            body = json.dumps(self.list_response(plural, self.select(plural, namespace))).encode()
+            with self._lock:
+                self._serialized[key] = body
+        return body
+
+    def list_response(self, plural: str, items: list, continue_token: str | None = None) -> dict:
+        prefix, kind, _ = RESOURCES[plural]
+        meta = {"resourceVersion": self.resource_version}
+        if continue_token:
+            meta["continue"] = continue_token
+        return {"apiVersion": prefix.removeprefix("/api/").removeprefix("/apis/"), "kind": f"{kind}List",
+                "metadata": meta, "items": items}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cluster: FakeCluster = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, code: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, code: int, obj: dict):
+        self.send_body(code, json.dumps(obj).encode())
+
+    def not_found(self, what: str):
+        self.send_json(404, {"kind": "Status", "status": "Failure", "reason": "NotFound",
+                             "message": f"{what} not found", "code": 404})
+
+    def route(self):
+        url = urlparse(self.path)
+        match = _PATH.match(url.path)
+        if match is None:
+            return None, None, None, None, None, parse_qs(url.query)
+        prefix, namespace, plural, name, subresource = match.groups()
+        if prefix.startswith("/apis/metrics.k8s.io"):
+            plural = {"nodes": "nodemetrics", "pods": "podmetrics"}.get(plural, plural)
+        if plural not in RESOURCES:
+            plural = None
+        return prefix, namespace, plural, name, subresource, {k: v[0] for k, v in parse_qs(url.query).items()}
+
+    def do_GET(self):
+        _, namespace, plural, name, subresource, query = self.route()
+        if plural is None:
+            return self.not_found(self.path)
+        if query.get("watch") == "true":
+            return self.watch(query)
+        if name is not None:
+            obj = self.cluster.by_name.get((plural, namespace if RESOURCES[plural][2] else None, name))
+            if obj is None:
+                return self.not_found(f'{plural} "{name}"')
+            if subresource == "log":
+                lines = int(query.get("tailLines", 1000))
+                body = "".join(f"{timestamp(i)} INFO request served path=/api/v1/items/{i} status=200 "
+                               f"duration_ms={i % 97}\n" for i in range(lines)).encode()
+                return self.send_body(200, body, "text/plain")
+            if "as=Table" in (self.headers.get("Accept") or ""):
+                return self.send_json(200, table(plural, [obj]))
+            return self.send_json(200, obj)
+
+        as_table = "as=Table" in (self.headers.get("Accept") or "")
+        selectors = query.get("labelSelector"), query.get("fieldSelector")
+        limit = int(query.get("limit") or 0)
+        if not any(selectors) and not limit and not as_table:
+            return self.send_body(200, self.cluster.list_bytes(plural, namespace))
+        items = [obj for obj in self.cluster.select(plural, namespace) if matches(obj, *selectors)]
+        if as_table:
+            return self.send_json(200, table(plural, items))
+        offset = int(query.get("continue") or 0)
+        page = items[offset:offset + limit] if limit else items[offset:]
+        next_offset = offset + len(page)
+        token = str(next_offset) if limit and next_offset < len(items) else None
+        self.send_json(200, self.cluster.list_response(plural, page, token))
+
+    def watch(self, query: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        bookmark = {"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": self.cluster.resource_version}}}
+        self.wfile.write((json.dumps(bookmark) + "\n").encode())
+        self.wfile.flush()
+        time.sleep(min(float(query.get("timeoutSeconds", 60)), 60))
+        self.close_connection = True
+
+    def do_PATCH(self):
+        _, namespace, plural, name, _, _ = self.route()
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        obj = self.cluster.by_name.get((plural, namespace if plural and RESOURCES[plural][2] else None, name))
+        if obj is None:
+            return self.not_found(f'{plural} "{name}"')
+        self.send_json(200, obj)
+
+    def do_DELETE(self):
+        _, namespace, plural, name, _, _ = self.route()
+        if (plural, namespace, name) not in self.cluster.by_name:
+            return self.not_found(f'{plural} "{name}"')
+        self.send_json(200, {"kind": "Status", "apiVersion": "v1", "status": "Success"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pods", type=int, default=1000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    Handler.cluster = FakeCluster(args.pods)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
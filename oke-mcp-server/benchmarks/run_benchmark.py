@@ -0,0 +1,381 @@
+"""
+Benchmark harness for the OKE MCP server.
+
+For each cluster size, starts fake_apiserver.py with that many pods, launches
+oracle_kubernetes_server.py over stdio against it (with the stub kubectl and
+helm from stubs/ first on PATH) and drives every tool through the MCP
+protocol, the way an agent would. Each scenario gets a warm-up call, then
+--iterations calls issued --concurrency at a time. Per tool it reports latency
+percentiles, throughput, response bytes, errors and the server's resident
+memory, and writes everything as JSON so runs can be compared across commits:
+
+    python benchmarks/run_benchmark.py --sizes 10,1000,10000 --output before.json
+    python benchmarks/run_benchmark.py --sizes 10,1000,10000 --output after.json
+    python benchmarks/run_benchmark.py --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from fake_apiserver import deployment_name, pod_name
+
+BENCH_DIR = Path(__file__).resolve().parent
+SERVER_DIR = BENCH_DIR.parent
+SERVER_SCRIPT = "oracle_kubernetes_server.py"
+KUBECONFIG = """apiVersion: v1
+kind: Config
+current-context: bench
+clusters:
+- name: bench
+  cluster: {{server: "{url}"}}
+contexts:
+- name: bench
+  context: {{cluster: bench, user: bench}}
+users:
+- name: bench
+  user: {{token: bench}}
+"""
+
+
+def scenarios() -> list:
+    """
+    (label, tool, arguments) in the order they run. Labels tell variants of
+    one tool apart. Mutating tools use dry runs or the stubs, and port_forward
+    runs before the tools that list and stop its sessions.
+    """
+    pod, deployment = pod_name(0, 0), deployment_name(0)
+    release = {"chart": "bench/app", "wait_seconds": 10}
+    return [
+        ("ping", "ping", {}),
+        ("get_nodes", "get_nodes", {}),
+        ("get_nodes[summary]", "get_nodes", {"format": "summary"}),
+        ("get_all_pods", "get_all_pods", {}),
+        ("get_all_pods[summary]", "get_all_pods", {"format": "summary"}),
+        ("get_all_pods[fields]", "get_all_pods", {"fields": "metadata.name,status.phase", "limit": 500}),
+        ("get_all_pods[selector]", "get_all_pods", {"label_selector": f"app={deployment}"}),
+        ("get_all_services", "get_all_services", {}),
+        ("describe_nodes", "describe_nodes", {}),
+        ("describe_nodes[summary]", "describe_nodes", {"format": "summary"}),
+        ("describe_pods", "describe_pods", {}),
+        ("describe_pods[summary]", "describe_pods", {"format": "summary"}),
+        ("get_events", "get_events", {}),
+        ("get_events[fields]", "get_events", {"fields": "involvedObject.name,reason,count"}),
+        ("get_events[aggregate]", "get_events", {"namespace": None, "format": "aggregate"}),
+        ("get_node_metrics", "get_node_metrics", {}),
+        ("get_node_metrics[uncached]", "get_node_metrics", {"cache_bypass": True}),
+        ("get_pod_metrics", "get_pod_metrics", {}),
+        ("get_pod_metrics[uncached]", "get_pod_metrics", {"cache_bypass": True}),
+        ("get_node_metrics_stats", "get_node_metrics_stats", {"window": "5m"}),
+        ("get_pod_metrics_stats", "get_pod_metrics_stats", {"window": "5m"}),
+        ("kubectl_context", "kubectl_context", {}),
+        ("kubectl_context[all]", "kubectl_context", {"all_contexts": True, "cache_bypass": True}),
+        ("explain_resource", "explain_resource", {"resource": "pods"}),
+        ("list_api_resources", "list_api_resources", {"cache_bypass": True}),
+        ("kubectl_generic[get]", "kubectl_generic", {"args": "get pods -A"}),
+        ("kubectl_generic[json]", "kubectl_generic", {"args": "get deployments -n default -o json"}),
+        ("kubectl_generic[describe]", "kubectl_generic", {"args": f"describe pod {pod}"}),
+        ("kubectl_generic[kubectl]", "kubectl_generic", {"args": "api-resources"}),
+        ("pod_logs", "pod_logs", {"pod": pod, "tail_lines": 1000}),
+        ("exec_in_pod", "exec_in_pod", {"pod": pod, "command": "echo ok"}),
+        ("kubectl_rollout", "kubectl_rollout", {"deployment": deployment, "wait_seconds": 5}),
+        ("rollout_status", "rollout_status", {}),
+        ("scale_deployment", "scale_deployment", {"deployment_name": deployment, "replicas": 5}),
+        ("restart_unhealthy_pod", "restart_unhealthy_pod", {"pod_name": pod}),
+        ("restart_unhealthy_pods", "restart_unhealthy_pods", {"namespace": None, "dry_run": True}),
+        ("update_deployments_from_config", "update_deployments_from_config", {"dry_run": True}),
+        ("install_helm_chart", "install_helm_chart", {"release": "bench"} | release),
+        ("upgrade_helm_chart", "upgrade_helm_chart", {"release": "bench"} | release),
+        ("helm_batch", "helm_batch", {
+            "releases": [{"release": f"bench-{index}", "chart": "bench/app"} for index in range(5)],
+            "wait_seconds": 10,
+        }),
+        ("helm_job_status", "helm_job_status", {}),
+        ("uninstall_helm_chart", "uninstall_helm_chart", {"release": "bench", "wait_seconds": 10}),
+        ("port_forward", "port_forward", {"pod": pod, "local_port": 0, "remote_port": 8080}),
+        ("list_port_forwards", "list_port_forwards", {}),
+        ("stop_port_forward", "stop_port_forward", {}),
+        ("server_stats", "server_stats", {}),
+    ]
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: list, sizes: list, errors: list, wall_seconds: float, memory: dict) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "errors": len(errors),
+        "error_sample": errors[0] if errors else None,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50), 2),
+            "p95": round(percentile(ordered, 95), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        },
+        "throughput_per_s": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "response_bytes": {
+            "mean": round(sum(sizes) / len(sizes)) if sizes else 0,
+            "max": max(sizes, default=0),
+        },
+        "memory_kb": memory,
+    }
+
+
+def find_server_pid() -> int | None:
+    """
+    The MCP server is a child of this process (stdio_client spawns it); find
+    it in /proc by its command line. Returns None where /proc is unavailable.
+    """
+    parent = str(os.getpid())
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in filter(str.isdigit, entries):
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = f.read().rsplit(")", 1)[1].split()[1]
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if ppid == parent and SERVER_SCRIPT.encode() in cmdline:
+            return int(entry)
+    return None
+
+
+def read_memory(pid: int | None) -> dict:
+    """
+    Current (VmRSS) and peak (VmHWM) resident memory of a process in kB.
+    """
+    memory = {"rss": None, "peak_rss": None}
+    if pid is None:
+        return memory
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "VmRSS":
+                    memory["rss"] = int(value.split()[0])
+                elif key == "VmHWM":
+                    memory["peak_rss"] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+def result_size_and_error(result) -> tuple:
+    """
+    Returns (response bytes, error message or None) of a CallToolResult.
+    """
+    text = "".join(block.text for block in result.content if getattr(block, "type", None) == "text")
+    envelope = result.structuredContent or {}
+    if result.isError or envelope.get("status") == "error":
+        error = envelope.get("error") or text
+        return len(text.encode()), error if isinstance(error, str) else json.dumps(error)
+    return len(text.encode()), None
+
+
+async def run_scenario(session: ClientSession, tool: str, arguments: dict,
+                       iterations: int, concurrency: int, server_pid: int | None) -> dict:
+    latencies, sizes, errors = [], [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with gate:
+            started = time.perf_counter()
+            result = await session.call_tool(tool, arguments)
+            latencies.append((time.perf_counter() - started) * 1000)
+            size, error = result_size_and_error(result)
+            sizes.append(size)
+            if error is not None:
+                errors.append(error[:500])
+
+    await session.call_tool(tool, arguments)  # warm-up: caches, pooled connections, imports
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(iterations)))
+    return summarize(latencies, sizes, errors, time.perf_counter() - started, read_memory(server_pid))
+
+
+async def start_api_server(pods: int) -> tuple:
+    """
+    Starts fake_apiserver.py and returns (process, base URL) once it listens.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(BENCH_DIR / "fake_apiserver.py"), "--pods", str(pods), "--port", "0",
+        stdout=asyncio.subprocess.PIPE,
+    )
+    line = (await asyncio.wait_for(process.stdout.readline(), 300)).decode()
+    if not line.startswith("listening on "):
+        process.kill()
+        raise RuntimeError(f"fake API server did not start: {line!r}")
+    return process, line.split()[-1]
+
+
+async def bench_size(pods: int, args, selected: list) -> dict:
+    api, url = await start_api_server(pods)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            kubeconfig = Path(tmp) / "kubeconfig"
+            kubeconfig.write_text(KUBECONFIG.format(url=url))
+            env = os.environ | {
+                "KUBECONFIG": str(kubeconfig),
+                "PATH": f"{BENCH_DIR / 'stubs'}{os.pathsep}{os.environ.get('PATH', '')}",
+                "BENCH_API_URL": url,
+                "BENCH_HELM_SECONDS": str(args.helm_seconds),
+                "OKE_MCP_BACKEND": args.backend,
+                "OKE_MCP_WATCH_CACHE": "1" if args.watch_cache else "0",
+                "OKE_MCP_METRICS_INTERVAL": str(args.sampler_interval),
+                "OKE_MCP_ROLLOUT_POLL": "0.5",
+            }
+            params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT],
+                                           env=env, cwd=str(SERVER_DIR))
+            async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = {tool.name for tool in (await session.list_tools()).tools}
+                    server_pid = find_server_pid()
+                    if args.sampler_interval > 0:
+                        # Give the metrics sampler a few scrapes for the *_stats tools.
+                        await asyncio.sleep(args.sampler_interval * 2)
+
+                    results = {}
+                    for label, tool, arguments in selected:
+                        if tool not in tools:
+                            continue
+                        print(f"  [{pods} pods] {label}", file=sys.stderr, flush=True)
+                        results[label] = await run_scenario(
+                            session, tool, arguments, args.iterations, args.concurrency, server_pid
+                        )
+                    stats = await session.call_tool("server_stats", {})
+                    return {
+                        "pods": pods,
+                        "tools": results,
+                        "uncovered_tools": sorted(tools - {tool for _, tool, _ in scenarios()}),
+                        "server_memory_kb": read_memory(server_pid),
+                        "server_stats": (stats.structuredContent or {}).get("data"),
+                    }
+    finally:
+        api.kill()
+        await api.wait()
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    selected = [scenario for scenario in scenarios()
+                if not args.tools or scenario[0] in args.tools or scenario[1] in args.tools]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "backend": args.backend,
+            "watch_cache": args.watch_cache,
+        },
+        "sizes": {},
+    }
+    for pods in args.sizes:
+        report["sizes"][str(pods)] = await bench_size(pods, args, selected)
+    return report
+
+
+def print_report(report: dict):
+    for pods, size in report["sizes"].items():
+        print(f"\n{pods} pods (peak RSS {size['server_memory_kb']['peak_rss']} kB)")
+        print(f"  {'scenario':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>9} {'bytes':>10} {'err':>4}")
+        for label, result in size["tools"].items():
+            latency = result["latency_ms"]
+            print(f"  {label:<32} {latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} "
+                  f"{result['throughput_per_s']:>9} {result['response_bytes']['mean']:>10} {result['errors']:>4}")
+        if size["uncovered_tools"]:
+            print(f"  no scenario for: {', '.join(size['uncovered_tools'])}")
+
+
+def compare(base_path: str, new_path: str):
+    """
+    Prints p50/p95 and mean response size of two reports side by side.
+    """
+    base, new = (json.loads(Path(path).read_text()) for path in (base_path, new_path))
+    print(f"base {base['meta']['commit']} -> new {new['meta']['commit']}")
+    for pods, size in new["sizes"].items():
+        before = base["sizes"].get(pods, {}).get("tools", {})
+        print(f"\n{pods} pods")
+        print(f"  {'scenario':<32} {'p50 ms':>17} {'p95 ms':>17} {'bytes':>21}")
+        for label, result in size["tools"].items():
+            if label not in before:
+                continue
+            cells = []
+            for old_value, new_value in (
+                (before[label]["latency_ms"]["p50"], result["latency_ms"]["p50"]),
+                (before[label]["latency_ms"]["p95"], result["latency_ms"]["p95"]),
+                (before[label]["response_bytes"]["mean"], result["response_bytes"]["mean"]),
+            ):
+                ratio = f"x{new_value / old_value:.2f}" if old_value else "-"
+                cells.append(f"{new_value:>10} {ratio:>6}")
+            print(f"  {label:<32} {cells[0]:>17} {cells[1]:>17} {cells[2]:>21}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OKE MCP server against a fake Kubernetes API.")
+    parser.add_argument("--sizes", default="10,1000,10000",
+                        help="comma-separated pod counts of the synthetic clusters")
+    parser.add_argument("--concurrency", type=int, default=4, help="calls in flight per scenario")
+    parser.add_argument("--iterations", type=int, default=20, help="measured calls per scenario")
+    parser.add_argument("--tools", default="",
+                        help="comma-separated tool names or scenario labels to run (default: all)")
+    parser.add_argument("--backend", choices=("api", "kubectl"), default="api",
+                        help="OKE_MCP_BACKEND of the server under test")
+    parser.add_argument("--watch-cache", action="store_true", help="enable OKE_MCP_WATCH_CACHE")
+    parser.add_argument("--sampler-interval", type=float, default=1.0,
+                        help="OKE_MCP_METRICS_INTERVAL of the server; 0 disables the metrics sampler")
+    parser.add_argument("--helm-seconds", type=float, default=0.2, help="how long each stub helm call takes")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two JSON reports instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.tools = set(filter(None, args.tools.split(",")))
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Deployment image rules for update_deployments_from_config.
+
+Rules are loaded from a YAML or JSON file (OKE_MCP_DEPLOYMENT_CONFIG, default
+deployment_config.yaml next to this module) and reloaded automatically when the
+file changes. All keywords are compiled into one Aho-Corasick automaton, so
+matching a deployment name costs O(len(name)) no matter how many rules exist.
+
+File format, either the legacy flat mapping:
+
+    nginx: ams.ocir.io/oabcs1/vivesisi/nginx:latest
+
+or a list of rules with optional targeting:
+
+    rules:
+      - keyword: nginx
+        image: ams.ocir.io/oabcs1/vivesisi/nginx:latest
+        namespaces: [web, staging]   # default: all namespaces
+        containers: [nginx]          # default: first container, "*" for all
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = os.environ.get(
+    "OKE_MCP_DEPLOYMENT_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "deployment_config.yaml"),
+)
+RELOAD_CHECK_SECONDS = 1.0
+
+
+class Rule(NamedTuple):
+    keyword: str
+    image: str
+    namespaces: frozenset | None = None
+    containers: tuple | None = None
+
+    def select_containers(self, containers: list) -> list:
+        """
+        Returns the containers this rule updates: the first one by default,
+        all of them for "*", or those named in the rule.
+        """
+        if self.containers is None:
+            return containers[:1]
+        if "*" in self.containers:
+            return containers
+        return [container for container in containers if container["name"] in self.containers]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lower-cased keywords; search() reports the
+    index of every keyword occurring in a text in a single pass.
+    """
+
+    def __init__(self, keywords: list):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword.lower():
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._out[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def search(self, text: str) -> list:
+        state = 0
+        found = []
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found.extend(self._out[state])
+        return found
+
+
+class DeploymentConfig:
+    """
+    Compiled rule set. Earlier rules win when several keywords match.
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self._automaton = KeywordAutomaton([rule.keyword for rule in rules])
+
+    def match(self, name: str, namespace: str) -> Rule | None:
+        for index in sorted(set(self._automaton.search(name))):
+            rule = self.rules[index]
+            if rule.namespaces is None or namespace in rule.namespaces:
+                return rule
+        return None
+
+
+def parse_rules(data) -> list:
+    """
+    Builds rules from the legacy {keyword: image} mapping or a {"rules": [...]} document.
+    """
+    if not data:
+        return []
+    if "rules" not in data:
+        data = {"rules": [{"keyword": keyword, "image": image} for keyword, image in data.items()]}
+    rules = []
+    for entry in data["rules"]:
+        if not entry.get("keyword") or not entry.get("image"):
+            raise ValueError(f"Rule needs a non-empty keyword and image: {entry}")
+        namespaces = entry.get("namespaces")
+        containers = entry.get("containers")
+        rules.append(Rule(
+            keyword=str(entry["keyword"]),
+            image=str(entry["image"]),
+            namespaces=frozenset(namespaces) if namespaces else None,
+            containers=tuple(containers) if containers else None,
+        ))
+    return rules
+
+
+def load_config(path: str) -> DeploymentConfig:
+    with open(path) as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        else:
+            data = yaml.safe_load(f)
+    return DeploymentConfig(parse_rules(data))
+
+
+class ConfigWatcher:
+    """
+    Serves the compiled config, re-reading the file whenever its mtime changes.
+    A broken edit is logged and the last good config keeps being served.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+        self._config = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> DeploymentConfig:
+        with self._lock:
+            now = time.monotonic()
+            if self._config is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+                return self._config
+            self._checked_at = now
+            mtime = None
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    self._config = load_config(self.path)
+                    self._mtime = mtime
+                    logger.info("Loaded %d deployment rules from %s", len(self._config.rules), self.path)
+            except (OSError, ValueError, TypeError, KeyError, yaml.YAMLError) as e:
+                # Without a good config every call retries and raises, rather than returning None.
+                if self._config is None:
+                    raise
+                # Skip this broken version until the file changes again.
+                self._mtime = mtime
+                logger.warning("Keeping previous deployment config, failed to reload %s: %s", self.path, e)
+            return self._config
+
+
+config_watcher = ConfigWatcher()
@@ -0,0 +1,109 @@
+"""
+Batch engine behind update_deployments_from_config.
+
+The full diff is computed up front from a single LIST of deployments, then one
+merged strategic patch per deployment (new images plus the restartedAt
+annotation that `kubectl rollout restart` would set) is applied by a bounded
+pool of workers, rate limited per namespace.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+RESTARTED_AT_ANNOTATION = "kubectl.kubernetes.io/restartedAt"
+
+
+def plan_updates(deployments: list, config) -> list:
+    """
+    Matches each deployment against the compiled rules (first matching keyword
+    wins) and returns one plan entry per matched deployment, listing the
+    targeted containers whose image differs from the rule's image.
+    """
+    plan = []
+    for item in deployments:
+        name = item["metadata"]["name"]
+        namespace = item["metadata"]["namespace"]
+        rule = config.match(name, namespace)
+        if rule is None:
+            continue
+
+        containers = item["spec"]["template"]["spec"]["containers"]
+        changes = [
+            {"container": container["name"], "from": container["image"], "to": rule.image}
+            for container in rule.select_containers(containers)
+            if container["image"] != rule.image
+        ]
+        plan.append({
+            "namespace": namespace,
+            "name": name,
+            "keyword": rule.keyword,
+            "changes": changes,
+            "status": "planned" if changes else "unchanged",
+        })
+    return plan
+
+
+def build_patch(changes: list, restarted_at: str) -> dict:
+    """
+    Merges all image changes and the restart annotation into one strategic merge patch.
+    """
+    return {
+        "spec": {
+            "template": {
+                "metadata": {"annotations": {RESTARTED_AT_ANNOTATION: restarted_at}},
+                "spec": {
+                    "containers": [{"name": change["container"], "image": change["to"]} for change in changes]
+                },
+            }
+        }
+    }
+
+
+class NamespaceRateLimiter:
+    """
+    Spaces out requests to the same namespace to at most `rate` per second.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: dict = {}
+
+    async def acquire(self, namespace: str):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot.get(namespace, now))
+        self._next_slot[namespace] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def apply_plan(plan: list, patch, max_workers: int = 10, namespace_rate: float = 5.0) -> list:
+    """
+    Applies every planned entry concurrently. `patch(namespace, name, body)` is an
+    async callable raising on failure. Entries are updated in place with
+    status "patched" or "failed" (plus "error").
+    """
+    workers = asyncio.Semaphore(max(1, max_workers))
+    limiter = NamespaceRateLimiter(namespace_rate)
+    restarted_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    async def apply(entry: dict):
+        # Wait for the namespace's slot before taking a worker, so a throttled
+        # namespace does not hold workers another namespace could use.
+        await limiter.acquire(entry["namespace"])
+        async with workers:
+            try:
+                await patch(entry["namespace"], entry["name"], build_patch(entry["changes"], restarted_at))
+                entry["status"] = "patched"
+            except Exception as e:
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+
+    await asyncio.gather(*(apply(entry) for entry in plan if entry["status"] == "planned"))
+    return plan
+
+
+def summarize(plan: list, dry_run: bool) -> dict:
+    counts: dict = {}
+    for entry in plan:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {"dry_run": dry_run, "summary": counts, "deployments": plan}
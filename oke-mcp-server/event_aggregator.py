@@ -0,0 +1,113 @@
+"""
+Aggregation of Kubernetes events for get_events(format="aggregate").
+
+Controllers in a bad state emit the same event over and over, often with only
+a number, address or id changing in the message. Events are folded one at a
+time into groups keyed by involved object, reason and message template (the
+message with its variable parts masked), so a whole cluster's events can be
+streamed page by page without being held at once. Each group keeps its total
+count, first and last sighting and latest message; groups are ranked Warnings
+first, then by how often they fired.
+"""
+import re
+
+# Variable parts of event messages, masked in this order.
+_VARIABLE_PARTS = (
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b"), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+)
+SEVERITY = {"Warning": 0, "Normal": 1}
+MESSAGE_CHARS = 300
+
+
+def message_template(message: str) -> str:
+    """
+    Masks the parts of an event message that vary between otherwise identical
+    events: "0/12 nodes are available: 3 Insufficient cpu" becomes
+    "<n>/<n> nodes are available: <n> Insufficient cpu".
+    """
+    template = " ".join(message.split())
+    for pattern, placeholder in _VARIABLE_PARTS:
+        template = pattern.sub(placeholder, template)
+    return template
+
+
+def event_count(event: dict) -> int:
+    return event.get("count") or (event.get("series") or {}).get("count") or 1
+
+
+def first_seen(event: dict) -> str:
+    return (event.get("firstTimestamp") or event.get("eventTime")
+            or event["metadata"].get("creationTimestamp") or "")
+
+
+def last_seen(event: dict) -> str:
+    return (event.get("lastTimestamp") or (event.get("series") or {}).get("lastObservedTime")
+            or event.get("eventTime") or event["metadata"].get("creationTimestamp") or "")
+
+
+def is_newer(event: dict, resource_version: str | None) -> bool:
+    """
+    Whether an event was created or changed after resource_version. Compares
+    numerically when both are numbers (as etcd-backed API servers issue them)
+    and keeps every event otherwise.
+    """
+    current = event["metadata"].get("resourceVersion", "")
+    if not resource_version or not (current.isdigit() and resource_version.isdigit()):
+        return True
+    return int(current) > int(resource_version)
+
+
+class EventAggregator:
+    def __init__(self):
+        self._groups: dict = {}
+        self.events = 0
+
+    def add(self, event: dict):
+        obj = event.get("involvedObject", {})
+        kind = obj.get("kind", "")
+        # Node events are recorded in some namespace, but nodes themselves are cluster-scoped.
+        namespace = "" if kind == "Node" else obj.get("namespace", "")
+        message = " ".join((event.get("message") or "").split())
+        key = (kind, namespace, obj.get("name", ""), event.get("reason", ""), message_template(message))
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = {
+                "type": event.get("type", ""),
+                "reason": key[3],
+                "object": f"{kind.lower()}/{key[2]}",
+                "namespace": namespace,
+                "message": message[:MESSAGE_CHARS],
+                "count": 0,
+                "events": 0,
+                "first_seen": first_seen(event),
+                "last_seen": last_seen(event),
+                "_messages": set(),
+            }
+        self.events += 1
+        group["count"] += event_count(event)
+        group["events"] += 1
+        group["_messages"].add(message)
+        if event.get("type") == "Warning":
+            group["type"] = "Warning"
+        start, end = first_seen(event), last_seen(event)
+        if start and (not group["first_seen"] or start < group["first_seen"]):
+            group["first_seen"] = start
+        if end >= group["last_seen"]:
+            group["last_seen"] = end
+            group["message"] = message[:MESSAGE_CHARS]
+
+    def groups(self) -> list:
+        """
+        Returns the groups, most severe and most frequent first. "variants" is
+        the number of distinct messages folded into a group.
+        """
+        # Most recent first among groups of equal severity and count.
+        ranked = sorted(self._groups.values(), key=lambda group: group["last_seen"], reverse=True)
+        ranked.sort(key=lambda group: (SEVERITY.get(group["type"], len(SEVERITY)), -group["count"]))
+        return [
+            {key: value for key, value in group.items() if key != "_messages"} | {"variants": len(group["_messages"])}
+            for group in ranked
+        ]
@@ -0,0 +1,65 @@
+"""
+JSONPath-style field projection for list results.
+
+Supports the subset of kubectl JSONPath that agents actually use: dotted keys,
+[n] indexes and [*] wildcards, with optional {...} / $ wrappers, e.g.
+"metadata.name,status.phase,{.spec.containers[*].image}".
+"""
+import re
+
+_STEP = re.compile(r"([^.\[\]]+)|\[(\*|-?\d+)\]")
+
+
+def parse_fields(fields: str) -> list:
+    """
+    Parses a comma-separated field list into (field, steps) pairs.
+    """
+    parsed = []
+    for field in filter(None, (part.strip() for part in fields.split(","))):
+        path = field
+        if path.startswith("{") and path.endswith("}"):
+            path = path[1:-1]
+        path = path.lstrip("$").lstrip(".")
+        steps = []
+        for key, index in _STEP.findall(path):
+            if key:
+                steps.append(key)
+            else:
+                steps.append("*" if index == "*" else int(index))
+        parsed.append((path, steps))
+    return parsed
+
+
+def extract(obj, steps: list):
+    """
+    Follows steps into obj. Returns a list when the path has a wildcard, else a
+    single value (None when the path does not exist).
+    """
+    values = [obj]
+    wildcard = False
+    for step in steps:
+        matched = []
+        for value in values:
+            if step == "*":
+                wildcard = True
+                if isinstance(value, list):
+                    matched.extend(value)
+                elif isinstance(value, dict):
+                    matched.extend(value.values())
+            elif isinstance(step, int):
+                if isinstance(value, list) and -len(value) <= step < len(value):
+                    matched.append(value[step])
+            elif isinstance(value, dict) and step in value:
+                matched.append(value[step])
+        values = matched
+    if wildcard:
+        return values
+    return values[0] if values else None
+
+
+def project(items: list, fields: str) -> list:
+    """
+    Reduces each item to {field: value} for the requested fields.
+    """
+    parsed = parse_fields(fields)
+    return [{path: extract(item, steps) for path, steps in parsed} for item in items]
@@ -0,0 +1,174 @@
+"""
+Job queue behind the Helm tools.
+
+Every install, upgrade or uninstall becomes a HelmJob with an id that can be
+polled. Jobs for different releases run concurrently, bounded by the "helm"
+worker limit; jobs for the same release and namespace run one after the other
+in submission order, so two agents can never upgrade one release at once. A
+job waits for its release lock before it takes a worker slot, so a busy
+release does not hold up the others.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import NotRequired, TypedDict
+
+from tool_result import error_message
+
+logger = logging.getLogger(__name__)
+
+# Seconds a finished job stays queryable.
+FINISHED_TTL_SECONDS = 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class HelmRelease(TypedDict):
+    release: str
+    chart: str
+    namespace: NotRequired[str]
+
+
+def helm_command(operation: str, release: str, chart: str | None, namespace: str,
+                 atomic: bool = False, wait: bool = False, timeout_seconds: int | None = None) -> list:
+    """
+    Builds the helm command line for an operation ("install", "upgrade" or
+    "uninstall"). --atomic implies --wait and does not apply to uninstall.
+    """
+    cmd = ["helm", operation, release]
+    if operation != "uninstall":
+        cmd.append(chart)
+        if atomic:
+            cmd.append("--atomic")
+    cmd += ["-n", namespace]
+    if wait and not (atomic and operation != "uninstall"):
+        cmd.append("--wait")
+    if timeout_seconds:
+        cmd.append(f"--timeout={timeout_seconds}s")
+    return cmd
+
+
+class HelmJob:
+    def __init__(self, operation: str, release: str, namespace: str, command: list):
+        self.id = uuid.uuid4().hex[:8]
+        self.operation = operation
+        self.release = release
+        self.namespace = namespace
+        self.command = command
+        self.state = QUEUED
+        self.output = None
+        self.error = None
+        self.rollout_ids = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for the job to finish; returns whether it did.
+        """
+        if timeout > 0 and not self.done:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.done
+
+    def describe(self) -> dict:
+        now = time.time()
+        return {
+            "job_id": self.id,
+            "operation": self.operation,
+            "release": self.release,
+            "namespace": self.namespace,
+            "state": self.state,
+            "command": " ".join(self.command),
+            "output": self.output,
+            "error": self.error,
+            "queued_seconds": round((self.started_at or now) - self.submitted_at, 1),
+            "run_seconds": round((self.finished_at or now) - self.started_at, 1) if self.started_at else None,
+        }
+
+
+class HelmQueue:
+    """
+    `run(cmd)` is an async callable returning the command's output and raising
+    on failure. `on_success(job)`, if given, is awaited after a job succeeds
+    (e.g. to start tracking the release's rollouts).
+    """
+
+    def __init__(self, run, workers: asyncio.Semaphore, on_success=None):
+        self.run = run
+        self.workers = workers
+        self.on_success = on_success
+        self._jobs: dict = {}
+        self._locks: dict = {}
+        self._pending: dict = {}
+        self._tasks: set = set()
+
+    def reap(self):
+        """
+        Forgets jobs that finished more than FINISHED_TTL_SECONDS ago.
+        """
+        cutoff = time.time() - FINISHED_TTL_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, operation: str, release: str, namespace: str, command: list) -> HelmJob:
+        """
+        Queues a helm command for a release and returns its job at once.
+        """
+        self.reap()
+        job = HelmJob(operation, release, namespace, command)
+        self._jobs[job.id] = job
+        key = (namespace, release)
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        self._pending[key] = self._pending.get(key, 0) + 1
+        task = asyncio.create_task(self._execute(key, job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _execute(self, key: tuple, job: HelmJob):
+        try:
+            async with self._locks[key], self.workers:
+                job.state = RUNNING
+                job.started_at = time.time()
+                try:
+                    job.output = await self.run(job.command)
+                except Exception as e:
+                    job.state = FAILED
+                    job.error = error_message(e)
+                else:
+                    job.state = SUCCEEDED
+                    if self.on_success is not None:
+                        try:
+                            await self.on_success(job)
+                        except Exception as e:
+                            logger.warning("Post-%s hook for release %s failed: %s",
+                                           job.operation, job.release, error_message(e))
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+            self._pending[key] -= 1
+            if not self._pending[key]:
+                del self._pending[key]
+                del self._locks[key]
+
+    def get(self, job_id: str) -> HelmJob | None:
+        self.reap()
+        return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        self.reap()
+        return list(self._jobs.values())
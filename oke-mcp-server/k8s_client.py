@@ -0,0 +1,435 @@
+"""
+In-process Kubernetes API client used by the OKE MCP tools.
+
+Connection settings are read from kubeconfig once and every request goes
+through a shared keep-alive HTTP connection pool, so tools no longer pay for
+forking kubectl, re-reading kubeconfig and redoing the TLS handshake on every
+call. When the kubernetes package is missing or kubeconfig cannot be loaded,
+get_client() returns None and callers fall back to kubectl.
+"""
+import asyncio
+import json
+import logging
+import os
+import ssl
+import threading
+
+import httpx
+
+from server_metrics import record_backend_call
+
+try:
+    from kubernetes.client import Configuration
+    from kubernetes import config as kube_config
+except ImportError:  # kubectl-only mode
+    Configuration = None
+    kube_config = None
+
+logger = logging.getLogger(__name__)
+# httpx logs every request at INFO, which floods the MCP server log.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# "api" uses the pooled client where possible, "kubectl" forces subprocess calls.
+BACKEND = os.environ.get("OKE_MCP_BACKEND", "api").lower()
+POOL_SIZE = int(os.environ.get("OKE_MCP_POOL_SIZE", "16"))
+REQUEST_TIMEOUT = float(os.environ.get("OKE_MCP_REQUEST_TIMEOUT", "60"))
+CONNECT_TIMEOUT = 10.0
+
+# resource -> (api prefix, plural, namespaced, kind)
+RESOURCES = {
+    "pods": ("/api/v1", "pods", True, "Pod"),
+    "services": ("/api/v1", "services", True, "Service"),
+    "events": ("/api/v1", "events", True, "Event"),
+    "persistentvolumeclaims": ("/api/v1", "persistentvolumeclaims", True, "PersistentVolumeClaim"),
+    "nodes": ("/api/v1", "nodes", False, "Node"),
+    "namespaces": ("/api/v1", "namespaces", False, "Namespace"),
+    "deployments": ("/apis/apps/v1", "deployments", True, "Deployment"),
+    "replicasets": ("/apis/apps/v1", "replicasets", True, "ReplicaSet"),
+    "nodemetrics": ("/apis/metrics.k8s.io/v1beta1", "nodes", False, "NodeMetrics"),
+    "podmetrics": ("/apis/metrics.k8s.io/v1beta1", "pods", True, "PodMetrics"),
+}
+
+# Server-side printing: the API server renders the columns `kubectl get` shows.
+TABLE_ACCEPT = "application/json;as=Table;v=v1;g=meta.k8s.io,application/json"
+
+PATCH_CONTENT_TYPES = {
+    "strategic": "application/strategic-merge-patch+json",
+    "merge": "application/merge-patch+json",
+    "json": "application/json-patch+json",
+}
+
+
+class KubeAPIError(Exception):
+    """
+    Raised when the API server rejects a request or cannot be reached.
+    status_code is 0 for transport errors.
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def resource_path(resource: str, namespace: str | None = None, name: str | None = None,
+                  subresource: str | None = None) -> str:
+    """
+    Builds the REST path for a resource, e.g. /api/v1/namespaces/default/pods/web-0.
+    A namespaced resource without a namespace addresses all namespaces.
+    """
+    prefix, plural, namespaced, _ = RESOURCES[resource]
+    path = prefix
+    if namespaced and namespace:
+        path += f"/namespaces/{namespace}"
+    path += f"/{plural}"
+    if name:
+        path += f"/{name}"
+        if subresource:
+            path += f"/{subresource}"
+    return path
+
+
+def _fill_kind(resource: str, data: dict) -> dict:
+    prefix, _, _, kind = RESOURCES[resource]
+    api_version = prefix.removeprefix("/api/").removeprefix("/apis/")
+    for item in data.get("items", []):
+        item.setdefault("apiVersion", api_version)
+        item.setdefault("kind", kind)
+    return data
+
+
+def _ssl_context(configuration) -> ssl.SSLContext:
+    context = ssl.create_default_context(cafile=configuration.ssl_ca_cert or None)
+    if configuration.cert_file:
+        context.load_cert_chain(configuration.cert_file, configuration.key_file or None)
+    if not configuration.verify_ssl:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        status = response.json()
+        return status.get("message") or response.text
+    except ValueError:
+        return response.text.strip() or response.reason_phrase
+
+
+def _watch_params(resource_version: str, timeout_seconds: int) -> dict:
+    return {
+        "watch": "true",
+        "resourceVersion": resource_version,
+        "allowWatchBookmarks": "true",
+        "timeoutSeconds": timeout_seconds,
+    }
+
+
+def _watch_event(line: str) -> dict:
+    event = json.loads(line)
+    if event.get("type") == "ERROR":
+        status = event.get("object", {})
+        raise KubeAPIError(status.get("code", 500), status.get("message", "watch error"))
+    return event
+
+
+class KubeClient:
+    """
+    Talks to one cluster (kubeconfig context) over a pooled keep-alive session.
+    Instances are thread-safe and meant to be shared; use get_client().
+    """
+
+    def __init__(self, context: str | None = None, pool_size: int = POOL_SIZE):
+        configuration = Configuration()
+        try:
+            kube_config.load_kube_config(context=context, client_configuration=configuration,
+                                         persist_config=False)
+        except kube_config.ConfigException:
+            if context is not None:
+                raise
+            kube_config.load_incluster_config(client_configuration=configuration)
+
+        self.context = context
+        self._configuration = configuration
+        self._client_options = {
+            "base_url": configuration.host,
+            "verify": _ssl_context(configuration),
+            "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            "timeout": httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        }
+        # The sync session serves background threads (watch cache); the async
+        # session serves the MCP tools and is created on the server's event loop.
+        self._http = httpx.Client(**self._client_options)
+        self._async_http = None
+
+    def _auth_headers(self) -> dict:
+        # auth_settings() refreshes exec-plugin tokens (oci ce cluster generate-token) when they
+        # expire, running the plugin as a subprocess.
+        return {
+            setting["key"]: setting["value"] for setting in self._configuration.auth_settings().values()
+            if setting.get("in") == "header" and setting.get("value")
+        }
+
+    async def _aauth_headers(self) -> dict:
+        """
+        _auth_headers() for the async session. With an exec plugin or token
+        file the lookup may block on a refresh, so it runs in a worker thread
+        rather than stalling every other tool on the event loop.
+        """
+        if self._configuration.refresh_api_key_hook is None:
+            return self._auth_headers()
+        return await asyncio.to_thread(self._auth_headers)
+
+    def _headers(self, content_type: str | None = None, accept: str = "application/json",
+                 auth: dict | None = None) -> dict:
+        headers = {"Accept": accept}
+        headers.update(self._auth_headers() if auth is None else auth)
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
+
+    def _request_options(self, params: dict | None, body, content_type: str | None,
+                         timeout: float | None, accept: str = "application/json", auth: dict | None = None) -> dict:
+        if params:
+            params = {key: value for key, value in params.items() if value not in (None, "")}
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+            content_type = content_type or "application/json"
+        options = {"params": params, "content": body, "headers": self._headers(content_type, accept, auth)}
+        if timeout is not None:
+            options["timeout"] = timeout
+        return options
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> dict:
+        if response.status_code >= 400:
+            raise KubeAPIError(response.status_code, _error_message(response))
+        return response.json() if response.content else {}
+
+    def request(self, method: str, path: str, params: dict | None = None, body=None,
+                content_type: str | None = None, timeout: float | None = None) -> dict:
+        """
+        Sends a request and returns the decoded JSON response.
+        Raises KubeAPIError on HTTP errors and connection failures.
+        """
+        try:
+            response = self._http.request(method, path,
+                                          **self._request_options(params, body, content_type, timeout))
+        except httpx.HTTPError as e:
+            raise KubeAPIError(0, str(e)) from e
+        return self._decode(response)
+
+    async def arequest(self, method: str, path: str, params: dict | None = None, body=None,
+                       content_type: str | None = None, timeout: float | None = None,
+                       accept: str = "application/json") -> dict:
+        """
+        Async version of request() for use from the MCP tools.
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(**self._client_options)
+        record_backend_call("api")
+        try:
+            response = await self._async_http.request(
+                method, path,
+                **self._request_options(params, body, content_type, timeout, accept, await self._aauth_headers())
+            )
+        except httpx.HTTPError as e:
+            raise KubeAPIError(0, str(e)) from e
+        return self._decode(response)
+
+    async def astream(self, path: str, params: dict | None = None, timeout: float | None = None):
+        """
+        Streams a response body in chunks (e.g. pod logs) over the async session.
+        Raises KubeAPIError on HTTP errors and connection failures.
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(**self._client_options)
+        options = self._request_options(params, None, None, timeout, "*/*", await self._aauth_headers())
+        record_backend_call("api")
+        try:
+            async with self._async_http.stream("GET", path, **options) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise KubeAPIError(response.status_code, _error_message(response))
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+        except httpx.HTTPError as e:
+            raise KubeAPIError(0, str(e)) from e
+
+    def list(self, resource: str, namespace: str | None = None, **params) -> dict:
+        """
+        Lists a resource kind, across all namespaces when namespace is None.
+        Items get kind/apiVersion filled in so the result matches `kubectl get -o json`.
+        """
+        return _fill_kind(resource, self.request("GET", resource_path(resource, namespace), params=params))
+
+    async def alist(self, resource: str, namespace: str | None = None, **params) -> dict:
+        return _fill_kind(resource, await self.arequest("GET", resource_path(resource, namespace), params=params))
+
+    def watch(self, resource: str, resource_version: str, namespace: str | None = None,
+              timeout_seconds: int = 300):
+        """
+        Streams watch events ({"type": ..., "object": ...}) starting after resource_version,
+        with bookmarks enabled. Ends when the server closes the watch after timeout_seconds.
+        Raises KubeAPIError, including status 410 when resource_version is too old.
+        """
+        timeout = httpx.Timeout(timeout_seconds + 30, connect=CONNECT_TIMEOUT)
+        try:
+            with self._http.stream("GET", resource_path(resource, namespace),
+                                   params=_watch_params(resource_version, timeout_seconds),
+                                   headers=self._headers(), timeout=timeout) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    raise KubeAPIError(response.status_code, _error_message(response))
+                for line in response.iter_lines():
+                    if line:
+                        yield _watch_event(line)
+        except httpx.HTTPError as e:
+            raise KubeAPIError(0, str(e)) from e
+
+    async def awatch(self, resource: str, resource_version: str, namespace: str | None = None,
+                     timeout_seconds: int = 300, connected: asyncio.Event | None = None, **params):
+        """
+        Async version of watch() over the async session. Extra params (e.g.
+        labelSelector, fieldSelector) are added to the watch query. `connected`
+        is set once the API server has accepted the watch, before any event.
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(**self._client_options)
+        timeout = httpx.Timeout(timeout_seconds + 30, connect=CONNECT_TIMEOUT)
+        record_backend_call("api")
+        try:
+            async with self._async_http.stream("GET", resource_path(resource, namespace),
+                                               params=_watch_params(resource_version, timeout_seconds) | params,
+                                               headers=self._headers(auth=await self._aauth_headers()),
+                                               timeout=timeout) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise KubeAPIError(response.status_code, _error_message(response))
+                if connected is not None:
+                    connected.set()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield _watch_event(line)
+        except httpx.HTTPError as e:
+            raise KubeAPIError(0, str(e)) from e
+
+    def read(self, resource: str, name: str, namespace: str | None = None,
+             subresource: str | None = None) -> dict:
+        return self.request("GET", resource_path(resource, namespace, name, subresource))
+
+    async def aread(self, resource: str, name: str, namespace: str | None = None,
+                    subresource: str | None = None) -> dict:
+        return await self.arequest("GET", resource_path(resource, namespace, name, subresource))
+
+    async def atable(self, resource: str, namespace: str | None = None, name: str | None = None,
+                     **params) -> dict:
+        """
+        Lists a resource kind (or reads one object) as a meta.k8s.io Table, the
+        server-side rendering of the columns `kubectl get` prints.
+        """
+        return await self.arequest("GET", resource_path(resource, namespace, name), params=params,
+                                   accept=TABLE_ACCEPT)
+
+    async def apatch(self, resource: str, name: str, namespace: str | None, body: dict,
+                     patch_type: str = "strategic", subresource: str | None = None) -> dict:
+        return await self.arequest("PATCH", resource_path(resource, namespace, name, subresource),
+                                   body=body, content_type=PATCH_CONTENT_TYPES[patch_type])
+
+    async def adelete(self, resource: str, name: str, namespace: str | None = None) -> dict:
+        return await self.arequest("DELETE", resource_path(resource, namespace, name))
+
+    def close(self):
+        self._http.close()
+
+
+# ----------------------- Client Pool -----------------------
+
+_clients: dict = {}
+_load_errors: dict = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(context: str | None = None) -> KubeClient | None:
+    """
+    Returns the shared client for a kubeconfig context (None = current context),
+    building it on first use. Returns None when the API backend is disabled or
+    unavailable so callers can fall back to kubectl.
+    """
+    if BACKEND != "api" or Configuration is None:
+        return None
+    with _clients_lock:
+        client = _clients.get(context)
+        if client is not None or context in _load_errors:
+            return client
+        try:
+            client = KubeClient(context)
+        except Exception as e:
+            _load_errors[context] = str(e)
+            logger.warning("Kubernetes API client unavailable for context %s, using kubectl: %s",
+                           context or "<current>", e)
+            return None
+        _clients[context] = client
+        return client
+
+
+async def aget_client(context: str | None = None) -> KubeClient | None:
+    """
+    get_client() for async callers. Building a client parses kubeconfig and may
+    run an exec plugin, so a first build runs in a worker thread instead of on
+    the event loop; built clients are returned directly.
+    """
+    client = _clients.get(context)
+    if client is not None or BACKEND != "api" or Configuration is None or context in _load_errors:
+        return client
+    return await asyncio.to_thread(get_client, context)
+
+
+def current_context() -> str | None:
+    """
+    Returns the current-context name from kubeconfig without running kubectl.
+    """
+    if kube_config is None:
+        return None
+    try:
+        _, active = kube_config.list_kube_config_contexts()
+    except Exception:
+        return None
+    return active["name"] if active else None
+
+
+def context_namespace(context: str | None = None) -> str:
+    """
+    Returns the default namespace of a kubeconfig context, as kubectl uses it
+    when no -n is given.
+    """
+    if kube_config is None:
+        return "default"
+    try:
+        contexts, active = kube_config.list_kube_config_contexts()
+    except Exception:
+        return "default"
+    if context is not None:
+        active = next((entry for entry in contexts if entry["name"] == context), None)
+    return ((active or {}).get("context") or {}).get("namespace") or "default"
+
+
+def list_contexts() -> list | None:
+    """
+    Returns every context name defined in kubeconfig, or None when kubeconfig
+    cannot be read without kubectl.
+    """
+    if kube_config is None:
+        return None
+    try:
+        contexts, _ = kube_config.list_kube_config_contexts()
+    except Exception:
+        return None
+    return [context["name"] for context in contexts]
+
+
+def close_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,184 @@
+"""
+Argument parsing and policy for kubectl_generic.
+
+The argument string is split with shlex, so quoted selectors and JSONPath
+templates survive, and broken into verb, resource types, names and flags.
+Every call is checked against a verb allow-list, a resource allow/deny list
+and a set of flags that would switch credentials or clusters before anything
+runs. The server then answers get/describe/top of the resources the API client
+knows through the pooled client and watch cache, and passes anything else to
+kubectl as the parsed argument list.
+"""
+import os
+import shlex
+from typing import NamedTuple
+
+from mcp.server.fastmcp.exceptions import ToolError
+
+from k8s_client import RESOURCES
+
+
+def _names(value: str) -> frozenset:
+    return frozenset(name.strip().lower() for name in value.split(",") if name.strip())
+
+
+# Override with e.g. OKE_MCP_GENERIC_VERBS="get,describe,top,logs,delete"; "*" allows every verb.
+ALLOWED_VERBS = _names(os.environ.get(
+    "OKE_MCP_GENERIC_VERBS", "get,describe,top,explain,logs,api-resources,api-versions,version"
+))
+# Resource types (plural, short or singular names) kubectl_generic may touch; "*" allows all.
+ALLOWED_RESOURCES = _names(os.environ.get("OKE_MCP_GENERIC_RESOURCES", "*"))
+DENIED_RESOURCES = _names(os.environ.get("OKE_MCP_GENERIC_DENIED_RESOURCES", "secrets"))
+MAX_BYTES = int(os.environ.get("OKE_MCP_GENERIC_MAX_BYTES", "64000"))
+MAX_SECONDS = float(os.environ.get("OKE_MCP_GENERIC_MAX_SECONDS", "60"))
+
+# Flags that would point kubectl at other credentials or another API server
+# than the kubeconfig the server was started with.
+DENIED_FLAGS = frozenset({
+    "--kubeconfig", "--server", "--token", "--username", "--password", "--as", "--as-group", "--as-uid",
+    "--client-certificate", "--client-key", "--certificate-authority", "--insecure-skip-tls-verify",
+    # --raw reads any API path, and -f/-k read the objects a manifest names,
+    # both past the resource allow/deny lists.
+    "--raw", "--filename", "--kustomize",
+})
+SHORT_FLAGS = {
+    "-n": "--namespace",
+    "-l": "--selector",
+    "-o": "--output",
+    "-A": "--all-namespaces",
+    "-c": "--container",
+    "-f": "--filename",
+    "-k": "--kustomize",
+    "-s": "--server",
+}
+# Flags whose value is the next token when not given as --flag=value.
+VALUE_FLAGS = frozenset({
+    "--namespace", "--selector", "--field-selector", "--output", "--context", "--container", "--filename",
+    "--server", "--sort-by", "--since", "--since-time", "--tail", "--chunk-size", "--template",
+    "--label-columns", "--kubeconfig", "--token", "--username", "--password", "--as", "--as-group",
+    "--as-uid", "--client-certificate", "--client-key", "--certificate-authority", "--cluster", "--user",
+    "--request-timeout", "--subresource", "--limit-bytes", "--pod-running-timeout", "--max-log-requests",
+    "--raw", "--kustomize",
+})
+# Verbs whose first positional argument is a sub-command rather than a resource type.
+SUBCOMMAND_VERBS = frozenset({"rollout", "auth", "config", "certificate", "set", "create"})
+# Verbs that take a pod name without a type.
+POD_VERBS = frozenset({"logs", "exec", "attach", "port-forward", "cp"})
+NO_RESOURCE_VERBS = frozenset({"api-resources", "api-versions", "version", "cluster-info", "plugin", "completion"})
+
+ALIASES = {
+    "po": "pods", "pod": "pods",
+    "svc": "services", "service": "services",
+    "ev": "events", "event": "events",
+    "pvc": "persistentvolumeclaims", "persistentvolumeclaim": "persistentvolumeclaims",
+    "no": "nodes", "node": "nodes",
+    "ns": "namespaces", "namespace": "namespaces",
+    "deploy": "deployments", "deployment": "deployments",
+    "rs": "replicasets", "replicaset": "replicasets",
+    "secret": "secrets",
+}
+
+
+def canonical_resource(resource: str) -> str:
+    """
+    Maps a resource as typed ("po", "deployment.apps", "pods.spec") to its
+    plural name, e.g. "pods" or "deployments".
+    """
+    name = resource.lower().split(".", 1)[0]
+    return ALIASES.get(name, name)
+
+
+class KubectlCommand(NamedTuple):
+    argv: list
+    verb: str | None
+    resources: tuple
+    names: tuple
+    flags: dict
+
+
+def parse(args: str) -> KubectlCommand:
+    """
+    Splits an argument string the way a shell would and classifies its tokens.
+    Raises ValueError for unbalanced quotes or an empty command.
+    """
+    argv = shlex.split(args)
+    if argv[:1] == ["kubectl"]:
+        argv = argv[1:]
+    if not argv:
+        raise ValueError("empty kubectl command")
+
+    flags: dict = {}
+    positionals = []
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "--":
+            # Everything after -- belongs to the command run in the pod.
+            break
+        if not token.startswith("-") or token == "-":
+            positionals.append(token)
+            continue
+        name, has_value, value = token.partition("=")
+        if not name.startswith("--") and len(name) > 2 and SHORT_FLAGS.get(name[:2]) in VALUE_FLAGS:
+            # Joined short flag such as -nkube-system or -ojson.
+            name, value, has_value = name[:2], token[2:], True
+        if name == "-f" and positionals[:1] == ["logs"]:
+            # logs -f is --follow, not a manifest.
+            name = "--follow"
+        name = SHORT_FLAGS.get(name, name)
+        if not has_value:
+            value = next(tokens, "") if name in VALUE_FLAGS else True
+        flags[name] = value
+
+    verb = positionals[0] if positionals else None
+    operands = positionals[1:]
+    if verb in SUBCOMMAND_VERBS:
+        operands = operands[1:]
+    resources, names = [], []
+    if verb in NO_RESOURCE_VERBS:
+        operands = []
+    if verb in POD_VERBS:
+        for operand in operands[:1]:
+            kind, _, name = operand.rpartition("/")
+            resources.append(kind or "pods")
+            names.append(name)
+    elif operands and all("/" in operand for operand in operands):
+        for operand in operands:
+            kind, _, name = operand.partition("/")
+            resources.append(kind)
+            names.append(name)
+    elif operands:
+        resources = operands[0].split(",")
+        names = operands[1:]
+    return KubectlCommand(argv, verb, tuple(resources), tuple(names), flags)
+
+
+def check_allowed(command: KubectlCommand):
+    """
+    Raises ToolError when the verb, a resource type or a flag is not allowed.
+    """
+    if "*" not in ALLOWED_VERBS and (command.verb or "").lower() not in ALLOWED_VERBS:
+        raise ToolError(
+            f"kubectl verb {command.verb!r} is not allowed (allowed: {', '.join(sorted(ALLOWED_VERBS))})"
+        )
+    for resource in command.resources:
+        plural = canonical_resource(resource)
+        if plural in DENIED_RESOURCES or resource.lower() in DENIED_RESOURCES:
+            raise ToolError(f"kubectl access to {resource!r} is not allowed")
+        if "*" not in ALLOWED_RESOURCES and not {plural, resource.lower()} & ALLOWED_RESOURCES:
+            raise ToolError(f"kubectl access to {resource!r} is not allowed")
+    denied = DENIED_FLAGS.intersection(command.flags)
+    if denied:
+        raise ToolError(f"kubectl flag(s) not allowed: {', '.join(sorted(denied))}")
+
+
+def api_resource(command: KubectlCommand, flags: frozenset) -> str | None:
+    """
+    Returns the RESOURCES key a get/describe/top call addresses when the API
+    client can answer it: one known resource type and no flags outside `flags`.
+    """
+    if len(set(map(canonical_resource, command.resources))) != 1:
+        return None
+    if not set(command.flags) <= flags:
+        return None
+    resource = canonical_resource(command.resources[0])
+    return resource if resource in RESOURCES else None
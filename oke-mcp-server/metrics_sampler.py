@@ -0,0 +1,245 @@
+"""
+Rolling CPU/memory history from the metrics.k8s.io API.
+
+A background thread lists NodeMetrics and PodMetrics every
+OKE_MCP_METRICS_INTERVAL seconds and writes them into fixed-size NumPy ring
+buffers: one row per node or pod, one column per scrape, NaN where a series
+had no sample. Percentiles over a time window are then computed for all series
+at once, so agents get trends without scraping repeatedly themselves.
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from k8s_client import KubeAPIError, KubeClient
+
+logger = logging.getLogger(__name__)
+
+# Seconds between scrapes; 0 disables the sampler.
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("OKE_MCP_METRICS_INTERVAL", "30"))
+# Scrapes kept per series (120 x 30s = 1 hour).
+SAMPLES_KEPT = int(os.environ.get("OKE_MCP_METRICS_SAMPLES", "120"))
+INITIAL_SERIES = 256
+
+_QUANTITY = re.compile(r"([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)")
+_SUFFIXES = {
+    "n": 1e-9, "u": 1e-6, "m": 1e-3, "": 1.0,
+    "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18,
+    "Ki": 2.0 ** 10, "Mi": 2.0 ** 20, "Gi": 2.0 ** 30, "Ti": 2.0 ** 40, "Pi": 2.0 ** 50, "Ei": 2.0 ** 60,
+}
+
+
+def parse_quantity(value: str) -> float:
+    """
+    Converts a Kubernetes quantity such as "250m", "123456789n" or "512Mi" to a float.
+    """
+    match = _QUANTITY.fullmatch(value.strip())
+    if match is None or match.group(2) not in _SUFFIXES:
+        raise ValueError(f"invalid quantity {value!r}")
+    return float(match.group(1)) * _SUFFIXES[match.group(2)]
+
+
+def usage(item: dict) -> tuple:
+    """
+    Returns (CPU cores, memory bytes) of a NodeMetrics item, or summed over
+    the containers of a PodMetrics item.
+    """
+    parts = [container["usage"] for container in item["containers"]] if "containers" in item else [item["usage"]]
+    cpu = sum(parse_quantity(part.get("cpu", "0")) for part in parts)
+    memory = sum(parse_quantity(part.get("memory", "0")) for part in parts)
+    return cpu, memory
+
+
+def series_key(item: dict) -> tuple:
+    return item["metadata"].get("namespace", ""), item["metadata"]["name"]
+
+
+class SeriesBuffer:
+    """
+    Ring buffer of CPU and memory samples for a changing set of series.
+    Rows of series that have been absent for a whole buffer are reused.
+    """
+
+    def __init__(self, capacity: int = SAMPLES_KEPT):
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)
+        self.cpu = np.full((INITIAL_SERIES, capacity), np.nan, dtype=np.float32)
+        self.memory = np.full((INITIAL_SERIES, capacity), np.nan, dtype=np.float32)
+        # Scrape number a row was last written in; 0 marks a free row.
+        self.last_seen = np.zeros(INITIAL_SERIES, dtype=np.int64)
+        self.keys: list = []
+        self.scrapes = 0
+        self._rows: dict = {}
+        self._free: list = []
+        self._lock = threading.Lock()
+
+    def _row(self, key: tuple) -> int:
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+            self.keys[row] = key
+        else:
+            row = len(self.keys)
+            self.keys.append(key)
+            if row == len(self.cpu):
+                self._grow()
+        self.cpu[row] = np.nan
+        self.memory[row] = np.nan
+        self._rows[key] = row
+        return row
+
+    def _grow(self):
+        extra = np.full(self.cpu.shape, np.nan, dtype=np.float32)
+        self.cpu = np.vstack([self.cpu, extra])
+        self.memory = np.vstack([self.memory, extra])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(len(extra), dtype=np.int64)])
+
+    def add(self, timestamp: float, samples: list):
+        """
+        Writes one scrape of (key, cpu, memory) samples into the next column.
+        """
+        with self._lock:
+            column = self.scrapes % self.capacity
+            self.scrapes += 1
+            self.times[column] = timestamp
+            self.cpu[:, column] = np.nan
+            self.memory[:, column] = np.nan
+            rows = np.fromiter((self._row(key) for key, _, _ in samples), dtype=np.intp, count=len(samples))
+            self.cpu[rows, column] = np.fromiter((cpu for _, cpu, _ in samples), dtype=np.float32, count=len(samples))
+            self.memory[rows, column] = np.fromiter((memory for _, _, memory in samples), dtype=np.float32,
+                                                    count=len(samples))
+            self.last_seen[rows] = self.scrapes
+
+            expired = np.flatnonzero((self.last_seen > 0) & (self.last_seen <= self.scrapes - self.capacity))
+            for row in expired:
+                del self._rows[self.keys[row]]
+                self.keys[row] = None
+                self.last_seen[row] = 0
+                self._free.append(int(row))
+
+    def window(self, seconds: float, namespace: str | None = None) -> tuple:
+        """
+        Copies out (keys, cpu, memory) for the scrapes of the last `seconds`,
+        optionally limited to one namespace.
+        """
+        with self._lock:
+            columns = np.flatnonzero(self.times >= time.time() - seconds)
+            rows = [row for key, row in self._rows.items() if namespace is None or key[0] == namespace]
+            keys = [self.keys[row] for row in rows]
+            selection = np.ix_(rows, columns)
+            return keys, self.cpu[selection], self.memory[selection]
+
+
+def nan_percentiles(values: np.ndarray, percentiles: tuple) -> tuple:
+    """
+    Row-wise percentiles (linear interpolation) and max ignoring NaN, via one
+    sort; np.nanpercentile loops over rows in Python and is ~100x slower here.
+    Every row must hold at least one value.
+    """
+    ordered = np.sort(values, axis=1)  # NaN sorts last
+    counts = np.count_nonzero(~np.isnan(values), axis=1)
+    rows = np.arange(len(values))
+    results = []
+    for percentile in percentiles:
+        position = (counts - 1) * (percentile / 100)
+        low = np.floor(position).astype(np.intp)
+        high = np.ceil(position).astype(np.intp)
+        results.append(ordered[rows, low] + (ordered[rows, high] - ordered[rows, low]) * (position - low))
+    return *results, ordered[rows, counts - 1]
+
+
+def window_stats(keys: list, cpu: np.ndarray, memory: np.ndarray, sort_by: str = "cpu", limit: int = 50) -> list:
+    """
+    p50/p95/max CPU (millicores) and memory (MiB) per series, computed over
+    all series in one pass, highest p95 of `sort_by` first.
+    """
+    samples = np.count_nonzero(~np.isnan(cpu), axis=1)
+    present = samples > 0
+    if not present.any():
+        return []
+    keys = [key for key, keep in zip(keys, present) if keep]
+    cpu, memory, samples = cpu[present], memory[present], samples[present]
+    cpu_p50, cpu_p95, cpu_max = (values * 1000 for values in nan_percentiles(cpu, (50, 95)))
+    memory_p50, memory_p95, memory_max = (values / 2 ** 20 for values in nan_percentiles(memory, (50, 95)))
+
+    order = np.argsort(-(memory_p95 if sort_by == "memory" else cpu_p95), kind="stable")[:limit]
+    return [
+        {
+            "namespace": keys[i][0],
+            "name": keys[i][1],
+            "samples": int(samples[i]),
+            "cpu_p50_m": round(float(cpu_p50[i]), 1),
+            "cpu_p95_m": round(float(cpu_p95[i]), 1),
+            "cpu_max_m": round(float(cpu_max[i]), 1),
+            "memory_p50_mib": round(float(memory_p50[i]), 1),
+            "memory_p95_mib": round(float(memory_p95[i]), 1),
+            "memory_max_mib": round(float(memory_max[i]), 1),
+        }
+        for i in order
+    ]
+
+
+class MetricsSampler:
+    def __init__(self, client: KubeClient, interval: float = SAMPLE_INTERVAL_SECONDS, capacity: int = SAMPLES_KEPT):
+        self.client = client
+        self.interval = interval
+        self.buffers = {"nodes": SeriesBuffer(capacity), "pods": SeriesBuffer(capacity)}
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def sample(self):
+        now = time.time()
+        for kind, resource in (("nodes", "nodemetrics"), ("pods", "podmetrics")):
+            items = self.client.list(resource).get("items", [])
+            self.buffers[kind].add(now, [(series_key(item), *usage(item)) for item in items])
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+                self.last_error = None
+            except (KubeAPIError, KeyError, ValueError) as e:
+                # Typically metrics-server is missing; log once, keep retrying.
+                if self.last_error is None:
+                    logger.warning("metrics.k8s.io sampling failed, retrying every %ss: %s", self.interval, e)
+                self.last_error = str(e)
+            if self._stop.wait(self.interval):
+                return
+
+
+_sampler = None
+
+
+def start_sampler(client: KubeClient):
+    """
+    Starts the background sampler (no-op when OKE_MCP_METRICS_INTERVAL is 0 or there is no API client).
+    """
+    global _sampler
+    if SAMPLE_INTERVAL_SECONDS <= 0 or client is None or _sampler is not None:
+        return
+    _sampler = MetricsSampler(client)
+    _sampler.start()
+
+
+def usage_stats(kind: str, seconds: float, namespace: str | None = None, sort_by: str = "cpu",
+                limit: int = 50) -> list | None:
+    """
+    Window statistics for "nodes" or "pods"; None when the sampler is not running.
+    """
+    if _sampler is None:
+        return None
+    keys, cpu, memory = _sampler.buffers[kind].window(seconds, namespace)
+    return window_stats(keys, cpu, memory, sort_by, limit)
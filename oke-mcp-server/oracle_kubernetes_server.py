@@ -1,200 +1,1369 @@
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import TextContent
+import yaml
 
-import subprocess
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlencode
 
-mcp = FastMCP("OKE Diagnostic Server")
+from deployment_config import config_watcher
+from deployment_updater import apply_plan, plan_updates, summarize as summarize_plan
+from event_aggregator import EventAggregator, is_newer
+from field_projection import project
+from helm_queue import HelmQueue, HelmRelease, helm_command
+from k8s_client import (
+    RESOURCES, KubeAPIError, aget_client, context_namespace, current_context, get_client, list_contexts,
+    resource_path
+)
+from kubectl_args import MAX_BYTES as GENERIC_MAX_BYTES, MAX_SECONDS as GENERIC_MAX_SECONDS
+from kubectl_args import KubectlCommand, api_resource, check_allowed, parse as parse_kubectl
+from metrics_sampler import start_sampler, usage, usage_stats
+from output_buffer import BoundedOutput, collect, read_chunks
+from pod_remediation import plan_restarts, summarize as summarize_restarts
+from port_forward import port_forwards
+from response_cache import cached_response, response_cache
+from rollout_tracker import FIRST_STATUS_SECONDS, RolloutTracker
+from server_metrics import ToolCall, record_backend_call, registry as metrics_registry, start_metrics_server
+from summaries import summarize_nodes, summarize_pods, top_events
+from tool_result import CommandError, dumps, enveloped, error_message, mark_cache_hit, mark_truncated
+from watch_cache import cached_list, start_informers
 
-def run_command(cmd: list) -> str:
+logger = logging.getLogger(__name__)
+
+class InstrumentedFastMCP(FastMCP):
+    """
+    FastMCP server whose tools all return a ToolResult envelope, sent as
+    structured content plus one compact JSON text block, and that records
+    latency, response size, errors and backend calls of every tool call in
+    server_metrics.
+    """
+
+    def tool(self, *args, **kwargs):
+        register = super().tool(*args, **kwargs)
+
+        def decorator(fn):
+            register(enveloped(fn))
+            return fn
+        return decorator
+
+    async def call_tool(self, name: str, arguments: dict):
+        with ToolCall(name) as call:
+            # The raw envelope is serialized once here; FastMCP's default conversion
+            # would validate it and pretty-print it again as the text content.
+            result = await self._tool_manager.call_tool(
+                name, arguments, context=self.get_context(), convert_result=False
+            )
+            text = dumps(result)
+            call.output(len(text.encode()), result["status"] == "error")
+        return [TextContent(type="text", text=text)], result
+
+mcp = InstrumentedFastMCP("OKE Diagnostic Server")
+
+# kubectl_generic calls answered through the API client: the flags each verb
+# may carry, and the -o formats of get ("" is the default table).
+GENERIC_GET_FLAGS = frozenset({"--namespace", "--all-namespaces", "--selector", "--field-selector",
+                               "--output", "--context"})
+GENERIC_DESCRIBE_FLAGS = GENERIC_GET_FLAGS - {"--output"}
+GENERIC_TOP_FLAGS = frozenset({"--namespace", "--all-namespaces", "--selector", "--context"})
+GENERIC_API_OUTPUTS = ("", "wide", "json", "yaml", "name")
+
+# Annotation Helm 3 sets on every object it manages.
+HELM_RELEASE_ANNOTATION = "meta.helm.sh/release-name"
+
+# Default response budget for format="summary" (roughly 4 bytes per token).
+SUMMARY_MAX_BYTES = 16000
+# Default caps for streamed exec / log output.
+STREAM_MAX_BYTES = 64000
+STDERR_MAX_BYTES = 4000
+# get_events(format="aggregate"): events per LIST page, and how long an
+# incremental poll reads the resumed watch: up to EVENT_WATCH_CONNECT_SECONDS for
+# the API server to accept it, then until the stream is quiet for the idle time.
+EVENT_PAGE_SIZE = 500
+EVENT_WATCH_SECONDS = 10
+EVENT_WATCH_CONNECT_SECONDS = 10
+EVENT_WATCH_IDLE_SECONDS = 0.5
+
+# Max concurrent calls per tool class, so a burst of slow describes or helm
+# upgrades cannot starve the cheap read tools of backend capacity.
+# Override with OKE_MCP_CONCURRENCY="describe=2,helm=1".
+CONCURRENCY_LIMITS = {
+    "read": 32,
+    "describe": 4,
+    "rollout": 16,
+    "mutate": 8,
+    "exec": 8,
+    "helm": 4,
+    "generic": 8,
+}
+for _entry in filter(None, os.environ.get("OKE_MCP_CONCURRENCY", "").split(",")):
+    _tool_class, _, _limit = _entry.partition("=")
+    _tool_class = _tool_class.strip()
+    try:
+        if _tool_class not in CONCURRENCY_LIMITS:
+            raise ValueError(f"unknown tool class (known: {', '.join(CONCURRENCY_LIMITS)})")
+        if int(_limit) < 1:
+            raise ValueError("limit must be at least 1")
+        CONCURRENCY_LIMITS[_tool_class] = int(_limit)
+    except ValueError as e:
+        logger.warning("Ignoring OKE_MCP_CONCURRENCY entry %r: %s", _entry, e)
+_semaphores = {name: asyncio.Semaphore(limit) for name, limit in CONCURRENCY_LIMITS.items()}
+
+def limit_concurrency(tool_class: str):
+    """
+    Caps how many calls of one tool class run at once; extra calls wait their turn
+    without blocking the event loop.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            async with _semaphores[tool_class]:
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+async def run_command(cmd: list) -> str:
+    """
+    Runs a command and returns its stdout. Raises CommandError when it cannot
+    be started or exits non-zero.
+    """
+    record_backend_call("subprocess")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError as e:
+        raise CommandError(str(e)) from e
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise CommandError(stderr.decode().strip() or f"{cmd[0]} exited with {process.returncode}",
+                           process.returncode)
+    return stdout.decode().strip()
+
+async def stream_command(cmd: list, max_bytes: int, max_seconds: float) -> str:
+    """
+    Runs a command while streaming its stdout through a bounded buffer: only the
+    head and tail within max_bytes are kept, and the command is killed after
+    max_seconds. Failures raise CommandError like run_command.
+    """
+    record_backend_call("subprocess")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError as e:
+        raise CommandError(str(e)) from e
+    stderr_task = asyncio.create_task(collect(read_chunks(process.stderr), STDERR_MAX_BYTES, max_seconds))
+    output = await collect(read_chunks(process.stdout), max_bytes, max_seconds)
+    if output.timed_out and process.returncode is None:
+        process.kill()
+    stderr = await stderr_task
+    await process.wait()
+    if process.returncode != 0 and not output.timed_out:
+        raise CommandError(stderr.render() or f"{cmd[0]} exited with {process.returncode}", process.returncode)
+    if output.truncated:
+        mark_truncated()
+    return output.render(max_seconds)
+
+def kubectl(*args: str, context: str | None = None) -> list:
+    """
+    Builds a kubectl command line, pinned to a kubeconfig context when one is given.
+    """
+    return ["kubectl", *(["--context", context] if context else []), *args]
+
+def parse_duration(value: str) -> int:
+    """
+    Converts a kubectl-style duration such as "30s", "5m" or "1h30m" to seconds.
+    """
+    parts = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?", value.strip())
+    if not value.strip() or parts is None:
+        raise ValueError(f"invalid duration {value!r}, expected e.g. 30s, 5m, 1h")
+    hours, minutes, seconds = (int(part or 0) for part in parts.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+async def list_resource(client, tool: str, resource: str, namespace: str | None = None,
+                        query: dict | None = None) -> dict:
+    """
+    Lists a resource from the watch cache when it is running and fresh enough
+    for the calling tool, otherwise straight from the API server.
+    Selector and pagination queries, and clients for other contexts than the
+    current one, always go to the API server.
+    """
+    if not query and client.context is None:
+        # Off the event loop: copying a large store or a forced re-LIST must not stall other tools.
+        cached = await asyncio.to_thread(cached_list, tool, resource, namespace)
+        if cached is not None:
+            mark_cache_hit()
+            return cached
+    return await client.alist(resource, namespace, **(query or {}))
+
+def list_query(label_selector: str | None = None, field_selector: str | None = None,
+               limit: int | None = None, continue_token: str | None = None) -> dict:
+    """
+    Maps tool arguments to LIST query parameters, dropping the unset ones.
+    """
+    query = {
+        "labelSelector": label_selector,
+        "fieldSelector": field_selector,
+        "limit": limit,
+        "continue": continue_token,
+    }
+    return {key: value for key, value in query.items() if value}
+
+async def fetch_list(tool: str, resource: str, namespace: str | None = None, query: dict | None = None,
+                     context: str | None = None) -> dict:
+    """
+    Runs a filtered/paginated LIST through the API client, or through
+    `kubectl get --raw` when only kubectl is available.
+    Raises KubeAPIError or CommandError on failure.
+    """
+    client = await aget_client(context)
+    if client is not None:
+        return await list_resource(client, tool, resource, namespace, query)
+    path = resource_path(resource, namespace)
+    if query:
+        path += "?" + urlencode(query)
+    return json.loads(await run_command(kubectl("get", "--raw", path, context=context)))
+
+async def list_deployments(namespace: str, context: str | None = None) -> dict:
+    return await fetch_list("kubectl_rollout", "deployments", namespace, context=context)
+
+rollouts = RolloutTracker(list_deployments)
+
+async def track_release_rollouts(job):
+    """
+    Starts tracking the rollout of every deployment in a release that was just
+    installed or upgraded.
+    """
+    if job.operation == "uninstall":
+        return
+    deployments = await list_deployments(job.namespace)
+    job.rollout_ids = [
+        rollouts.track(job.namespace, item["metadata"]["name"]).id
+        for item in deployments.get("items", [])
+        if item["metadata"].get("annotations", {}).get(HELM_RELEASE_ANNOTATION) == job.release
+    ]
+
+helm_jobs = HelmQueue(run_command, _semaphores["helm"], on_success=track_release_rollouts)
+
+async def helm_job_results(jobs: list, wait_seconds: float) -> list:
+    """
+    Waits up to wait_seconds for the jobs, then for the rollouts they started
+    within what is left, and describes each job with its rollout progress.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    await asyncio.gather(*(job.wait(wait_seconds) for job in jobs))
+    tracked = {rollout_id: rollouts.get(rollout_id) for job in jobs for rollout_id in job.rollout_ids}
+    progress = await rollouts.wait_all([rollout for rollout in tracked.values() if rollout is not None],
+                                       max(0.0, deadline - loop.time()))
+    by_id = {entry["rollout_id"]: entry for entry in progress}
+    return [
+        job.describe() | {"rollouts": [by_id[rollout_id] for rollout_id in job.rollout_ids if rollout_id in by_id]}
+        for job in jobs
+    ]
+
+async def list_new_events(aggregator: EventAggregator, namespace: str | None, query: dict,
+                          context: str | None, since_resource_version: str | None) -> str:
+    """
+    Feeds every matching event changed after since_resource_version (all of
+    them without it) to the aggregator, EVENT_PAGE_SIZE events per request.
+    Returns the list's resourceVersion, the cursor for the next poll.
+    """
+    page_query = {"limit": EVENT_PAGE_SIZE} | query
+    cursor = None
+    while True:
+        page = await fetch_list("get_events", "events", namespace, page_query, context)
+        cursor = cursor or page.get("metadata", {}).get("resourceVersion")
+        for event in page.get("items", []):
+            if is_newer(event, since_resource_version):
+                aggregator.add(event)
+        page_query["continue"] = page.get("metadata", {}).get("continue")
+        if not page_query["continue"]:
+            return cursor
+
+async def watch_new_events(client, aggregator: EventAggregator, namespace: str | None, query: dict,
+                           since_resource_version: str) -> str:
+    """
+    Feeds the events created or changed after since_resource_version to the
+    aggregator from a WATCH resumed there, until the stream goes quiet.
+    Returns the resourceVersion of the last event seen, the next cursor.
+    Raises KubeAPIError with status 410 when the cursor is too old, and
+    asyncio.TimeoutError when the API server does not accept the watch within
+    EVENT_WATCH_CONNECT_SECONDS.
+    """
+    cursor = since_resource_version
+    connected = asyncio.Event()
+    stream = client.awatch("events", since_resource_version, namespace,
+                           timeout_seconds=EVENT_WATCH_SECONDS, connected=connected, **query)
+    step = None
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        return f"Error: {e.stderr.strip()}"
+        while True:
+            step = asyncio.ensure_future(anext(stream))
+            if not connected.is_set():
+                # Connecting is bounded separately, so a slow API server is not mistaken for a quiet stream.
+                waiter = asyncio.ensure_future(connected.wait())
+                await asyncio.wait((step, waiter), timeout=EVENT_WATCH_CONNECT_SECONDS,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if not step.done() and not connected.is_set():
+                    raise asyncio.TimeoutError(f"events watch not accepted within {EVENT_WATCH_CONNECT_SECONDS}s")
+            done, _ = await asyncio.wait((step,), timeout=EVENT_WATCH_IDLE_SECONDS)
+            if not done:
+                return cursor
+            try:
+                event = step.result()
+            except StopAsyncIteration:
+                return cursor
+            cursor = event["object"].get("metadata", {}).get("resourceVersion") or cursor
+            if event["type"] in ("ADDED", "MODIFIED"):
+                aggregator.add(event["object"])
+    finally:
+        if step is not None and not step.done():
+            step.cancel()
+            await asyncio.gather(step, return_exceptions=True)
+        await stream.aclose()
+
+async def aggregate_events(namespace: str | None, query: dict, context: str | None,
+                           since_resource_version: str | None, max_groups: int) -> dict:
+    """
+    Groups events by object, reason and message template (see event_aggregator),
+    Warnings and the most frequent first. With since_resource_version only
+    events created or changed after that cursor are fetched.
+    """
+    aggregator = EventAggregator()
+    cursor = None
+    client = await aget_client(context)
+    if since_resource_version and client is not None:
+        try:
+            cursor = await watch_new_events(client, aggregator, namespace, query, since_resource_version)
+        except (KubeAPIError, asyncio.TimeoutError) as e:
+            if isinstance(e, KubeAPIError) and e.status_code != 410:
+                raise
+            # The cursor has been compacted away, or the watch did not start in time:
+            # list everything changed after it instead.
+            aggregator = EventAggregator()
+    if cursor is None:
+        cursor = await list_new_events(aggregator, namespace, query, context, since_resource_version)
+    groups = aggregator.groups()
+    if len(groups) > max_groups:
+        mark_truncated()
+    return {
+        "resource_version": cursor,
+        "events": aggregator.events,
+        "groups": groups[:max_groups],
+        "more_groups": max(0, len(groups) - max_groups),
+    }
+
+def format_list(data: dict, fields: str | None = None) -> dict:
+    """
+    Reduces a LIST response to the requested fields when given.
+    The continue token is kept so the caller can fetch the next page.
+    """
+    if not fields:
+        return data
+    metadata = data.get("metadata", {})
+    page = {"items": project(data.get("items", []), fields)}
+    if metadata.get("continue"):
+        page["continue"] = metadata["continue"]
+        page["remainingItemCount"] = metadata.get("remainingItemCount")
+    return page
+
+async def available_contexts() -> list:
+    contexts = list_contexts()
+    if contexts is None:
+        contexts = (await run_command(["kubectl", "config", "get-contexts", "-o", "name"])).split()
+    return contexts
+
+async def fan_out(per_cluster, contexts: list[str] | None = None, all_contexts: bool = False):
+    """
+    Runs `per_cluster(context)` against every requested kubeconfig context at
+    once and merges the results with a cluster label, so a fleet-wide query
+    takes as long as the slowest cluster. Without contexts it runs once against
+    the current context and returns that result unchanged.
+    """
+    if all_contexts:
+        contexts = await available_contexts()
+    if not contexts:
+        return await per_cluster(None)
+    contexts = list(dict.fromkeys(contexts))
+    results = await asyncio.gather(*(per_cluster(context) for context in contexts), return_exceptions=True)
+    return merge_cluster_results(dict(zip(contexts, results)))
+
+def merge_cluster_results(results: dict) -> dict:
+    """
+    Merges per-cluster results. LIST responses are combined into one item list
+    where every item carries a "cluster" field, with page tokens under
+    "continue"; anything else is returned per cluster under "clusters".
+    Failed clusters are reported under "errors"; if every cluster failed, the
+    first error is raised.
+    """
+    failed = {context: result for context, result in results.items() if isinstance(result, Exception)}
+    succeeded = {context: result for context, result in results.items() if context not in failed}
+    if not succeeded:
+        raise next(iter(failed.values()))
+
+    if all(isinstance(result, dict) and isinstance(result.get("items"), list) for result in succeeded.values()):
+        merged = {"items": [
+            item | {"cluster": context} for context, page in succeeded.items() for item in page["items"]
+        ]}
+        tokens = {
+            context: page.get("continue") or page.get("metadata", {}).get("continue")
+            for context, page in succeeded.items()
+        }
+        if any(tokens.values()):
+            merged["continue"] = {context: token for context, token in tokens.items() if token}
+    else:
+        merged = {"clusters": succeeded}
+    if failed:
+        merged["errors"] = {context: error_message(error) for context, error in failed.items()}
+    return merged
+
+def _age(timestamp: str) -> str:
+    """
+    Formats an RFC 3339 timestamp as a kubectl-style age (e.g. 42s, 5m, 3h, 2d).
+    """
+    if not timestamp:
+        return "<unknown>"
+    seconds = int((datetime.now(timezone.utc) - datetime.fromisoformat(timestamp)).total_seconds())
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{max(seconds, 0)}s"
+
+def _event_time(event: dict) -> str:
+    return event.get("lastTimestamp") or event.get("eventTime") or event["metadata"].get("creationTimestamp") or ""
+
+def format_events(events: list, namespace: str) -> str:
+    """
+    Renders events as the table printed by `kubectl get events --sort-by=.lastTimestamp`.
+    """
+    if not events:
+        return f"No resources found in {namespace} namespace." if namespace else "No resources found."
+    rows = [("LAST SEEN", "TYPE", "REASON", "OBJECT", "MESSAGE")]
+    for event in sorted(events, key=_event_time):
+        obj = event.get("involvedObject", {})
+        rows.append((
+            _age(_event_time(event)),
+            event.get("type", ""),
+            event.get("reason", ""),
+            f"{obj.get('kind', '').lower()}/{obj.get('name', '')}",
+            (event.get("message") or "").strip(),
+        ))
+    return render_columns(rows)
+
+def format_top(items: list, namespaced: bool) -> str:
+    """
+    Renders NodeMetrics/PodMetrics items as the table printed by `kubectl top`.
+    """
+    if not items:
+        return "No resources found."
+    rows = [("NAMESPACE", "NAME", "CPU(cores)", "MEMORY(bytes)")]
+    for item in sorted(items, key=lambda item: (item["metadata"].get("namespace", ""), item["metadata"]["name"])):
+        cpu, memory = usage(item)
+        rows.append((item["metadata"].get("namespace", ""), item["metadata"]["name"],
+                     f"{round(cpu * 1000)}m", f"{round(memory / 2 ** 20)}Mi"))
+    if not namespaced:
+        rows = [row[1:] for row in rows]
+    return render_columns(rows)
+
+def render_columns(rows: list) -> str:
+    """
+    Aligns rows of cells into kubectl-style columns, three spaces apart.
+    """
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]) - 1)]
+    return "\n".join(
+        "   ".join(cell.ljust(width) for cell, width in zip(row, widths)) + "   " + row[-1]
+        for row in rows
+    )
+
+def format_table(table: dict, wide: bool, all_namespaces: bool, empty_message: str) -> str:
+    """
+    Renders a meta.k8s.io Table as `kubectl get` prints it: priority columns
+    only with -o wide, a NAMESPACE column with --all-namespaces, and date
+    columns as ages.
+    """
+    if not table.get("rows"):
+        return empty_message
+    definitions = table["columnDefinitions"]
+    columns = [index for index, column in enumerate(definitions) if wide or not column.get("priority")]
+    rows = [[definitions[index]["name"].upper() for index in columns]]
+    for row in table["rows"]:
+        cells = []
+        for index in columns:
+            value = row["cells"][index]
+            if definitions[index].get("format") == "date" and value:
+                value = _age(value)
+            cells.append("<none>" if value in (None, "") else str(value))
+        if all_namespaces:
+            cells.insert(0, row.get("object", {}).get("metadata", {}).get("namespace", ""))
+        rows.append(cells)
+    if all_namespaces:
+        rows[0].insert(0, "NAMESPACE")
+    return render_columns(rows)
+
+def bounded_text(text: str, max_bytes: int) -> str:
+    """
+    Keeps the head and tail of text within max_bytes, like streamed command output.
+    """
+    output = BoundedOutput(max_bytes)
+    output.write(text.encode())
+    if output.truncated:
+        mark_truncated()
+    return output.render()
+
+def bounded_items(data: dict, max_bytes: int) -> dict:
+    """
+    Drops the list items that do not fit in max_bytes of JSON and reports how
+    many were left out as remainingItemCount.
+    """
+    items = data.get("items")
+    if items is None:
+        return data
+    used = 0
+    for index, item in enumerate(items):
+        used += len(dumps(item))
+        if used > max_bytes:
+            mark_truncated()
+            metadata = data.get("metadata", {}) | {"remainingItemCount": len(items) - index}
+            return data | {"items": items[:index], "metadata": metadata}
+    return data
+
+def qualified_names(data: dict, resource: str) -> str:
+    """
+    Lists objects as `kubectl get -o name` does, e.g. pod/web-0 or deployment.apps/web.
+    """
+    prefix, _, _, kind = RESOURCES[resource]
+    group = prefix.split("/")[2] if prefix.startswith("/apis/") else ""
+    qualified = f"{kind.lower()}.{group}" if group else kind.lower()
+    items = data["items"] if "items" in data else [data]
+    return "\n".join(f"{qualified}/{item['metadata']['name']}" for item in items)
+
+def generic_namespace(command: KubectlCommand) -> str | None:
+    """
+    Namespace a parsed kubectl call addresses: None for --all-namespaces,
+    otherwise -n or the context's default namespace.
+    """
+    if command.flags.get("--all-namespaces"):
+        return None
+    return command.flags.get("--namespace") or context_namespace(command.flags.get("--context"))
+
+async def generic_get(client, command: KubectlCommand, resource: str, max_bytes: int) -> dict | str:
+    """
+    Answers `kubectl get` from the API: tables through server-side printing,
+    -o json/yaml/name from the watch cache or a LIST.
+    """
+    context = command.flags.get("--context")
+    namespace = generic_namespace(command)
+    output = command.flags.get("--output", "")
+    query = list_query(command.flags.get("--selector"), command.flags.get("--field-selector"))
+    if output in ("", "wide"):
+        if command.names:
+            tables = await asyncio.gather(*(client.atable(resource, namespace, name) for name in command.names))
+            table = tables[0] | {"rows": [row for part in tables for row in part.get("rows", [])]}
+        else:
+            table = await client.atable(resource, namespace, **query)
+        namespaced = RESOURCES[resource][2]
+        empty = f"No resources found in {namespace} namespace." if namespaced and namespace else "No resources found"
+        return bounded_text(format_table(table, output == "wide", namespaced and namespace is None, empty), max_bytes)
+
+    if command.names:
+        objects = await asyncio.gather(*(client.aread(resource, name, namespace) for name in command.names))
+        data = objects[0] if len(objects) == 1 else {"apiVersion": "v1", "kind": "List", "items": list(objects)}
+    else:
+        data = await fetch_list("kubectl_generic", resource, namespace, query, context)
+    if output == "name":
+        return bounded_text(qualified_names(data, resource), max_bytes)
+    if output == "yaml":
+        return bounded_text(yaml.safe_dump(data, sort_keys=False), max_bytes)
+    return bounded_items(data, max_bytes)
+
+async def generic_describe(client, command: KubectlCommand, resource: str, max_bytes: int) -> dict:
+    """
+    Answers `kubectl describe` from the API with what it prints: each object
+    (without managedFields) and its most frequent events.
+    """
+    context = command.flags.get("--context")
+    namespace = generic_namespace(command)
+    _, _, namespaced, kind = RESOURCES[resource]
+    if command.names:
+        objects = asyncio.gather(*(client.aread(resource, name, namespace) for name in command.names))
+    else:
+        query = list_query(command.flags.get("--selector"), command.flags.get("--field-selector"))
+        objects = fetch_list("kubectl_generic", resource, namespace, query, context)
+    objects, events = await asyncio.gather(
+        objects, fetch_list("kubectl_generic", "events", namespace if namespaced else None, context=context)
+    )
+    if isinstance(objects, dict):
+        objects = objects["items"]
+    by_object = top_events(events["items"])
+    items = []
+    for obj in objects:
+        # Copied, not popped: listed objects may be the watch cache's own.
+        metadata = {key: value for key, value in obj["metadata"].items() if key != "managedFields"}
+        key = (kind, metadata.get("namespace", "") if namespaced else "", metadata["name"])
+        items.append({"object": obj | {"metadata": metadata}, "events": by_object.get(key, "-")})
+    return bounded_items({"items": items}, max_bytes)
+
+async def generic_top(client, command: KubectlCommand, resource: str, max_bytes: int) -> str:
+    """
+    Answers `kubectl top pods|nodes` from the metrics.k8s.io API.
+    """
+    namespaced = resource == "pods"
+    query = list_query(command.flags.get("--selector"))
+    data = await client.alist("podmetrics" if namespaced else "nodemetrics", generic_namespace(command), **query)
+    items = [item for item in data.get("items", []) if not command.names or item["metadata"]["name"] in command.names]
+    return bounded_text(format_top(items, namespaced), max_bytes)
 
 # ----------------------- MCP Tools -----------------------
 
 @mcp.tool()
-def get_nodes() -> str:
+@limit_concurrency("read")
+async def get_nodes(
+    format: str = "json",
+    max_bytes: int = SUMMARY_MAX_BYTES,
+    contexts: list[str] | None = None,
+    all_contexts: bool = False
+) -> dict | str:
     """
     Returns a list of all Kubernetes nodes in JSON format.
+
+    Args:
+        format: "json" for the full node objects, or "summary" for a compact table
+            (name, status, kubelet version, abnormal conditions), unhealthy nodes first.
+        max_bytes: Size cap for the summary; extra rows are cut with a truncation note.
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "get", "nodes", "-o", "json"])
+    async def nodes(context: str | None) -> dict | str:
+        if format == "summary":
+            nodes = await fetch_list("get_nodes", "nodes", context=context)
+            return summarize_nodes(nodes["items"], max_bytes)
+
+        client = await aget_client(context)
+        if client is None:
+            return json.loads(await run_command(kubectl("get", "nodes", "-o", "json", context=context)))
+        return await list_resource(client, "get_nodes", "nodes")
+    return await fan_out(nodes, contexts, all_contexts)
 
 @mcp.tool()
-def get_all_pods() -> str:
+@limit_concurrency("read")
+async def get_all_pods(
+    namespace: str | None = None,
+    label_selector: str | None = None,
+    field_selector: str | None = None,
+    fields: str | None = None,
+    limit: int | None = None,
+    continue_token: str | None = None,
+    format: str = "json",
+    max_bytes: int = SUMMARY_MAX_BYTES,
+    contexts: list[str] | None = None,
+    all_contexts: bool = False
+) -> dict | str:
     """
     Returns a list of all pods across all namespaces.
+    Filters are applied by the API server, so narrow queries return small results.
+
+    Args:
+        namespace: Only list pods in this namespace (default: all namespaces).
+        label_selector: Label selector, e.g. "app=nginx,tier!=cache".
+        field_selector: Field selector, e.g. "status.phase!=Running,spec.nodeName=10.0.0.5".
+        fields: Comma-separated JSONPath fields to return per pod,
+            e.g. "metadata.name,status.phase,spec.containers[*].image".
+        limit: Maximum number of pods to return in this page.
+        continue_token: Token from a previous page's "continue" to fetch the next page.
+        format: "json" for pod objects, or "summary" for a compact table (status, readiness,
+            restarts, failing conditions), unhealthy pods first. fields is ignored in summary mode.
+        max_bytes: Size cap for the summary; extra rows are cut with a truncation note.
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "get", "pods", "--all-namespaces", "-o", "json"])
+    query = list_query(label_selector, field_selector, limit, continue_token)
+
+    async def pods(context: str | None) -> dict | str:
+        client = await aget_client(context)
+        if client is None and namespace is None and not query and not fields and format != "summary":
+            return json.loads(
+                await run_command(kubectl("get", "pods", "--all-namespaces", "-o", "json", context=context))
+            )
+
+        data = await fetch_list("get_all_pods", "pods", namespace, query, context)
+        if format == "summary":
+            return summarize_pods(data["items"], max_bytes)
+        return format_list(data, fields)
+    return await fan_out(pods, contexts, all_contexts)
 
 @mcp.tool()
-def get_all_services() -> str:
+@limit_concurrency("read")
+async def get_all_services(contexts: list[str] | None = None, all_contexts: bool = False) -> dict:
     """
     Returns a list of all services across all namespaces.
+
+    Args:
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "get", "svc", "--all-namespaces", "-o", "json"])
+    async def services(context: str | None) -> dict:
+        client = await aget_client(context)
+        if client is None:
+            return json.loads(
+                await run_command(kubectl("get", "svc", "--all-namespaces", "-o", "json", context=context))
+            )
+        return await list_resource(client, "get_all_services", "services")
+    return await fan_out(services, contexts, all_contexts)
 
 @mcp.tool()
-def describe_nodes() -> str:
+@limit_concurrency("describe")
+async def describe_nodes(
+    format: str = "text",
+    max_bytes: int = SUMMARY_MAX_BYTES,
+    contexts: list[str] | None = None,
+    all_contexts: bool = False
+) -> dict | str:
     """
     Describes all nodes in the cluster.
+
+    Args:
+        format: "text" for full `kubectl describe` output, or "summary" for one row per
+            node with abnormal conditions and its most frequent events.
+        max_bytes: Size cap for the summary; extra rows are cut with a truncation note.
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "describe", "nodes"])
+    async def describe(context: str | None) -> str:
+        if format == "summary":
+            nodes, events = await asyncio.gather(
+                fetch_list("describe_nodes", "nodes", context=context),
+                fetch_list("describe_nodes", "events", context=context),
+            )
+            return summarize_nodes(nodes["items"], max_bytes, events["items"])
+        return await run_command(kubectl("describe", "nodes", context=context))
+    return await fan_out(describe, contexts, all_contexts)
 
 @mcp.tool()
-def describe_pods() -> str:
+@limit_concurrency("describe")
+async def describe_pods(
+    format: str = "text",
+    max_bytes: int = SUMMARY_MAX_BYTES,
+    contexts: list[str] | None = None,
+    all_contexts: bool = False
+) -> dict | str:
     """
     Describes all pods in the cluster.
+
+    Args:
+        format: "text" for full `kubectl describe` output, or "summary" for one row per
+            pod (status, readiness, restarts, failing conditions, top events).
+        max_bytes: Size cap for the summary; extra rows are cut with a truncation note.
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "describe", "pods", "--all-namespaces"])
+    async def describe(context: str | None) -> str:
+        if format == "summary":
+            pods, events = await asyncio.gather(
+                fetch_list("describe_pods", "pods", context=context),
+                fetch_list("describe_pods", "events", context=context),
+            )
+            return summarize_pods(pods["items"], max_bytes, events["items"])
+        return await run_command(kubectl("describe", "pods", "--all-namespaces", context=context))
+    return await fan_out(describe, contexts, all_contexts)
 
 @mcp.tool()
-def kubectl_rollout(deployment: str, namespace: str = "default") -> str:
+@limit_concurrency("rollout")
+async def kubectl_rollout(deployment: str, namespace: str = "default", wait_seconds: float = 0) -> dict:
     """
-    Gets rollout status for a deployment.
-    
+    Gets rollout status for a deployment without blocking until it finishes.
+
+    Starts tracking the rollout (or joins one of the same deployment already
+    being tracked) and returns its progress with a rollout_id as soon as the
+    deployment's current status is known; poll it with rollout_status.
+
     Args:
         deployment: The name of the deployment.
         namespace: The namespace (default is 'default').
+        wait_seconds: Wait up to this long for the rollout to finish before returning.
+    """
+    rollout = rollouts.track(namespace, deployment)
+    first_status_seconds = max(wait_seconds, FIRST_STATUS_SECONDS)
+    if not await rollout.first_status(first_status_seconds):
+        raise ToolError(
+            f"No status for deployment {namespace}/{deployment} after {first_status_seconds:g}s "
+            f"(rollout_id {rollout.id}, still tracked): {rollout.error or 'the API server did not answer'}"
+        )
+    if rollout.missing:
+        raise ToolError(f"Deployment {namespace}/{deployment} not found")
+    await rollout.wait(wait_seconds)
+    return rollout.describe()
+
+@mcp.tool()
+@limit_concurrency("rollout")
+async def rollout_status(rollout_ids: list[str] | None = None, wait_seconds: float = 0) -> list:
+    """
+    Returns the progress of tracked rollouts: state ("progressing", "complete",
+    "failed" or "timed_out"), the `kubectl rollout status` message and replica counts.
+
+    Args:
+        rollout_ids: Rollouts to report, as returned by kubectl_rollout,
+            update_deployments_from_config or upgrade_helm_chart. Omit for
+            every rollout tracked in the last hour.
+        wait_seconds: Wait up to this long for all of them to finish.
     """
-    return run_command(["kubectl", "rollout", "status", f"deployment/{deployment}", "-n", namespace])
+    if rollout_ids is None:
+        selected = rollouts.list()
+    else:
+        selected = [rollouts.get(rollout_id) for rollout_id in rollout_ids]
+        unknown = [rollout_id for rollout_id, rollout in zip(rollout_ids, selected) if rollout is None]
+        if unknown:
+            raise ToolError(f"unknown rollout id(s): {', '.join(unknown)}")
+    return await rollouts.wait_all(selected, wait_seconds)
 
 @mcp.tool()
-def kubectl_context() -> str:
+@cached_response
+@limit_concurrency("read")
+async def kubectl_context(all_contexts: bool = False, cache_bypass: bool = False) -> list | str:
     """
     Returns the current Kubernetes context.
+
+    Args:
+        all_contexts: List every context in kubeconfig instead, as {name, current}
+            entries. Any of them can be passed to the read tools' `contexts` argument.
+        cache_bypass: Skip the cached response and query the cluster again.
     """
-    return run_command(["kubectl", "config", "current-context"])
+    active = current_context()
+    if active is None:
+        active = await run_command(["kubectl", "config", "current-context"])
+    if not all_contexts:
+        return active
+    return [{"name": context, "current": context == active} for context in await available_contexts()]
 
 @mcp.tool()
-def explain_resource(resource: str) -> str:
+@cached_response
+@limit_concurrency("read")
+async def explain_resource(resource: str, cache_bypass: bool = False) -> str:
     """
     Explains a Kubernetes resource.
 
     Args:
         resource: The name of the resource (e.g., pod, deployment).
+        cache_bypass: Skip the cached response and query the cluster again.
     """
-    return run_command(["kubectl", "explain", resource])
+    return await run_command(["kubectl", "explain", resource])
 
 @mcp.tool()
-def install_helm_chart(release: str, chart: str, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def install_helm_chart(
+    release: str,
+    chart: str,
+    namespace: str = "default",
+    atomic: bool = False,
+    wait: bool = False,
+    timeout: str = "5m",
+    wait_seconds: float = 0
+) -> dict:
     """
-    Installs a Helm chart.
+    Installs a Helm chart as a queued job and returns the job at once.
 
     Args:
         release: Name of the release.
         chart: Helm chart (e.g., bitnami/nginx).
         namespace: Kubernetes namespace (default is 'default').
+        atomic: Delete the release again if the install fails (implies wait).
+        wait: Let helm wait until the release's resources are ready.
+        timeout: How long helm waits for each Kubernetes operation (e.g. "5m").
+        wait_seconds: Wait up to this long for the job to finish before returning;
+            otherwise poll helm_job_status with the job_id.
+
+    Returns:
+        The job (id, state, command, output, error) and the rollout progress
+        of the release's deployments.
     """
-    return run_command(["helm", "install", release, chart, "-n", namespace])
+    command = helm_command("install", release, chart, namespace, atomic, wait, parse_duration(timeout))
+    return (await helm_job_results([helm_jobs.submit("install", release, namespace, command)], wait_seconds))[0]
 
 @mcp.tool()
-def upgrade_helm_chart(release: str, chart: str, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def upgrade_helm_chart(
+    release: str,
+    chart: str,
+    namespace: str = "default",
+    atomic: bool = False,
+    wait: bool = False,
+    timeout: str = "5m",
+    wait_seconds: float = 0
+) -> dict:
     """
-    Upgrades a Helm chart.
+    Upgrades a Helm chart as a queued job and returns the job at once. Once the
+    upgrade succeeds, the rollout of every deployment in the release is tracked.
 
     Args:
         release: Release name.
         chart: Updated chart version.
         namespace: Namespace of the release.
+        atomic: Roll back to the previous revision if the upgrade fails (implies wait).
+        wait: Let helm wait until the release's resources are ready.
+        timeout: How long helm waits for each Kubernetes operation (e.g. "5m").
+        wait_seconds: Wait up to this long for the job and then the rollouts to
+            finish before returning.
+
+    Returns:
+        The job (id, state, command, output, error) and one rollout entry per
+        deployment (see rollout_status).
     """
-    return run_command(["helm", "upgrade", release, chart, "-n", namespace])
+    command = helm_command("upgrade", release, chart, namespace, atomic, wait, parse_duration(timeout))
+    return (await helm_job_results([helm_jobs.submit("upgrade", release, namespace, command)], wait_seconds))[0]
 
 @mcp.tool()
-def uninstall_helm_chart(release: str, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def uninstall_helm_chart(
+    release: str,
+    namespace: str = "default",
+    wait: bool = False,
+    timeout: str = "5m",
+    wait_seconds: float = 0
+) -> dict:
     """
-    Uninstalls a Helm release.
+    Uninstalls a Helm release as a queued job and returns the job at once.
 
     Args:
         release: Release name.
         namespace: Namespace the release is deployed in.
+        wait: Let helm wait until the release's resources are deleted.
+        timeout: How long helm waits for each Kubernetes operation (e.g. "5m").
+        wait_seconds: Wait up to this long for the job to finish before returning.
+    """
+    command = helm_command("uninstall", release, None, namespace, wait=wait, timeout_seconds=parse_duration(timeout))
+    return (await helm_job_results([helm_jobs.submit("uninstall", release, namespace, command)], wait_seconds))[0]
+
+@mcp.tool()
+@limit_concurrency("mutate")
+async def helm_batch(
+    releases: list[HelmRelease],
+    atomic: bool = False,
+    wait: bool = False,
+    timeout: str = "5m",
+    wait_seconds: float = 0
+) -> list:
+    """
+    Upgrades many Helm releases in one call. Different releases are upgraded
+    concurrently (bounded by the helm worker limit); jobs for the same release
+    run one after the other.
+
+    Args:
+        releases: Releases to upgrade, as {"release", "chart", "namespace"}
+            (namespace defaults to 'default').
+        atomic: Roll back each release whose upgrade fails (implies wait).
+        wait: Let helm wait until each release's resources are ready.
+        timeout: How long helm waits for each Kubernetes operation (e.g. "5m").
+        wait_seconds: Wait up to this long for all jobs and their rollouts to finish.
+
+    Returns:
+        One job per release, in the order given (see upgrade_helm_chart).
+    """
+    if not releases:
+        raise ValueError("releases must not be empty")
+    timeout_seconds = parse_duration(timeout)
+    jobs = []
+    for entry in releases:
+        namespace = entry.get("namespace", "default")
+        command = helm_command("upgrade", entry["release"], entry["chart"], namespace, atomic, wait, timeout_seconds)
+        jobs.append(helm_jobs.submit("upgrade", entry["release"], namespace, command))
+    return await helm_job_results(jobs, wait_seconds)
+
+@mcp.tool()
+@limit_concurrency("read")
+async def helm_job_status(job_ids: list[str] | None = None, wait_seconds: float = 0) -> list:
+    """
+    Returns the state of queued Helm jobs: "queued", "running", "succeeded" or
+    "failed", with helm's output or error and the progress of any rollouts
+    the job started.
+
+    Args:
+        job_ids: Jobs to report. Omit for every job of the last hour.
+        wait_seconds: Wait up to this long for all of them to finish.
     """
-    return run_command(["helm", "uninstall", release, "-n", namespace])
+    if job_ids is None:
+        selected = helm_jobs.list()
+    else:
+        selected = [helm_jobs.get(job_id) for job_id in job_ids]
+        unknown = [job_id for job_id, job in zip(job_ids, selected) if job is None]
+        if unknown:
+            raise ToolError(f"unknown helm job id(s): {', '.join(unknown)}")
+    return await helm_job_results(selected, wait_seconds)
 
 @mcp.tool()
-def port_forward(pod: str, local_port: int, remote_port: int, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def port_forward(pod: str, local_port: int, remote_port: int, namespace: str = "default") -> dict:
     """
     Port-forwards from a local port to a pod port.
+    Starts the forward as a managed background session and returns its id.
+    If a live session already forwards the same pod and remote port, it is reused.
 
     Args:
         pod: Pod name.
-        local_port: Local machine port.
+        local_port: Local machine port (0 picks a free port).
         remote_port: Pod container port.
         namespace: Namespace where the pod exists.
     """
-    return f"kubectl port-forward pod/{pod} {local_port}:{remote_port} -n {namespace}"
+    try:
+        session, reused = await port_forwards.start(pod, local_port, remote_port, namespace)
+    except asyncio.TimeoutError:
+        raise ToolError(f"port-forward to pod/{pod} did not become ready in time")
+    except (OSError, RuntimeError) as e:
+        raise ToolError(str(e)) from e
+    return session.describe() | {"reused": reused}
 
 @mcp.tool()
-def stop_port_forward() -> str:
+async def list_port_forwards() -> list:
     """
-    Stops all ongoing port-forwarding sessions.
+    Lists the port-forward sessions started by this server.
+    Sessions whose kubectl process has exited are removed first.
     """
-    return run_command(["pkill", "-f", "kubectl port-forward"])
+    return port_forwards.list()
 
 @mcp.tool()
-def exec_in_pod(pod: str, command: str, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def stop_port_forward(session_id: str | None = None) -> str:
+    """
+    Stops a port-forward session started by this server, or all of them.
+
+    Args:
+        session_id: Session to stop (from port_forward / list_port_forwards).
+            Omit to stop every session this server started.
+    """
+    if session_id is None:
+        return f"Stopped {await port_forwards.stop_all()} port-forward session(s)."
+    if await port_forwards.stop(session_id):
+        return f"Stopped port-forward session {session_id}."
+    raise ToolError(f"no port-forward session with id {session_id}")
+
+@mcp.tool()
+@limit_concurrency("exec")
+async def exec_in_pod(
+    pod: str,
+    command: str,
+    namespace: str = "default",
+    max_bytes: int = STREAM_MAX_BYTES,
+    max_seconds: int = 60
+) -> str:
     """
     Executes a shell command in a specified pod.
+    Output is streamed; beyond max_bytes only the head and tail are returned,
+    with a marker showing how much was cut.
 
     Args:
         pod: Pod name.
         command: Shell command to run.
         namespace: Namespace where the pod exists.
+        max_bytes: Maximum output size returned.
+        max_seconds: Stop the command after this many seconds.
+    """
+    return await stream_command(
+        ["kubectl", "exec", pod, "-n", namespace, "--", "sh", "-c", command], max_bytes, max_seconds
+    )
+
+@mcp.tool()
+@limit_concurrency("exec")
+async def pod_logs(
+    pod: str,
+    namespace: str = "default",
+    container: str | None = None,
+    since: str | None = None,
+    tail_lines: int | None = None,
+    previous: bool = False,
+    max_bytes: int = STREAM_MAX_BYTES,
+    max_seconds: int = 30
+) -> str:
+    """
+    Returns logs of a pod's container.
+    Logs are streamed; beyond max_bytes only the head and tail are returned,
+    with a marker showing how much was cut.
+
+    Args:
+        pod: Pod name.
+        namespace: Namespace where the pod exists.
+        container: Container name (required for multi-container pods).
+        since: Only return logs newer than this duration, e.g. "10m", "1h".
+        tail_lines: Only return this many most recent lines.
+        previous: Return logs of the previous (crashed) container instance.
+        max_bytes: Maximum output size returned.
+        max_seconds: Stop reading after this many seconds.
     """
-    return run_command(["kubectl", "exec", pod, "-n", namespace, "--", "sh", "-c", command])
+    since_seconds = parse_duration(since) if since else None
+    client = await aget_client()
+    if client is None:
+        cmd = ["kubectl", "logs", pod, "-n", namespace]
+        if container:
+            cmd += ["-c", container]
+        if since:
+            cmd.append(f"--since={since_seconds}s")
+        if tail_lines is not None:
+            cmd.append(f"--tail={tail_lines}")
+        if previous:
+            cmd.append("--previous")
+        return await stream_command(cmd, max_bytes, max_seconds)
+
+    params = {
+        "container": container,
+        "sinceSeconds": since_seconds,
+        "tailLines": tail_lines,
+        "previous": "true" if previous else None,
+    }
+    chunks = client.astream(resource_path("pods", namespace, pod, "log"), params, timeout=max_seconds + 10)
+    output = await collect(chunks, max_bytes, max_seconds)
+    if output.truncated:
+        mark_truncated()
+    return output.render(max_seconds)
 
 @mcp.tool()
-def list_api_resources() -> str:
+@cached_response
+@limit_concurrency("read")
+async def list_api_resources(cache_bypass: bool = False) -> str:
     """
     Lists all API resources available in the cluster.
+
+    Args:
+        cache_bypass: Skip the cached response and query the cluster again.
     """
-    return run_command(["kubectl", "api-resources"])
+    return await run_command(["kubectl", "api-resources"])
 
 @mcp.tool()
-def kubectl_generic(args: str) -> str:
+@limit_concurrency("generic")
+async def kubectl_generic(args: str, max_bytes: int = GENERIC_MAX_BYTES) -> dict | str:
     """
     Executes a generic kubectl command from string input.
 
+    The string is split the way a shell would, so quoted selectors and JSONPath
+    work. Only allow-listed verbs (read-only by default) and resources run.
+    get, describe and top of common resources are answered through the API
+    client and watch cache instead of a kubectl process; describe then returns
+    each object with its most frequent events.
+
     Args:
-        args: Argument string to pass to kubectl. Example: "get pods -n default"
+        args: Argument string to pass to kubectl.
+            Example: "get pods -n default -l 'app in (web, api)'"
+        max_bytes: Output budget; longer output is cut and flagged as truncated.
     """
-    return run_command(["kubectl"] + args.split())
+    command = parse_kubectl(args)
+    check_allowed(command)
+    client = await aget_client(command.flags.get("--context"))
+    if client is not None:
+        if command.verb == "get" and command.flags.get("--output", "") in GENERIC_API_OUTPUTS:
+            resource = api_resource(command, GENERIC_GET_FLAGS)
+            if resource is not None:
+                return await generic_get(client, command, resource, max_bytes)
+        elif command.verb == "describe":
+            resource = api_resource(command, GENERIC_DESCRIBE_FLAGS)
+            if resource is not None:
+                return await generic_describe(client, command, resource, max_bytes)
+        elif command.verb == "top":
+            resource = api_resource(command, GENERIC_TOP_FLAGS)
+            if resource in ("pods", "nodes"):
+                return await generic_top(client, command, resource, max_bytes)
+    return await stream_command(["kubectl", *command.argv], max_bytes, GENERIC_MAX_SECONDS)
 
 @mcp.tool()
-def ping() -> str:
+async def ping() -> str:
     """
     Basic health check.
     """
     return "OKE MCP server is online"
 
 @mcp.tool()
-def get_node_metrics() -> str:
+async def server_stats(format: str = "json") -> dict | str:
+    """
+    Returns per-tool call counts, error rates, latency (p50/p95/max and total
+    wall-clock share), response sizes and kubectl/API call counts since the
+    server started, the most time-consuming tools first, plus response cache
+    hit/miss counts.
+
+    Args:
+        format: "json" for the per-tool summary, or "prometheus" for the raw
+            exposition text also served on OKE_MCP_METRICS_PORT.
+    """
+    if format == "prometheus":
+        return metrics_registry.render_prometheus()
+    return {"tools": metrics_registry.snapshot(), "response_cache": response_cache.stats()}
+
+@mcp.tool()
+@cached_response
+@limit_concurrency("read")
+async def get_node_metrics(
+    contexts: list[str] | None = None,
+    all_contexts: bool = False,
+    cache_bypass: bool = False
+) -> dict | str:
     """
     Returns CPU and memory usage of all nodes.
     Requires metrics-server to be installed.
+
+    Args:
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
+        cache_bypass: Skip the cached response and query the cluster again.
     """
-    return run_command(["kubectl", "top", "nodes"])
+    async def top(context: str | None) -> str:
+        client = await aget_client(context)
+        if client is None:
+            return await run_command(kubectl("top", "nodes", context=context))
+
+        metrics = await client.alist("nodemetrics")
+        return format_top(metrics["items"], namespaced=False)
+    return await fan_out(top, contexts, all_contexts)
 
 @mcp.tool()
-def get_pod_metrics() -> str:
+@cached_response
+@limit_concurrency("read")
+async def get_pod_metrics(
+    contexts: list[str] | None = None,
+    all_contexts: bool = False,
+    cache_bypass: bool = False
+) -> dict | str:
     """
     Returns CPU and memory usage of all pods.
     Requires metrics-server to be installed.
+
+    Args:
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
+        cache_bypass: Skip the cached response and query the cluster again.
+    """
+    async def top(context: str | None) -> str:
+        client = await aget_client(context)
+        if client is None:
+            return await run_command(kubectl("top", "pods", "--all-namespaces", context=context))
+
+        metrics = await client.alist("podmetrics")
+        return format_top(metrics["items"], namespaced=True)
+    return await fan_out(top, contexts, all_contexts)
+
+async def metrics_stats(kind: str, window: str, namespace: str | None, sort_by: str, limit: int) -> list:
+    if sort_by not in ("cpu", "memory"):
+        raise ValueError(f"sort_by must be 'cpu' or 'memory', got {sort_by!r}")
+    seconds = parse_duration(window)
+    # Percentiles over the whole buffer are CPU-bound; keep them off the event loop.
+    stats = await asyncio.to_thread(usage_stats, kind, seconds, namespace, sort_by, limit)
+    if stats is None:
+        raise ToolError("metrics sampler is not running (needs the API backend and OKE_MCP_METRICS_INTERVAL > 0)")
+    if kind == "nodes":
+        for row in stats:
+            del row["namespace"]
+    return stats
+
+@mcp.tool()
+@limit_concurrency("read")
+async def get_node_metrics_stats(window: str = "15m", sort_by: str = "cpu", limit: int = 50) -> list:
+    """
+    Returns p50/p95/max CPU (millicores) and memory (MiB) per node over a recent
+    time window, from samples the server collects in the background.
+
+    Args:
+        window: How far back to look, e.g. "5m", "1h" (bounded by the samples kept).
+        sort_by: "cpu" or "memory"; nodes with the highest p95 come first.
+        limit: Maximum number of nodes returned.
+    """
+    return await metrics_stats("nodes", window, None, sort_by, limit)
+
+@mcp.tool()
+@limit_concurrency("read")
+async def get_pod_metrics_stats(
+    namespace: str | None = None,
+    window: str = "15m",
+    sort_by: str = "cpu",
+    limit: int = 50
+) -> list:
+    """
+    Returns p50/p95/max CPU (millicores) and memory (MiB) per pod over a recent
+    time window, from samples the server collects in the background.
+
+    Args:
+        namespace: Only include pods in this namespace (default: all namespaces).
+        window: How far back to look, e.g. "5m", "1h" (bounded by the samples kept).
+        sort_by: "cpu" or "memory"; pods with the highest p95 come first.
+        limit: Maximum number of pods returned.
     """
-    return run_command(["kubectl", "top", "pods", "--all-namespaces"])
+    return await metrics_stats("pods", window, namespace, sort_by, limit)
 
 @mcp.tool()
-def get_events(namespace: str = "default") -> str:
+@limit_concurrency("read")
+async def get_events(
+    namespace: str | None = "",
+    label_selector: str | None = None,
+    field_selector: str | None = None,
+    fields: str | None = None,
+    limit: int | None = None,
+    continue_token: str | None = None,
+    format: str = "table",
+    since_resource_version: str | None = None,
+    max_groups: int = 50,
+    contexts: list[str] | None = None,
+    all_contexts: bool = False
+) -> dict | str:
     """
     Returns recent events from the specified namespace.
     
     Args:
-        namespace: The Kubernetes namespace (default is 'default').
+        namespace: The Kubernetes namespace; null for all namespaces. Left unset, the table
+            shows the 'default' namespace and aggregate mode the whole cluster.
+        label_selector: Label selector applied by the API server.
+        field_selector: Field selector, e.g. "type=Warning,involvedObject.kind=Pod".
+        fields: Comma-separated JSONPath fields to return per event as JSON instead of
+            the event table, e.g. "involvedObject.name,reason,message,count".
+        limit: Maximum number of events to return in this page.
+        continue_token: Token from a previous page to fetch the next page.
+        format: "table" for the event table, or "aggregate" to group near-identical events
+            by object, reason and message template with total count, first/last seen and
+            latest message, Warnings and the most frequent first. fields, limit and
+            continue_token are ignored in aggregate mode.
+        since_resource_version: With format="aggregate", only fetch events created or changed
+            after this cursor; pass the resource_version of the previous aggregate result.
+        max_groups: Maximum number of groups returned in aggregate mode.
+        contexts: Kubeconfig contexts to query concurrently, merged with a cluster label
+            (default: the current context only).
+        all_contexts: Query every context in kubeconfig.
     """
-    return run_command(["kubectl", "get", "events", "-n", namespace, "--sort-by=.lastTimestamp"])
+    if since_resource_version and (all_contexts or len(contexts or []) > 1):
+        raise ValueError("since_resource_version is a cursor into one cluster; query a single context")
+    query = list_query(label_selector, field_selector, limit, continue_token)
+    if not namespace:
+        namespace = None if format == "aggregate" else "default"
+
+    async def events(context: str | None) -> dict | str:
+        if format == "aggregate":
+            return await aggregate_events(namespace, list_query(label_selector, field_selector), context,
+                                          since_resource_version, max_groups)
+
+        client = await aget_client(context)
+        if client is None and not query and not fields:
+            scope = ["-n", namespace] if namespace else ["--all-namespaces"]
+            return await run_command(
+                kubectl("get", "events", *scope, "--sort-by=.lastTimestamp", context=context)
+            )
+
+        events = await fetch_list("get_events", "events", namespace, query, context)
+        if fields:
+            return format_list(events, fields)
+        table = format_events(events["items"], namespace)
+        next_page = events.get("metadata", {}).get("continue")
+        if next_page:
+            table += f"\n\nMore events available, continue_token: {next_page}"
+        return table
+    return await fan_out(events, contexts, all_contexts)
 
 @mcp.tool()
-def restart_unhealthy_pod(pod_name: str, namespace: str = "default") -> str:
+@limit_concurrency("mutate")
+async def restart_unhealthy_pod(pod_name: str, namespace: str = "default") -> str:
     """
     Checks if the specified pod is healthy (all containers ready).
     If not, deletes the pod to trigger a restart.
@@ -203,32 +1372,86 @@ def restart_unhealthy_pod(pod_name: str, namespace: str = "default") -> str:
         pod_name: Name of the pod to check.
         namespace: Namespace where the pod is running (default: "default").
     """
-    try:
-        # Get readiness status of all containers in the pod
+    client = await aget_client()
+
+    # Get readiness status of all containers in the pod
+    if client is None:
         cmd = [
             "kubectl", "get", "pod", pod_name,
             "-n", namespace,
             "-o", "jsonpath={.status.containerStatuses[*].ready}"
         ]
-        readiness_output = run_command(cmd)
-        if "Error:" in readiness_output:
-            return f"Failed to check readiness: {readiness_output}"
+        ready_states = (await run_command(cmd)).split()
+    else:
+        pod = await client.aread("pods", pod_name, namespace)
+        statuses = pod.get("status", {}).get("containerStatuses", [])
+        ready_states = [str(status.get("ready", False)).lower() for status in statuses]
 
-        # If any container is not ready, restart the pod
-        ready_states = readiness_output.strip().split()
-        if all(state == "true" for state in ready_states):
-            return f"All containers in pod '{pod_name}' are healthy."
+    # If any container is not ready, restart the pod
+    if all(state == "true" for state in ready_states):
+        return f"All containers in pod '{pod_name}' are healthy."
 
-        # Restart pod (by deleting, Deployment will auto-recreate it)
+    # Restart pod (by deleting, Deployment will auto-recreate it)
+    if client is None:
         delete_cmd = ["kubectl", "delete", "pod", pod_name, "-n", namespace]
-        delete_output = run_command(delete_cmd)
-        return f"Pod '{pod_name}' was unhealthy and has been restarted.\n{delete_output}"
+        delete_output = await run_command(delete_cmd)
+    else:
+        await client.adelete("pods", pod_name, namespace)
+        delete_output = f'pod "{pod_name}" deleted'
+    return f"Pod '{pod_name}' was unhealthy and has been restarted.\n{delete_output}"
 
-    except Exception as e:
-        return f"Exception occurred: {str(e)}"
+@mcp.tool()
+@limit_concurrency("mutate")
+async def restart_unhealthy_pods(
+    namespace: str | None = "default",
+    label_selector: str | None = None,
+    field_selector: str | None = None,
+    max_disruption: int = 5,
+    max_per_owner: int = 1,
+    min_age: str = "2m",
+    dry_run: bool = False
+) -> dict:
+    """
+    Restarts every unhealthy pod (a container not ready) matching a selector.
+    Readiness is read from a single LIST, then unhealthy pods are deleted
+    concurrently, most restarts first, so their controllers recreate them.
+
+    Args:
+        namespace: Namespace to sweep; null for all namespaces.
+        label_selector: Label selector, e.g. "app=nginx".
+        field_selector: Field selector, e.g. "spec.nodeName=10.0.0.5".
+        max_disruption: Maximum number of pods deleted in this call.
+        max_per_owner: Maximum pods deleted per owning ReplicaSet/StatefulSet/...
+        min_age: Skip pods younger than this (e.g. "2m"), which may still be starting.
+        dry_run: If True, only report which pods would be restarted.
+
+    Returns:
+        JSON with per-status counts and one entry per unhealthy pod (owner,
+        reason, status). Pods without an owner are never deleted.
+    """
+    min_age_seconds = parse_duration(min_age)
+    client = await aget_client()
+
+    async def delete(entry: dict):
+        try:
+            if client is not None:
+                await client.adelete("pods", entry["name"], entry["namespace"])
+            else:
+                await run_command(["kubectl", "delete", "pod", entry["name"], "-n", entry["namespace"]])
+        except (KubeAPIError, CommandError) as e:
+            entry["status"], entry["error"] = "failed", e.message
+            return
+        entry["status"] = "restarted"
+
+    pods = await fetch_list("restart_unhealthy_pods", "pods", namespace, list_query(label_selector, field_selector))
+    healthy, entries = plan_restarts(pods["items"], max_disruption, max_per_owner, min_age_seconds)
+    if not dry_run:
+        await asyncio.gather(*(delete(entry) for entry in entries if entry["status"] == "planned"))
+    return summarize_restarts(healthy, entries, dry_run)
     
 @mcp.tool()
-def scale_deployment(
+@limit_concurrency("mutate")
+async def scale_deployment(
     deployment_name: str,
     replicas: int,
     namespace: str = "default"
@@ -245,99 +1468,80 @@ def scale_deployment(
         scale_deployment("nginx", 5, "default")
     """
     if replicas < 0:
-        return "Replica count must be 0 or greater."
+        raise ValueError("Replica count must be 0 or greater.")
 
-    return run_command([
-        "kubectl", "scale", f"deployment/{deployment_name}",
-        f"--replicas={replicas}", "-n", namespace
-    ])
+    client = await aget_client()
+    if client is None:
+        return await run_command([
+            "kubectl", "scale", f"deployment/{deployment_name}",
+            f"--replicas={replicas}", "-n", namespace
+        ])
+    await client.apatch("deployments", deployment_name, namespace, {"spec": {"replicas": replicas}},
+                        patch_type="merge", subresource="scale")
+    return f"deployment.apps/{deployment_name} scaled"
     
 @mcp.tool()
-def update_deployments_from_config() -> str:
+@limit_concurrency("mutate")
+async def update_deployments_from_config(
+    dry_run: bool = False,
+    max_workers: int = 10,
+    namespace_rate: float = 5.0,
+    wait_seconds: float = 0
+) -> dict | str:
     """
     Updates deployments based on keyword-image mappings defined in the config.
     For each keyword, finds all matching deployments (in name), and if the image
     differs from the target image, updates and restarts them.
 
-    You can update the 'deployment_config' dictionary below to add more mappings.
+    The full plan is computed first; each deployment then gets a single patch
+    (new image plus restart annotation), applied concurrently.
+
+    Mappings live in deployment_config.yaml (or OKE_MCP_DEPLOYMENT_CONFIG) and
+    are reloaded automatically when the file changes. Rules can be limited to
+    specific namespaces and containers.
+
+    Args:
+        dry_run: If True, only report the planned changes without patching anything.
+        max_workers: Maximum number of deployments patched at the same time.
+        namespace_rate: Maximum patches per second within a single namespace.
+        wait_seconds: Wait up to this long for the triggered rollouts to finish.
+
+    Returns:
+        JSON with per-status counts and one entry per matched deployment
+        (namespace, name, keyword, image changes, status, error, and for
+        patched deployments the rollout id, state and message).
     """
-    import json
-  
-    # Add your mappings here: "keyword": "target_image"
-    deployment_config = {
-        "nginx": "ams.ocir.io/oabcs1/vivesisi/nginx:latest",
-        "redis": "redis:7.2.4",
-        "api": "ams.ocir.io/oabcs1/vivesisi/api:2.1"
-        # Add more here
-    }
+    client = await aget_client()
 
-    try:
-        deployments_json = run_command([
-            "kubectl", "get", "deployments", "--all-namespaces", "-o", "json"
+    async def patch(namespace: str, name: str, body: dict):
+        if client is not None:
+            await client.apatch("deployments", name, namespace, body)
+            return
+        await run_command([
+            "kubectl", "patch", "deployment", name,
+            "-n", namespace,
+            "--type=strategic",
+            "-p", json.dumps(body)
         ])
-        deployments = json.loads(deployments_json)
-        updated = []
-
-        for item in deployments.get("items", []):
-            name = item["metadata"]["name"]
-            namespace = item["metadata"]["namespace"]
-            containers = item["spec"]["template"]["spec"]["containers"]
-
-            for keyword, target_image in deployment_config.items():
-                if keyword.lower() not in name.lower():
-                    continue
-
-                for container in containers:
-                    current_image = container["image"]
-
-                    if current_image != target_image:
-                        # Prepare patch
-                        patch = {
-                            "spec": {
-                                "template": {
-                                    "spec": {
-                                        "containers": [{
-                                            "name": container["name"],
-                                            "image": target_image
-                                        }]
-                                    }
-                                }
-                            }
-                        }
-
-                        patch_cmd = [
-                            "kubectl", "patch", "deployment", name,
-                            "-n", namespace,
-                            "--type=strategic",
-                            "-p", json.dumps(patch)
-                        ]
-                        patch_result = run_command(patch_cmd)
-
-                        # Restart deployment
-                        restart_cmd = [
-                            "kubectl", "rollout", "restart",
-                            f"deployment/{name}", "-n", namespace
-                        ]
-                        restart_result = run_command(restart_cmd)
-
-                        updated.append(
-                            f"  {namespace}/{name} matched keyword '{keyword}':\n"
-                            f"  Image updated from '{current_image}' to '{target_image}'\n"
-                            f"  Patch: {patch_result}\n"
-                            f"  Restart: {restart_result}"
-                        )
-                    else:
-                        updated.append(f" {namespace}/{name} (matched '{keyword}'): Already using '{target_image}'")
-                    break  # Only apply first matching keyword
-
-        if not updated:
-            return "No matching deployments found for any keyword."
-        return "\n\n".join(updated)
-
-    except Exception as e:
-        return f"Error occurred: {str(e)}"
+
+    deployment_config = config_watcher.get()
+    deployments = await fetch_list("update_deployments_from_config", "deployments")
+    plan = plan_updates(deployments.get("items", []), deployment_config)
+    if not plan:
+        return "No matching deployments found for any keyword."
+    if not dry_run:
+        await apply_plan(plan, patch, max_workers, namespace_rate)
+        patched = [entry for entry in plan if entry["status"] == "patched"]
+        tracked = [rollouts.track(entry["namespace"], entry["name"]) for entry in patched]
+        for entry, progress in zip(patched, await rollouts.wait_all(tracked, wait_seconds)):
+            entry["rollout"] = {key: progress[key] for key in ("rollout_id", "state", "message")}
+    return summarize_plan(plan, dry_run)
 
 # ----------------------- Entry Point -----------------------
 
 if __name__ == "__main__":
+    # Build the pooled API client from kubeconfig once, before serving requests.
+    start_informers(get_client())
+    start_sampler(get_client())
+    start_metrics_server()
     mcp.run()
@@ -0,0 +1,71 @@
+"""
+Bounded capture of streamed command output.
+
+BoundedOutput keeps the first half of its byte budget as the head and the most
+recent half in a ring buffer as the tail, counting everything dropped in
+between. collect() drains an async byte stream into it with a time limit, so a
+chatty container can neither exhaust the server's memory nor flood the model.
+"""
+import asyncio
+
+
+class BoundedOutput:
+    def __init__(self, max_bytes: int):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+        self.timed_out = False
+
+    def write(self, chunk: bytes):
+        self.total_bytes += len(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self.tail += chunk[-self.tail_limit:]
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped_bytes > 0 or self.timed_out
+
+    def render(self, max_seconds: float | None = None) -> str:
+        text = self.head.decode(errors="replace")
+        if self.dropped_bytes:
+            text += f"\n... [truncated {self.dropped_bytes} of {self.total_bytes} bytes] ...\n"
+        text += self.tail.decode(errors="replace")
+        if self.timed_out:
+            text += f"\n[output stopped after {max_seconds}s]"
+        return text.strip()
+
+
+async def collect(chunks, max_bytes: int, max_seconds: float) -> BoundedOutput:
+    """
+    Feeds an async iterator of byte chunks into a BoundedOutput until it ends
+    or max_seconds elapse.
+    """
+    output = BoundedOutput(max_bytes)
+
+    async def consume():
+        async for chunk in chunks:
+            output.write(chunk)
+
+    try:
+        await asyncio.wait_for(consume(), max_seconds)
+    except asyncio.TimeoutError:
+        output.timed_out = True
+    return output
+
+
+async def read_chunks(stream: asyncio.StreamReader, chunk_size: int = 65536):
+    while chunk := await stream.read(chunk_size):
+        yield chunk
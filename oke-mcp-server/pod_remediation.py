@@ -0,0 +1,86 @@
+"""
+Planning for restart_unhealthy_pods.
+
+Readiness of every matching pod is evaluated from one LIST. Unhealthy pods
+are restarted (deleted, so their controller recreates them) worst first, up to
+a total disruption budget and a cap per owning controller, so a sweep can
+never take down a whole ReplicaSet at once. Pods without an owner are never
+deleted: nothing would recreate them.
+"""
+from datetime import datetime, timezone
+
+from summaries import pod_status
+
+
+def owner(pod: dict) -> str | None:
+    """
+    Returns "Kind/name" of the pod's controller, or None for a bare pod.
+    """
+    references = pod["metadata"].get("ownerReferences", [])
+    controller = next((ref for ref in references if ref.get("controller")), references[0] if references else None)
+    return f"{controller['kind']}/{controller['name']}" if controller else None
+
+
+def is_unhealthy(pod: dict) -> bool:
+    """
+    A pod is unhealthy when one of its containers is not ready. Completed and
+    terminating pods are left alone.
+    """
+    if pod["metadata"].get("deletionTimestamp") or pod.get("status", {}).get("phase") == "Succeeded":
+        return False
+    statuses = pod.get("status", {}).get("containerStatuses", [])
+    return any(not status.get("ready", False) for status in statuses)
+
+
+def _age_seconds(pod: dict, now: datetime) -> float:
+    created = pod["metadata"].get("creationTimestamp")
+    return (now - datetime.fromisoformat(created)).total_seconds() if created else float("inf")
+
+
+def plan_restarts(pods: list, max_disruption: int, max_per_owner: int, min_age_seconds: float) -> tuple:
+    """
+    Returns (healthy count, entries) with one entry per unhealthy pod and its
+    status: "planned" or why it is skipped.
+    """
+    now = datetime.now(timezone.utc)
+    unhealthy = [pod for pod in pods if is_unhealthy(pod)]
+    # Most restarts first, so the budget goes to the pods that are failing hardest.
+    unhealthy.sort(key=lambda pod: (
+        -sum(status.get("restartCount", 0) for status in pod.get("status", {}).get("containerStatuses", [])),
+        pod["metadata"].get("namespace", ""),
+        pod["metadata"]["name"],
+    ))
+
+    entries = []
+    per_owner: dict = {}
+    planned = 0
+    for pod in unhealthy:
+        pod_owner = owner(pod)
+        entry = {
+            "namespace": pod["metadata"].get("namespace", ""),
+            "name": pod["metadata"]["name"],
+            "owner": pod_owner,
+            "reason": pod_status(pod),
+        }
+        owner_key = (entry["namespace"], pod_owner)
+        if pod_owner is None:
+            entry["status"] = "skipped_no_owner"
+        elif _age_seconds(pod, now) < min_age_seconds:
+            entry["status"] = "skipped_too_young"
+        elif per_owner.get(owner_key, 0) >= max_per_owner:
+            entry["status"] = "skipped_owner_cap"
+        elif planned >= max_disruption:
+            entry["status"] = "skipped_budget"
+        else:
+            entry["status"] = "planned"
+            per_owner[owner_key] = per_owner.get(owner_key, 0) + 1
+            planned += 1
+        entries.append(entry)
+    return len(pods) - len(unhealthy), entries
+
+
+def summarize(healthy: int, entries: list, dry_run: bool) -> dict:
+    counts = {"healthy": healthy}
+    for entry in entries:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {"dry_run": dry_run, "summary": counts, "pods": entries}
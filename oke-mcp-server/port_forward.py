@@ -0,0 +1,171 @@
+"""
+Registry of managed `kubectl port-forward` sessions.
+
+Each forward runs as a tracked background process. Asking again for the same
+pod and remote port reuses the live session instead of starting a new one,
+sessions can be listed and stopped by id, and sessions whose process exited
+are reaped on every registry call.
+"""
+import asyncio
+import atexit
+import os
+import re
+import signal
+import time
+import uuid
+from collections import deque
+
+from server_metrics import record_backend_call
+
+READY_TIMEOUT_SECONDS = 15
+OUTPUT_LINES_KEPT = 20
+_FORWARDING = re.compile(r"Forwarding from [^:]+:(\d+) ->")
+
+
+class PortForwardSession:
+    def __init__(self, pod: str, namespace: str, remote_port: int, process: asyncio.subprocess.Process):
+        self.id = uuid.uuid4().hex[:8]
+        self.pod = pod
+        self.namespace = namespace
+        self.remote_port = remote_port
+        self.local_port = None
+        self.process = process
+        self.started_at = time.time()
+        self.output = deque(maxlen=OUTPUT_LINES_KEPT)
+        # wait_ready() task, shared by every caller asking for this forward while it starts.
+        self.starting = None
+        self._drain_tasks = []
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    def describe(self) -> dict:
+        return {
+            "session_id": self.id,
+            "pod": self.pod,
+            "namespace": self.namespace,
+            "local_port": self.local_port,
+            "remote_port": self.remote_port,
+            "alive": self.alive,
+            "ready": self.local_port is not None,
+            "uptime_seconds": round(time.time() - self.started_at),
+            "last_output": list(self.output)[-3:],
+        }
+
+    async def wait_ready(self, timeout: float):
+        """
+        Waits for kubectl to report the listening port, then keeps draining its
+        output in the background so the pipes never fill up.
+        """
+        async def read_until_forwarding():
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    stderr = await self.process.stderr.read()
+                    raise RuntimeError(stderr.decode().strip() or "kubectl port-forward exited")
+                text = line.decode().strip()
+                self.output.append(text)
+                match = _FORWARDING.search(text)
+                if match:
+                    self.local_port = int(match.group(1))
+                    return
+
+        await asyncio.wait_for(read_until_forwarding(), timeout)
+        self._drain_tasks = [
+            asyncio.create_task(self._drain(self.process.stdout)),
+            asyncio.create_task(self._drain(self.process.stderr)),
+        ]
+
+    async def _drain(self, stream: asyncio.StreamReader):
+        while line := await stream.readline():
+            self.output.append(line.decode().strip())
+
+    async def stop(self):
+        if self.alive:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        for task in self._drain_tasks:
+            task.cancel()
+
+
+class PortForwardManager:
+    def __init__(self):
+        self._sessions: dict = {}
+        self._lock = asyncio.Lock()
+        atexit.register(self._kill_all)
+
+    def reap(self) -> list:
+        """
+        Drops sessions whose kubectl process has exited; returns their ids.
+        """
+        dead = [session_id for session_id, session in self._sessions.items() if not session.alive]
+        for session_id in dead:
+            self._sessions.pop(session_id)
+        return dead
+
+    async def start(self, pod: str, local_port: int, remote_port: int, namespace: str) -> tuple:
+        """
+        Returns (session, reused). local_port 0 lets kubectl pick a free port.
+        Raises RuntimeError or asyncio.TimeoutError if the forward does not come up.
+        """
+        async with self._lock:
+            self.reap()
+            session = next((session for session in self._sessions.values()
+                            if (session.pod, session.namespace, session.remote_port) == (pod, namespace, remote_port)),
+                           None)
+            reused = session is not None
+            if not reused:
+                record_backend_call("subprocess")
+                process = await asyncio.create_subprocess_exec(
+                    "kubectl", "port-forward", f"pod/{pod}",
+                    f"{local_port or ''}:{remote_port}", "-n", namespace,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                )
+                session = PortForwardSession(pod, namespace, remote_port, process)
+                session.starting = asyncio.ensure_future(session.wait_ready(READY_TIMEOUT_SECONDS))
+                self._sessions[session.id] = session
+
+        # Readiness is awaited outside the lock, so a slow forward does not hold up
+        # other forwards; callers asking for the same one share its start.
+        try:
+            await asyncio.shield(session.starting)
+        except BaseException:
+            if not reused:
+                self._sessions.pop(session.id, None)
+                await session.stop()
+            raise
+        return session, reused
+
+    def list(self) -> list:
+        self.reap()
+        return [session.describe() for session in self._sessions.values()]
+
+    async def stop(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        await session.stop()
+        return True
+
+    async def stop_all(self) -> int:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.stop() for session in sessions))
+        return len(sessions)
+
+    def _kill_all(self):
+        # Runs at interpreter exit, when the event loop may already be gone.
+        for session in self._sessions.values():
+            if session.alive:
+                try:
+                    os.kill(session.process.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+
+port_forwards = PortForwardManager()
@@ -0,0 +1,111 @@
+"""
+Keyed response cache for read tools whose output rarely changes.
+
+Results are kept per tool and argument set for a per-tool TTL, in an LRU of
+bounded size. Identical calls that arrive while one is already running share
+that call's result instead of starting their own kubectl process
+(single-flight). Failed calls are never cached.
+"""
+import asyncio
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+
+from tool_result import mark_cache_hit
+
+# Seconds a response stays valid, per tool.
+# Override with OKE_MCP_CACHE_TTL="explain_resource=86400,get_node_metrics=5".
+RESPONSE_TTLS = {
+    "explain_resource": 3600,
+    "list_api_resources": 600,
+    "kubectl_context": 30,
+    "get_node_metrics": 15,
+    "get_pod_metrics": 15,
+}
+for _entry in filter(None, os.environ.get("OKE_MCP_CACHE_TTL", "").split(",")):
+    _tool, _, _seconds = _entry.partition("=")
+    RESPONSE_TTLS[_tool.strip()] = float(_seconds)
+MAX_ENTRIES = int(os.environ.get("OKE_MCP_CACHE_SIZE", "256"))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key, ttl: float, compute, bypass: bool = False):
+        """
+        Returns the cached result for key, joins an identical call in flight, or
+        runs compute() and caches its result for ttl seconds. bypass skips the
+        stored result but still refreshes it.
+        """
+        if not bypass:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    mark_cache_hit()
+                    return result
+                del self._entries[key]
+            task = self._inflight.get(key)
+            if task is not None:
+                self.coalesced += 1
+                mark_cache_hit()
+                return await asyncio.shield(task)
+
+        self.misses += 1
+        # A separate task, so a caller that gets cancelled does not cancel the
+        # computation other callers are waiting on.
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._finish, key, ttl))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, ttl: float, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(fn):
+    """
+    Caches a tool's responses by its arguments with the tool's TTL from
+    RESPONSE_TTLS. The tool must take a `cache_bypass: bool = False` argument;
+    passing True forces a fresh call.
+    """
+    signature = inspect.signature(fn)
+    ttl = RESPONSE_TTLS.get(fn.__name__, 0)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        bypass = arguments.pop("cache_bypass", False)
+        key = (fn.__name__, repr(sorted(arguments.items())))
+        return await response_cache.get(key, ttl, lambda: fn(*args, **kwargs), bypass)
+    return wrapper
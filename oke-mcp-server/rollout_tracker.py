@@ -0,0 +1,284 @@
+"""
+Non-blocking rollout tracking for Deployments.
+
+track() returns a Rollout handle at once instead of holding a worker in
+`kubectl rollout status`. Handles are driven by one WATCH on deployments per
+(context, namespace), shared by every rollout tracked there, so a fleet-wide
+update costs one long-lived request per namespace rather than one blocked
+process per deployment. A handle can be polled for progress or awaited with a
+timeout. Without the API client, the namespace is re-listed every few seconds
+instead of watched.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from k8s_client import KubeAPIError, aget_client
+from tool_result import error_message
+
+logger = logging.getLogger(__name__)
+
+# Seconds a rollout is tracked before it is given up as "timed_out".
+TRACK_TIMEOUT_SECONDS = float(os.environ.get("OKE_MCP_ROLLOUT_TIMEOUT", "1800"))
+# Seconds between LISTs when only kubectl is available.
+POLL_SECONDS = float(os.environ.get("OKE_MCP_ROLLOUT_POLL", "2"))
+# Seconds a finished rollout stays queryable.
+FINISHED_TTL_SECONDS = 3600
+WATCH_TIMEOUT_SECONDS = 300
+# Seconds kubectl_rollout waits for the first LIST before reporting a rollout.
+FIRST_STATUS_SECONDS = float(os.environ.get("OKE_MCP_ROLLOUT_FIRST_STATUS", "10"))
+RETRY_DELAY_SECONDS = 5
+
+PROGRESSING = "progressing"
+COMPLETE = "complete"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+
+
+def rollout_state(deployment: dict) -> tuple:
+    """
+    Returns (state, message) for a Deployment, with the same checks and wording
+    as `kubectl rollout status`.
+    """
+    name = deployment["metadata"]["name"]
+    spec = deployment.get("spec", {})
+    status = deployment.get("status", {})
+    if deployment["metadata"].get("generation", 0) > status.get("observedGeneration", 0):
+        return PROGRESSING, "Waiting for deployment spec update to be observed..."
+    for condition in status.get("conditions", []):
+        if condition.get("type") == "Progressing" and condition.get("reason") == "ProgressDeadlineExceeded":
+            return FAILED, f'deployment "{name}" exceeded its progress deadline'
+    desired = spec.get("replicas", 1)
+    updated = status.get("updatedReplicas", 0)
+    replicas = status.get("replicas", 0)
+    available = status.get("availableReplicas", 0)
+    if updated < desired:
+        return PROGRESSING, f"{updated} out of {desired} new replicas have been updated..."
+    if replicas > updated:
+        return PROGRESSING, f"{replicas - updated} old replicas are pending termination..."
+    if available < updated:
+        return PROGRESSING, f"{available} of {updated} updated replicas are available..."
+    return COMPLETE, f'deployment "{name}" successfully rolled out'
+
+
+class Rollout:
+    def __init__(self, namespace: str, name: str, context: str | None):
+        self.id = uuid.uuid4().hex[:8]
+        self.namespace = namespace
+        self.name = name
+        self.context = context
+        self.state = PROGRESSING
+        self.message = "Waiting for the first deployment status..."
+        self.replicas = {}
+        self.started_at = time.time()
+        self.finished_at = None
+        # Set when the deployment was not in the namespace's LIST.
+        self.missing = False
+        # Last error reading the deployment, until a status arrives.
+        self.error = None
+        self._done = asyncio.Event()
+        self._observed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def observed(self) -> bool:
+        return self._observed.is_set()
+
+    def update(self, deployment: dict):
+        self._observed.set()
+        if self.done:
+            return
+        self.error = None
+        status = deployment.get("status", {})
+        self.replicas = {
+            "desired": deployment.get("spec", {}).get("replicas", 1),
+            "updated": status.get("updatedReplicas", 0),
+            "ready": status.get("readyReplicas", 0),
+            "available": status.get("availableReplicas", 0),
+        }
+        state, message = rollout_state(deployment)
+        if state == PROGRESSING:
+            self.message = message
+        else:
+            self.finish(state, message)
+
+    def finish(self, state: str, message: str):
+        self._observed.set()
+        if self.done:
+            return
+        self.state = state
+        self.message = message
+        self.finished_at = time.time()
+        self._done.set()
+
+    async def first_status(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for the first status of the deployment (or
+        for the rollout to end); returns whether one arrived.
+        """
+        if timeout > 0 and not self.observed:
+            try:
+                await asyncio.wait_for(self._observed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.observed
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for the rollout to finish; returns whether it did.
+        """
+        if timeout > 0 and not self.done:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.done
+
+    def describe(self) -> dict:
+        return {
+            "rollout_id": self.id,
+            "deployment": self.name,
+            "namespace": self.namespace,
+            "context": self.context,
+            "state": self.state,
+            "message": self.message,
+            "replicas": self.replicas,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1),
+        }
+
+
+class _NamespaceWatch:
+    """
+    Feeds deployment updates in one namespace to every rollout tracked there.
+    """
+
+    def __init__(self, tracker: "RolloutTracker", context: str | None, namespace: str):
+        self.tracker = tracker
+        self.context = context
+        self.namespace = namespace
+        self.rollouts: dict = {}
+        self.task = None
+
+    def _dispatch(self, deployment: dict):
+        rollout = self.rollouts.get(deployment["metadata"]["name"])
+        if rollout is not None:
+            rollout.update(deployment)
+
+    async def _relist(self) -> str:
+        listing = await self.tracker.list_deployments(self.namespace, self.context)
+        names = set()
+        for deployment in listing.get("items", []):
+            names.add(deployment["metadata"]["name"])
+            self._dispatch(deployment)
+        for name, rollout in list(self.rollouts.items()):
+            if name not in names:
+                rollout.missing = True
+                rollout.finish(FAILED, f'deployment "{name}" not found')
+        return listing.get("metadata", {}).get("resourceVersion", "")
+
+    async def run(self):
+        while self.rollouts:
+            try:
+                resource_version = await self._relist()
+                client = await aget_client(self.context)
+                if client is None:
+                    await asyncio.sleep(POLL_SECONDS)
+                    continue
+                async for event in client.awatch("deployments", resource_version, self.namespace,
+                                                 timeout_seconds=WATCH_TIMEOUT_SECONDS):
+                    if event["type"] == "DELETED":
+                        name = event["object"]["metadata"]["name"]
+                        if name in self.rollouts:
+                            self.rollouts[name].finish(FAILED, f'deployment "{name}" was deleted')
+                    elif event["type"] != "BOOKMARK":
+                        self._dispatch(event["object"])
+            except Exception as e:
+                if isinstance(e, KubeAPIError) and e.status_code == 410:
+                    # resourceVersion compacted away; the next pass starts with a fresh LIST.
+                    continue
+                logger.warning("Rollout watch on %s/%s failed, retrying: %s",
+                               self.context or "<current>", self.namespace, error_message(e))
+                for rollout in self.rollouts.values():
+                    if not rollout.observed:
+                        rollout.error = error_message(e)
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+
+class RolloutTracker:
+    """
+    Registry of tracked rollouts. `list_deployments(namespace, context)` is an
+    async callable returning a deployments LIST response; it is used for the
+    initial state, after watch restarts, and for polling without the API client.
+    """
+
+    def __init__(self, list_deployments):
+        self.list_deployments = list_deployments
+        self._rollouts: dict = {}
+        self._watches: dict = {}
+        self._tasks: set = set()
+
+    def reap(self):
+        """
+        Forgets rollouts that finished more than FINISHED_TTL_SECONDS ago.
+        """
+        cutoff = time.time() - FINISHED_TTL_SECONDS
+        for rollout_id in [rollout_id for rollout_id, rollout in self._rollouts.items()
+                           if rollout.done and rollout.finished_at < cutoff]:
+            del self._rollouts[rollout_id]
+
+    def track(self, namespace: str, name: str, context: str | None = None,
+              timeout: float = TRACK_TIMEOUT_SECONDS) -> Rollout:
+        """
+        Starts tracking a deployment's rollout and returns its handle at once.
+        A rollout of the same deployment that is still being tracked is reused.
+        """
+        self.reap()
+        watch = self._watches.get((context, namespace))
+        if watch is not None and name in watch.rollouts:
+            return watch.rollouts[name]
+
+        rollout = Rollout(namespace, name, context)
+        self._rollouts[rollout.id] = rollout
+        if watch is None:
+            watch = self._watches[(context, namespace)] = _NamespaceWatch(self, context, namespace)
+        watch.rollouts[name] = rollout
+        if watch.task is None:
+            watch.task = asyncio.create_task(watch.run())
+        expiry = asyncio.get_running_loop().call_later(
+            timeout, rollout.finish, TIMED_OUT, f"still progressing after {timeout:g}s"
+        )
+        task = asyncio.create_task(self._release(watch, rollout, expiry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return rollout
+
+    async def _release(self, watch: _NamespaceWatch, rollout: Rollout, expiry: asyncio.TimerHandle):
+        await rollout._done.wait()
+        expiry.cancel()
+        if watch.rollouts.get(rollout.name) is rollout:
+            del watch.rollouts[rollout.name]
+        if not watch.rollouts:
+            # Last rollout in the namespace: close its watch.
+            watch.task.cancel()
+            self._watches.pop((watch.context, watch.namespace), None)
+
+    def get(self, rollout_id: str) -> Rollout | None:
+        self.reap()
+        return self._rollouts.get(rollout_id)
+
+    def list(self) -> list:
+        self.reap()
+        return list(self._rollouts.values())
+
+    async def wait_all(self, rollouts: list, timeout: float) -> list:
+        """
+        Waits up to timeout seconds for all the given rollouts together and
+        returns their descriptions.
+        """
+        await asyncio.gather(*(rollout.wait(timeout) for rollout in rollouts))
+        return [rollout.describe() for rollout in rollouts]
@@ -0,0 +1,221 @@
+"""
+Per-tool metrics for the OKE MCP server.
+
+Every tool call is timed and its response size recorded in fixed-bucket
+histograms, together with error counts and the number of kubectl/helm
+subprocesses and Kubernetes API requests it made. Backend calls are attributed
+to the tool through a ContextVar, so calls made from tasks a tool spawns count
+too. The numbers are served as Prometheus text (OKE_MCP_METRICS_PORT) and as a
+JSON snapshot for the server_stats tool.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get("OKE_MCP_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("OKE_MCP_METRICS_HOST", "127.0.0.1")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current_tool: ContextVar = ContextVar("current_tool", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile by linear interpolation inside its bucket,
+        capped at the largest value seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets + (self.max,), self.counts):
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.output_bytes = Histogram(BYTES_BUCKETS)
+        self.backend_calls = {"subprocess": 0, "api": 0}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._tools: dict = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, tool: str) -> ToolStats:
+        stats = self._tools.get(tool)
+        if stats is None:
+            stats = self._tools[tool] = ToolStats()
+        return stats
+
+    def record_call(self, tool: str, seconds: float, output_bytes: int, error: bool):
+        with self._lock:
+            stats = self._stats(tool)
+            stats.calls += 1
+            stats.errors += error
+            stats.latency.observe(seconds)
+            stats.output_bytes.observe(output_bytes)
+
+    def record_backend_call(self, tool: str, backend: str):
+        with self._lock:
+            self._stats(tool).backend_calls[backend] += 1
+
+    def snapshot(self) -> list:
+        """
+        Per-tool summary, tools with the most total wall-clock time first.
+        """
+        with self._lock:
+            total_seconds = sum(stats.latency.sum for stats in self._tools.values()) or 1.0
+            rows = [
+                {
+                    "tool": tool,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "error_rate": round(stats.errors / stats.calls, 4) if stats.calls else 0.0,
+                    "total_seconds": round(stats.latency.sum, 3),
+                    "time_share": round(stats.latency.sum / total_seconds, 4),
+                    "p50_seconds": round(stats.latency.quantile(0.5), 4),
+                    "p95_seconds": round(stats.latency.quantile(0.95), 4),
+                    "max_seconds": round(stats.latency.max, 4),
+                    "avg_output_bytes": round(stats.output_bytes.sum / stats.calls) if stats.calls else 0,
+                    "max_output_bytes": int(stats.output_bytes.max),
+                    "subprocess_calls": stats.backend_calls["subprocess"],
+                    "api_calls": stats.backend_calls["api"],
+                }
+                for tool, stats in self._tools.items()
+            ]
+        return sorted(rows, key=lambda row: -row["total_seconds"])
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP oke_mcp_tool_calls_total Tool calls.",
+            "# TYPE oke_mcp_tool_calls_total counter",
+            "# HELP oke_mcp_tool_errors_total Tool calls that raised or returned an error.",
+            "# TYPE oke_mcp_tool_errors_total counter",
+            "# HELP oke_mcp_tool_backend_calls_total kubectl/helm subprocesses and API requests made by tools.",
+            "# TYPE oke_mcp_tool_backend_calls_total counter",
+            "# HELP oke_mcp_tool_duration_seconds Tool call latency.",
+            "# TYPE oke_mcp_tool_duration_seconds histogram",
+            "# HELP oke_mcp_tool_output_bytes Tool response size.",
+            "# TYPE oke_mcp_tool_output_bytes histogram",
+        ]
+        with self._lock:
+            for tool, stats in sorted(self._tools.items()):
+                label = f'tool="{tool}"'
+                lines.append(f"oke_mcp_tool_calls_total{{{label}}} {stats.calls}")
+                lines.append(f"oke_mcp_tool_errors_total{{{label}}} {stats.errors}")
+                for backend, count in stats.backend_calls.items():
+                    lines.append(f'oke_mcp_tool_backend_calls_total{{{label},backend="{backend}"}} {count}')
+                lines += _histogram_lines("oke_mcp_tool_duration_seconds", label, stats.latency)
+                lines += _histogram_lines("oke_mcp_tool_output_bytes", label, stats.output_bytes)
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, label: str, histogram: Histogram) -> list:
+    lines = []
+    cumulative = 0
+    for upper, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{label},le="{upper}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+class ToolCall:
+    """
+    Context manager around one tool call: attributes backend calls made inside
+    it to the tool and records latency, output size and errors on exit.
+    """
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.output_bytes = 0
+        self.error = False
+
+    def output(self, size: int, error: bool):
+        self.output_bytes = size
+        self.error = error
+
+    def __enter__(self):
+        self._token = _current_tool.set(self.tool)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_tool.reset(self._token)
+        registry.record_call(self.tool, time.perf_counter() - self._started,
+                             self.output_bytes, self.error or exc_type is not None)
+
+
+def record_backend_call(backend: str):
+    """
+    Counts a "subprocess" or "api" call against the tool currently running, if any.
+    """
+    tool = _current_tool.get()
+    if tool is not None:
+        registry.record_backend_call(tool, backend)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # stdout belongs to the MCP stdio transport.
+        pass
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    """
+    Serves /metrics in a background thread. Does nothing when port is 0.
+    """
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
+    return server
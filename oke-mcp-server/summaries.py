@@ -0,0 +1,154 @@
+"""
+Compact summaries of pods and nodes for the format="summary" tool mode.
+
+Instead of full JSON or `kubectl describe` text, each object becomes one table
+row (status, readiness, restarts, abnormal conditions and optionally its top
+events). Rows with problems sort first, and rendering stops at a byte budget
+with an explicit truncation footer, so the same cluster state always produces
+the same, predictably sized response.
+"""
+from tool_result import mark_truncated
+
+POD_HEADER = ("NAMESPACE", "NAME", "STATUS", "READY", "RESTARTS", "CONDITIONS")
+NODE_HEADER = ("NAME", "STATUS", "VERSION", "CONDITIONS")
+EVENTS_COLUMN = "EVENTS"
+EVENTS_PER_OBJECT = 2
+EVENT_MESSAGE_CHARS = 60
+NODE_PRESSURE_CONDITIONS = ("MemoryPressure", "DiskPressure", "PIDPressure", "NetworkUnavailable")
+
+
+def pod_status(pod: dict) -> str:
+    """
+    Returns the STATUS kubectl would show: a container waiting/terminated reason
+    such as CrashLoopBackOff when there is one, otherwise the pod phase.
+    """
+    if pod["metadata"].get("deletionTimestamp"):
+        return "Terminating"
+    status = pod.get("status", {})
+    for container in status.get("initContainerStatuses", []) + status.get("containerStatuses", []):
+        state = container.get("state", {})
+        reason = state.get("waiting", {}).get("reason") or state.get("terminated", {}).get("reason")
+        if reason and reason != "Completed":
+            return reason
+    return status.get("reason") or status.get("phase", "Unknown")
+
+
+def pod_row(pod: dict) -> tuple:
+    status = pod.get("status", {})
+    containers = status.get("containerStatuses", [])
+    ready = sum(1 for container in containers if container.get("ready"))
+    total = len(pod.get("spec", {}).get("containers", [])) or len(containers)
+    restarts = sum(container.get("restartCount", 0) for container in containers)
+    conditions = ",".join(
+        f"{condition['type']}={condition['status']}"
+        for condition in status.get("conditions", [])
+        if condition.get("status") != "True"
+    )
+    return (
+        pod["metadata"].get("namespace", ""),
+        pod["metadata"]["name"],
+        pod_status(pod),
+        f"{ready}/{total}",
+        str(restarts),
+        conditions or "-",
+    )
+
+
+def pod_is_healthy(row: tuple) -> bool:
+    status, ready = row[2], row[3]
+    done, total = ready.split("/")
+    return status == "Succeeded" or (status == "Running" and done == total)
+
+
+def node_row(node: dict) -> tuple:
+    status = node.get("status", {})
+    ready = "Unknown"
+    abnormal = []
+    for condition in status.get("conditions", []):
+        if condition["type"] == "Ready":
+            ready = "Ready" if condition["status"] == "True" else "NotReady"
+        elif condition["type"] in NODE_PRESSURE_CONDITIONS and condition["status"] == "True":
+            abnormal.append(condition["type"])
+    if node.get("spec", {}).get("unschedulable"):
+        ready += ",SchedulingDisabled"
+    return (
+        node["metadata"]["name"],
+        ready,
+        status.get("nodeInfo", {}).get("kubeletVersion", ""),
+        ",".join(abnormal) or "-",
+    )
+
+
+def node_is_healthy(row: tuple) -> bool:
+    return row[1] == "Ready" and row[3] == "-"
+
+
+def top_events(events: list, per_object: int = EVENTS_PER_OBJECT) -> dict:
+    """
+    Groups events by involved object and keeps the most frequent ones,
+    keyed by (kind, namespace, name).
+    """
+    grouped: dict = {}
+    for event in events:
+        obj = event.get("involvedObject", {})
+        kind = obj.get("kind", "")
+        # Node events are recorded in some namespace, but nodes themselves are cluster-scoped.
+        namespace = "" if kind == "Node" else obj.get("namespace", "")
+        key = (kind, namespace, obj.get("name", ""))
+        grouped.setdefault(key, []).append(event)
+    summary = {}
+    for key, object_events in grouped.items():
+        object_events.sort(key=lambda event: (-(event.get("count") or 1), event.get("reason", "")))
+        summary[key] = "; ".join(
+            f"{event.get('reason', '')} x{event.get('count') or 1}: "
+            f"{(event.get('message') or '').strip()[:EVENT_MESSAGE_CHARS]}"
+            for event in object_events[:per_object]
+        )
+    return summary
+
+
+def render_table(header: tuple, rows: list, max_bytes: int) -> str:
+    """
+    Renders rows as a " | "-separated table, stopping before max_bytes
+    (UTF-8 encoded, footer excluded) and noting how many rows were cut.
+    """
+    lines = [" | ".join(header)]
+    used = len(lines[0].encode()) + 1
+    for row in rows:
+        line = " | ".join(row)
+        size = len(line.encode()) + 1
+        if used + size > max_bytes:
+            break
+        lines.append(line)
+        used += size
+    shown = len(lines) - 1
+    if shown < len(rows):
+        mark_truncated()
+        lines.append(f"... truncated: showing {shown} of {len(rows)} rows (max_bytes={max_bytes})")
+    return "\n".join(lines)
+
+
+def summarize_pods(pods: list, max_bytes: int, events: list | None = None) -> str:
+    """
+    Summarizes pods, unhealthy first. Adds an EVENTS column when events are given.
+    """
+    rows = sorted((pod_row(pod) for pod in pods), key=lambda row: (pod_is_healthy(row), row[0], row[1]))
+    header = POD_HEADER
+    if events is not None:
+        header += (EVENTS_COLUMN,)
+        by_object = top_events(events)
+        rows = [row + (by_object.get(("Pod", row[0], row[1]), "-"),) for row in rows]
+    return render_table(header, rows, max_bytes)
+
+
+def summarize_nodes(nodes: list, max_bytes: int, events: list | None = None) -> str:
+    """
+    Summarizes nodes, unhealthy first. Adds an EVENTS column when events are given.
+    """
+    rows = sorted((node_row(node) for node in nodes), key=lambda row: (node_is_healthy(row), row[0]))
+    header = NODE_HEADER
+    if events is not None:
+        header += (EVENTS_COLUMN,)
+        by_object = top_events(events)
+        rows = [row + (by_object.get(("Node", "", row[0]), "-"),) for row in rows]
+    return render_table(header, rows, max_bytes)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import deployment_config
+from deployment_config import ConfigWatcher, DeploymentConfig, KeywordAutomaton, parse_rules
+
+
+def test_automaton_finds_overlapping_keywords_case_insensitively():
+    automaton = KeywordAutomaton(["nginx", "gin", "api", "x"])
+    assert sorted(automaton.search("My-NGINX-Api")) == [0, 1, 2, 3]
+    assert automaton.search("worker") == []
+
+
+def test_automaton_follows_failure_links():
+    automaton = KeywordAutomaton(["abcd", "bc"])
+    assert automaton.search("abce") == [1]
+
+
+def test_earlier_rule_wins_and_namespaces_filter():
+    config = DeploymentConfig(parse_rules({"rules": [
+        {"keyword": "web", "image": "web:prod", "namespaces": ["prod"]},
+        {"keyword": "frontend", "image": "frontend:1"},
+        {"keyword": "web", "image": "web:any"},
+    ]}))
+    assert config.match("frontend-web", "prod").image == "web:prod"
+    assert config.match("frontend-web", "dev").image == "frontend:1"
+    assert config.match("web", "dev").image == "web:any"
+    assert config.match("worker", "prod") is None
+
+
+def test_legacy_mapping_and_invalid_rules():
+    rules = parse_rules({"nginx": "nginx:latest"})
+    assert rules[0].keyword == "nginx" and rules[0].namespaces is None and rules[0].containers is None
+    assert rules[0].select_containers([{"name": "a"}, {"name": "b"}]) == [{"name": "a"}]
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [{"keyword": "", "image": "x"}]})
+
+
+def test_watcher_raises_until_loaded_then_keeps_last_good_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(deployment_config, "RELOAD_CHECK_SECONDS", 0)
+    path = tmp_path / "rules.yaml"
+    path.write_text("rules: [")
+    watcher = ConfigWatcher(str(path))
+    for _ in range(2):
+        with pytest.raises(Exception):
+            watcher.get()
+
+    path.write_text("nginx: nginx:1\n")
+    os.utime(path, ns=(1, 1))
+    assert watcher.get().match("nginx", "default").image == "nginx:1"
+
+    path.write_text("rules: [")
+    os.utime(path, ns=(2, 2))
+    assert watcher.get().match("nginx", "default").image == "nginx:1"
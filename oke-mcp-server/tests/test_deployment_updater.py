@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from deployment_updater import NamespaceRateLimiter, apply_plan
+
+
+def entry(namespace, name):
+    return {"namespace": namespace, "name": name, "status": "planned", "changes": []}
+
+
+def run_plan(plan, **kwargs):
+    patched = {}
+    start = time.monotonic()
+
+    async def patch(namespace, name, body):
+        patched[name] = time.monotonic() - start
+
+    asyncio.run(apply_plan(plan, patch, **kwargs))
+    return patched
+
+
+def test_busy_namespace_does_not_delay_another():
+    plan = [entry("a", f"a{index}") for index in range(30)] + [entry("b", "b0")]
+    patched = run_plan(plan, max_workers=10, namespace_rate=50.0)
+    assert patched["b0"] < 0.1
+    assert patched["a29"] >= 29 / 50.0 - 0.05
+
+
+def test_failed_patch_is_recorded():
+    plan = [entry("a", "good"), entry("a", "bad")]
+
+    async def patch(namespace, name, body):
+        if name == "bad":
+            raise RuntimeError("conflict")
+
+    asyncio.run(apply_plan(plan, patch, namespace_rate=0))
+    assert [item["status"] for item in plan] == ["patched", "failed"]
+    assert plan[1]["error"] == "conflict"
+
+
+def test_rate_limiter_spaces_one_namespace_only():
+    async def slots():
+        limiter = NamespaceRateLimiter(20.0)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def timed(namespace):
+            await limiter.acquire(namespace)
+            return loop.time() - start
+
+        return await asyncio.gather(*(timed(namespace) for namespace in ["a", "a", "a", "b"]))
+
+    first, second, third, other = asyncio.run(slots())
+    assert first < 0.02 and other < 0.02
+    assert second >= 0.04 and third >= 0.09
@@ -0,0 +1,44 @@
+import pytest
+from mcp.server.fastmcp.exceptions import ToolError
+
+from kubectl_args import check_allowed, parse
+
+
+@pytest.mark.parametrize("args", [
+    "get --raw /api/v1/namespaces/default/secrets",
+    "get --raw=/api/v1/namespaces/default/secrets",
+    "get pods --raw /api/v1/namespaces/default/secrets",
+    "get secrets",
+    "get secret/db-password",
+    "get -f manifest.yaml -o yaml",
+    "get -fmanifest.yaml",
+    "describe --filename=https://example.com/secrets.yaml",
+    "get --filename manifest.yaml",
+    "get -k ./overlay -o yaml",
+    "get --kustomize=./overlay",
+])
+def test_secrets_are_rejected(args):
+    with pytest.raises(ToolError):
+        check_allowed(parse(args))
+
+
+def test_raw_path_is_a_flag_value_not_an_operand():
+    command = parse("get --raw /api/v1/namespaces/default/secrets")
+    assert command.flags["--raw"] == "/api/v1/namespaces/default/secrets"
+    assert command.resources == ()
+
+
+def test_plain_get_is_allowed():
+    check_allowed(parse("get pods -n kube-system -o wide"))
+
+
+def test_kustomize_directory_is_a_flag_value_not_an_operand():
+    command = parse("get -k ./overlay")
+    assert command.flags["--kustomize"] == "./overlay"
+    assert command.resources == ()
+
+
+def test_logs_follow_is_not_a_filename():
+    command = parse("logs -f web-0")
+    assert command.flags == {"--follow": True}
+    assert command.names == ("web-0",)
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from metrics_sampler import SeriesBuffer, nan_percentiles, parse_quantity, usage, window_stats
+
+
+def test_nan_percentiles_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.random((50, 40))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[:, 0] = rng.random(50)
+    p50, p95, peak = nan_percentiles(values, (50, 95))
+    np.testing.assert_allclose(p50, np.nanpercentile(values, 50, axis=1))
+    np.testing.assert_allclose(p95, np.nanpercentile(values, 95, axis=1))
+    np.testing.assert_allclose(peak, np.nanmax(values, axis=1))
+
+
+def test_quantities_and_pod_usage():
+    assert parse_quantity("250m") == pytest.approx(0.25)
+    assert parse_quantity("123456789n") == pytest.approx(0.123456789)
+    assert parse_quantity("512Mi") == 512 * 2 ** 20
+    with pytest.raises(ValueError):
+        parse_quantity("12parsecs")
+    pod = {"containers": [{"usage": {"cpu": "100m", "memory": "1Mi"}}, {"usage": {"cpu": "50m"}}]}
+    assert usage(pod) == (pytest.approx(0.15), 2 ** 20)
+
+
+def test_ring_buffer_keeps_the_last_scrapes():
+    buffer = SeriesBuffer(capacity=3)
+    now = time.time()
+    for scrape in range(5):
+        buffer.add(now - 4 + scrape, [(("prod", "web"), float(scrape), 1.0)])
+    keys, cpu, _ = buffer.window(3600)
+    assert keys == [("prod", "web")]
+    assert sorted(cpu[0].tolist()) == [2.0, 3.0, 4.0]
+
+
+def test_absent_series_rows_are_reused_and_growth_works():
+    buffer = SeriesBuffer(capacity=2)
+    now = time.time()
+    buffer.add(now, [(("prod", f"pod-{index}"), 1.0, 1.0) for index in range(300)])
+    buffer.add(now, [(("prod", "new"), 1.0, 1.0)])
+    buffer.add(now, [(("prod", "new"), 1.0, 1.0)])
+    assert len(buffer._free) == 300
+    buffer.add(now, [(("prod", "new"), 1.0, 1.0), (("prod", "newer"), 1.0, 1.0)])
+    keys, _, _ = buffer.window(3600)
+    assert sorted(keys) == [("prod", "new"), ("prod", "newer")]
+    assert buffer._rows[("prod", "newer")] < 300
+
+
+def test_window_stats_skip_empty_series_and_sort_by_p95():
+    keys = [("a", "idle"), ("a", "busy"), ("b", "gone")]
+    cpu = np.array([[0.1, 0.1], [1.0, 2.0], [np.nan, np.nan]], dtype=np.float32)
+    memory = np.full((3, 2), 2 ** 20, dtype=np.float32)
+    stats = window_stats(keys, cpu, memory)
+    assert [row["name"] for row in stats] == ["busy", "idle"]
+    assert stats[0]["cpu_max_m"] == 2000.0 and stats[0]["memory_p95_mib"] == 1.0
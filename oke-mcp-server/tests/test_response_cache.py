@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, cached_response
+
+
+def counting(result="ok", delay=0.0, error=None):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return compute, calls
+
+
+def test_result_is_reused_until_ttl_expires():
+    cache = ResponseCache()
+    compute, calls = counting()
+
+    async def scenario():
+        await cache.get("key", 0.05, compute)
+        await cache.get("key", 0.05, compute)
+        await asyncio.sleep(0.06)
+        await cache.get("key", 0.05, compute)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "coalesced": 0}
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    cache = ResponseCache()
+    compute, calls = counting(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("key", 10, compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["ok"] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+
+
+def test_failures_are_not_cached_and_bypass_refreshes():
+    cache = ResponseCache()
+    failing, failed_calls = counting(error=RuntimeError("boom"))
+    compute, calls = counting()
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get("key", 10, failing)
+        await cache.get("key", 10, compute)
+        await cache.get("key", 10, compute, bypass=True)
+
+    asyncio.run(scenario())
+    assert len(failed_calls) == 2
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "a", "c"):
+            await cache.get(key, 10, counting(key)[0])
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
+
+
+def test_decorator_keys_on_arguments_and_drops_cache_bypass(monkeypatch):
+    monkeypatch.setattr(response_cache, "response_cache", ResponseCache())
+    monkeypatch.setitem(response_cache.RESPONSE_TTLS, "explain_resource", 60)
+    calls = []
+
+    @cached_response
+    async def explain_resource(resource: str, cache_bypass: bool = False):
+        calls.append(resource)
+        return resource
+
+    async def scenario():
+        await explain_resource("pods")
+        await explain_resource(resource="pods")
+        await explain_resource("nodes")
+        await explain_resource("pods", cache_bypass=True)
+
+    asyncio.run(scenario())
+    assert calls == ["pods", "nodes", "pods"]
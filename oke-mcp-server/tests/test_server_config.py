@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def concurrency_limits(value: str) -> dict:
+    # A fresh interpreter, since the limits are read when the server module is imported.
+    result = subprocess.run(
+        [sys.executable, "-c", "import json, oracle_kubernetes_server as s; print(json.dumps(s.CONCURRENCY_LIMITS))"],
+        cwd=SERVER_DIR, env={**os.environ, "OKE_MCP_CONCURRENCY": value}, capture_output=True, text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_malformed_concurrency_entries_fall_back_to_defaults():
+    limits = concurrency_limits("describe=2,helm=x,read=0,bogus=3,exec")
+    assert limits["describe"] == 2
+    assert limits["helm"] == 4
+    assert limits["read"] == 32
+    assert limits["exec"] == 8
+    assert "bogus" not in limits
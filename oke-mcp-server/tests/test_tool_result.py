@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from mcp.server.fastmcp.exceptions import ToolError
+
+from k8s_client import KubeAPIError
+from oracle_kubernetes_server import InstrumentedFastMCP
+from server_metrics import registry
+from tool_result import CommandError, enveloped, mark_cache_hit, mark_truncated
+
+
+def call(fn, *args, **kwargs):
+    return asyncio.run(enveloped(fn)(*args, **kwargs))
+
+
+def test_success_carries_data_and_flags():
+    async def tool(count: int):
+        mark_truncated()
+        mark_cache_hit()
+        return {"items": list(range(count))}
+
+    result = call(tool, 2)
+    assert result["status"] == "ok" and result["error"] is None
+    assert result["data"] == {"items": [0, 1]}
+    assert result["truncated"] and result["cache_hit"]
+
+
+def test_flags_do_not_leak_between_calls():
+    async def tool():
+        return "plain"
+
+    result = call(tool)
+    assert not result["truncated"] and not result["cache_hit"]
+
+
+def test_errors_are_marked_with_their_message():
+    for error, message in [
+        (KubeAPIError(404, 'pods "web" not found'), 'pods "web" not found'),
+        (CommandError("kubectl exited with 1", 1), "kubectl exited with 1"),
+        (ToolError("verb not allowed"), "verb not allowed"),
+        (RuntimeError(), "RuntimeError"),
+    ]:
+        async def tool():
+            raise error
+
+        result = call(tool)
+        assert result["status"] == "error"
+        assert result["error"] == message
+        assert result["data"] is None
+
+
+def test_server_sends_the_envelope_and_counts_errors():
+    server = InstrumentedFastMCP("test")
+
+    @server.tool()
+    async def failing_tool_for_test() -> str:
+        raise KubeAPIError(403, "forbidden")
+
+    content, result = asyncio.run(server.call_tool("failing_tool_for_test", {}))
+    assert json.loads(content[0].text) == result
+    assert result["status"] == "error" and result["error"] == "forbidden"
+    stats = next(row for row in registry.snapshot() if row["tool"] == "failing_tool_for_test")
+    assert stats["calls"] == 1 and stats["errors"] == 1
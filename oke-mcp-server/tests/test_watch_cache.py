@@ -0,0 +1,57 @@
+import threading
+import time
+
+from watch_cache import Informer
+
+
+class FakeClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.lists = 0
+        self._lock = threading.Lock()
+
+    def list(self, resource, **params):
+        with self._lock:
+            self.lists += 1
+        time.sleep(self.delay)
+        return {
+            "metadata": {"resourceVersion": str(self.lists)},
+            "items": [
+                {"metadata": {"namespace": "prod", "name": "web-0"}},
+                {"metadata": {"namespace": "dev", "name": "api-0"}},
+            ],
+        }
+
+
+def test_items_are_indexed_by_namespace():
+    informer = Informer(FakeClient(), "pods")
+    informer.relist()
+    assert [item["metadata"]["name"] for item in informer.items("prod")] == ["web-0"]
+    assert len(informer.items()) == 2
+    assert informer.items("missing") == []
+
+
+def test_fresh_store_is_not_relisted():
+    client = FakeClient()
+    informer = Informer(client, "pods")
+    informer.relist()
+    informer.items("prod", max_staleness=60)
+    assert client.lists == 1
+
+
+def test_concurrent_stale_readers_share_one_relist():
+    client = FakeClient(delay=0.2)
+    informer = Informer(client, "pods")
+    informer.relist()
+    informer.last_sync -= 60
+    results = []
+    readers = [
+        threading.Thread(target=lambda: results.append(informer.items("prod", max_staleness=15)))
+        for _ in range(8)
+    ]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    assert client.lists == 2
+    assert all(len(items) == 1 for items in results)
@@ -0,0 +1,123 @@
+"""
+Typed result envelope returned by every OKE MCP tool.
+
+Tools return plain data (a dict, list or text) and raise on failure; the
+envelope adds status, error, duration and whether the response was truncated
+or served from a cache, and is sent once as structured MCP content plus its
+compact JSON text. Clients check `status` instead of parsing "Error: ..."
+prefixes out of text.
+"""
+import functools
+import inspect
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Literal, TypedDict
+
+try:
+    import orjson
+except ImportError:  # plain json, just slower
+    orjson = None
+
+from mcp.server.fastmcp.exceptions import ToolError
+
+from k8s_client import KubeAPIError
+
+logger = logging.getLogger(__name__)
+
+
+class ToolResult(TypedDict):
+    status: Literal["ok", "error"]
+    data: Any
+    error: str | None
+    duration_ms: float
+    truncated: bool
+    cache_hit: bool
+
+
+class CommandError(Exception):
+    """
+    Raised when a kubectl/helm subprocess cannot be started or exits non-zero.
+    """
+
+    def __init__(self, message: str, returncode: int | None = None):
+        super().__init__(message)
+        self.message = message
+        self.returncode = returncode
+
+
+class _CallFlags:
+    def __init__(self):
+        self.truncated = False
+        self.cache_hit = False
+
+
+_flags: ContextVar = ContextVar("tool_call_flags", default=None)
+
+
+def mark_truncated():
+    """
+    Flags the running tool's response as cut to fit a size or time budget.
+    """
+    flags = _flags.get()
+    if flags is not None:
+        flags.truncated = True
+
+
+def mark_cache_hit():
+    """
+    Flags the running tool's response as served (at least partly) from a cache.
+    """
+    flags = _flags.get()
+    if flags is not None:
+        flags.cache_hit = True
+
+
+def error_message(error: Exception) -> str:
+    if isinstance(error, (KubeAPIError, CommandError)):
+        return error.message
+    return str(error) or type(error).__name__
+
+
+def enveloped(fn):
+    """
+    Wraps a tool so it returns a ToolResult. Exceptions become status "error";
+    the return annotation is rewritten so FastMCP advertises the envelope as
+    the tool's output schema.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs) -> ToolResult:
+        flags = _CallFlags()
+        token = _flags.set(flags)
+        started = time.perf_counter()
+        data, error = None, None
+        try:
+            data = await fn(*args, **kwargs)
+        except (KubeAPIError, CommandError, ToolError, ValueError) as e:
+            error = error_message(e)
+        except Exception as e:
+            logger.exception("Tool %s failed", fn.__name__)
+            error = error_message(e)
+        finally:
+            _flags.reset(token)
+        return {
+            "status": "error" if error is not None else "ok",
+            "data": data,
+            "error": error,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "truncated": flags.truncated,
+            "cache_hit": flags.cache_hit,
+        }
+
+    wrapper.__signature__ = inspect.signature(fn).replace(return_annotation=ToolResult)
+    return wrapper
+
+
+def dumps(result) -> str:
+    """
+    Compact JSON text of a result.
+    """
+    if orjson is not None:
+        return orjson.dumps(result, default=str).decode()
+    return json.dumps(result, separators=(",", ":"), default=str)
@@ -0,0 +1,198 @@
+"""
+Informer-style watch cache for the read-only MCP tools.
+
+Each Informer LISTs one resource kind once, then keeps an in-memory store up to
+date from a WATCH stream (with resourceVersion bookmarks) running in a
+background thread. Tools read from the store instead of re-listing the whole
+cluster; if the store has not heard from the API server within a tool's
+staleness bound, the read forces a fresh LIST first. Only one LIST runs per
+informer at a time; stale readers that arrive meanwhile wait for it and use
+its result.
+"""
+import logging
+import os
+import threading
+import time
+
+from k8s_client import RESOURCES, KubeAPIError, KubeClient
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("OKE_MCP_WATCH_CACHE", "").lower() in ("1", "true", "yes")
+WATCHED_RESOURCES = ("pods", "nodes", "services", "events")
+LIST_PAGE_SIZE = 500
+WATCH_TIMEOUT_SECONDS = 300
+RETRY_DELAY_SECONDS = 5
+
+# Seconds a tool tolerates since the store last heard from the API server.
+# Override with OKE_MCP_MAX_STALENESS="get_events=30,get_all_pods=60".
+MAX_STALENESS = {
+    "get_all_pods": 120,
+    "get_nodes": 300,
+    "get_all_services": 300,
+    "get_events": 120,
+    "describe_pods": 120,
+    "describe_nodes": 300,
+    "restart_unhealthy_pods": 15,
+    "kubectl_generic": 60,
+}
+for _entry in filter(None, os.environ.get("OKE_MCP_MAX_STALENESS", "").split(",")):
+    _tool, _, _seconds = _entry.partition("=")
+    MAX_STALENESS[_tool.strip()] = float(_seconds)
+
+
+class Informer:
+    """
+    Keeps a namespace-indexed copy of one resource kind in sync with the cluster.
+    """
+
+    def __init__(self, client: KubeClient, resource: str):
+        self.client = client
+        self.resource = resource
+        self.resource_version = None
+        self.last_sync = 0.0
+        self._by_namespace: dict = {}
+        self._lock = threading.Lock()
+        self._relist_lock = threading.Lock()
+        self._synced = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"informer-{resource}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    def staleness(self) -> float:
+        return time.monotonic() - self.last_sync
+
+    def relist(self):
+        """
+        Replaces the store with a fresh paginated LIST and records its resourceVersion.
+        """
+        with self._relist_lock:
+            self._relist()
+
+    def refresh(self, max_staleness: float):
+        """
+        Relists when the store is older than max_staleness seconds. A caller that
+        waited for another thread's LIST re-checks first, so concurrent stale
+        readers share one LIST instead of each listing the cluster.
+        """
+        if self.staleness() <= max_staleness:
+            return
+        with self._relist_lock:
+            if self.staleness() > max_staleness:
+                self._relist()
+
+    def _relist(self):
+        by_namespace: dict = {}
+        continue_token = None
+        while True:
+            page = self.client.list(self.resource, limit=LIST_PAGE_SIZE, **{"continue": continue_token})
+            for item in page.get("items", []):
+                metadata = item["metadata"]
+                by_namespace.setdefault(metadata.get("namespace", ""), {})[metadata["name"]] = item
+            continue_token = page.get("metadata", {}).get("continue")
+            if not continue_token:
+                break
+        with self._lock:
+            self._by_namespace = by_namespace
+            self.resource_version = page.get("metadata", {}).get("resourceVersion", "")
+            self.last_sync = time.monotonic()
+        self._synced.set()
+
+    def _apply(self, event: dict):
+        obj = event["object"]
+        metadata = obj.get("metadata", {})
+        with self._lock:
+            self.resource_version = metadata.get("resourceVersion", self.resource_version)
+            self.last_sync = time.monotonic()
+            if event["type"] == "BOOKMARK":
+                return
+            namespace = self._by_namespace.setdefault(metadata.get("namespace", ""), {})
+            if event["type"] == "DELETED":
+                namespace.pop(metadata["name"], None)
+            else:
+                namespace[metadata["name"]] = obj
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.resource_version is None:
+                    self.relist()
+                for event in self.client.watch(self.resource, self.resource_version,
+                                               timeout_seconds=WATCH_TIMEOUT_SECONDS):
+                    self._apply(event)
+                    if self._stop.is_set():
+                        return
+            except KubeAPIError as e:
+                if e.status_code == 410:
+                    # resourceVersion compacted away; start over with a fresh LIST.
+                    self.resource_version = None
+                    continue
+                logger.warning("Watch on %s failed, retrying: %s", self.resource, e)
+                self._stop.wait(RETRY_DELAY_SECONDS)
+            except Exception:
+                logger.exception("Informer for %s crashed, relisting", self.resource)
+                self.resource_version = None
+                self._stop.wait(RETRY_DELAY_SECONDS)
+
+    def items(self, namespace: str | None = None, max_staleness: float | None = None) -> list:
+        """
+        Returns the cached objects, for one namespace or all of them.
+        Forces a fresh LIST when the store is older than max_staleness seconds.
+        """
+        if max_staleness is not None:
+            self.refresh(max_staleness)
+        with self._lock:
+            if namespace is not None:
+                return list(self._by_namespace.get(namespace, {}).values())
+            return [item for objects in self._by_namespace.values() for item in objects.values()]
+
+    def list_response(self, namespace: str | None = None, max_staleness: float | None = None) -> dict:
+        """
+        Returns the cached objects shaped like an API LIST response.
+        """
+        items = self.items(namespace, max_staleness)
+        prefix, _, _, kind = RESOURCES[self.resource]
+        return {
+            "apiVersion": prefix.removeprefix("/api/").removeprefix("/apis/"),
+            "kind": f"{kind}List",
+            "metadata": {"resourceVersion": self.resource_version},
+            "items": items,
+        }
+
+
+# ----------------------- Informer Registry -----------------------
+
+_informers: dict = {}
+
+
+def start_informers(client: KubeClient, resources=WATCHED_RESOURCES):
+    """
+    Starts one background informer per resource kind (no-op unless OKE_MCP_WATCH_CACHE is set).
+    """
+    if not ENABLED or client is None:
+        return
+    for resource in resources:
+        if resource not in _informers:
+            informer = Informer(client, resource)
+            informer.start()
+            _informers[resource] = informer
+
+
+def cached_list(tool: str, resource: str, namespace: str | None = None) -> dict | None:
+    """
+    Answers a LIST from the watch cache using the tool's staleness bound.
+    Returns None when there is no synced informer, so the caller lists directly.
+    """
+    informer = _informers.get(resource)
+    if informer is None or not informer.synced:
+        return None
+    return informer.list_response(namespace, max_staleness=MAX_STALENESS.get(tool))
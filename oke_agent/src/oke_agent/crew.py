@@ -12,17 +12,22 @@ from .tools.custom_tool import (
     CostOptimizationTool,
     UpgradeTool
 )
+from .tools.snapshot import SnapshotCache
 
 @CrewBase
 class OkeDiagnosticAgent:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self):
+        # One cache per crew run: the agents run one after another and reuse each other's cluster reads.
+        self.cluster_cache = SnapshotCache()
+
     @agent
     def diagnostic_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['diagnostic_agent'],
-            tools=[KubectlTool()],
+            tools=[KubectlTool(cache=self.cluster_cache)],
             verbose=True
         )
 
@@ -30,7 +35,7 @@ class OkeDiagnosticAgent:
     def remediation_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['remediation_agent'],
-            tools=[RemediationTool()],
+            tools=[RemediationTool(cache=self.cluster_cache)],
             verbose=True
         )
 
@@ -38,7 +43,7 @@ class OkeDiagnosticAgent:
     def observability_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['observability_agent'],
-            tools=[ObservabilityTool()],
+            tools=[ObservabilityTool(cache=self.cluster_cache)],
             verbose=True
         )
 
@@ -46,7 +51,7 @@ class OkeDiagnosticAgent:
     def security_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['security_agent'],
-            tools=[SecurityAuditTool()],
+            tools=[SecurityAuditTool(cache=self.cluster_cache)],
             verbose=True
         )
 
@@ -54,7 +59,7 @@ class OkeDiagnosticAgent:
     def cost_analysis_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['cost_analysis_agent'],
-            tools=[CostOptimizationTool()],
+            tools=[CostOptimizationTool(cache=self.cluster_cache)],
             verbose=True
         )
 
@@ -62,7 +67,7 @@ class OkeDiagnosticAgent:
     def upgrade_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['upgrade_agent'],
-            tools=[UpgradeTool()],
+            tools=[UpgradeTool(cache=self.cluster_cache)],
             verbose=True
         )
 
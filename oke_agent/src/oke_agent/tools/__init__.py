@@ -1,3 +1,8 @@
 from .custom_tool import KubectlTool
+from .snapshot import ClusterSnapshot, collect_snapshot
+from .analysis import Finding, analyze
+from .security import RbacGraph, audit
+from .cost import CostReport, cost_report
 
-__all__ = ['KubectlTool']
+__all__ = ['KubectlTool', 'ClusterSnapshot', 'collect_snapshot', 'Finding', 'analyze', 'RbacGraph', 'audit',
+           'CostReport', 'cost_report']
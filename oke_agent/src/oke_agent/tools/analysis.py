@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+
+# ========== Rules ==========
+
+# Container waiting reasons that mean a pod cannot run, and how bad they are.
+POD_WAITING_REASONS = {
+    "CrashLoopBackOff": "critical",
+    "ImagePullBackOff": "critical",
+    "ErrImagePull": "critical",
+    "CreateContainerConfigError": "critical",
+    "InvalidImageName": "critical",
+}
+NODE_PRESSURE_CONDITIONS = ("MemoryPressure", "DiskPressure", "PIDPressure", "NetworkUnavailable")
+SEVERITY_ORDER = {"critical": 0, "warning": 1}
+KIND_ORDER = {"Node": 0, "Pod": 1, "PersistentVolumeClaim": 2}
+EVENTS_PER_FINDING = 3
+EVENT_MESSAGE_CHARS = 120
+FINDINGS_LIMIT = 50
+
+# ========== Findings ==========
+
+@dataclass(frozen=True)
+class Finding:
+    severity: str
+    kind: str
+    namespace: str
+    name: str
+    issue: str
+    detail: str
+    score: int = 0
+    events: tuple = ()
+
+    def sort_key(self) -> tuple:
+        return (SEVERITY_ORDER.get(self.severity, len(SEVERITY_ORDER)), -self.score,
+                KIND_ORDER.get(self.kind, len(KIND_ORDER)), self.namespace, self.name, self.issue)
+
+    def line(self) -> str:
+        target = f"{self.namespace}/{self.name}" if self.namespace else self.name
+        text = f"[{self.severity}] {self.kind} {target}: {self.issue}"
+        if self.detail:
+            text += f" ({self.detail})"
+        for event in self.events:
+            text += f"\n     event: {event}"
+        return text
+
+def _object_key(kind: str, namespace: str, name: str) -> tuple:
+    # Node events are recorded in some namespace, but nodes themselves are cluster-scoped.
+    return kind, "" if kind == "Node" else namespace or "", name
+
+def pod_findings(pods) -> list:
+    findings = []
+    for pod in pods:
+        meta, status = pod["metadata"], pod.get("status", {})
+        namespace, name = meta.get("namespace", ""), meta["name"]
+        containers = status.get("initContainerStatuses", []) + status.get("containerStatuses", [])
+        restarts = sum(container.get("restartCount", 0) for container in containers)
+        reported = False
+        for container in containers:
+            waiting = container.get("state", {}).get("waiting", {})
+            reason = waiting.get("reason")
+            if reason not in POD_WAITING_REASONS:
+                continue
+            detail = [f"container {container['name']}", f"{container.get('restartCount', 0)} restarts"]
+            last_exit = container.get("lastState", {}).get("terminated", {})
+            if last_exit.get("reason"):
+                detail.append(f"last exit {last_exit['reason']} code {last_exit.get('exitCode')}")
+            elif waiting.get("message"):
+                detail.append(waiting["message"][:EVENT_MESSAGE_CHARS])
+            findings.append(Finding(POD_WAITING_REASONS[reason], "Pod", namespace, name, reason,
+                                    ", ".join(detail), restarts))
+            reported = True
+        if reported:
+            continue
+        phase = status.get("phase")
+        if phase == "Failed":
+            findings.append(Finding("warning", "Pod", namespace, name, "Failed",
+                                    status.get("reason") or status.get("message", "")[:EVENT_MESSAGE_CHARS],
+                                    restarts))
+        elif phase == "Pending":
+            for condition in status.get("conditions", []):
+                if condition.get("type") == "PodScheduled" and condition.get("status") == "False":
+                    findings.append(Finding("warning", "Pod", namespace, name,
+                                            condition.get("reason") or "Unschedulable",
+                                            (condition.get("message") or "")[:EVENT_MESSAGE_CHARS], restarts))
+    return findings
+
+def node_findings(nodes) -> list:
+    findings = []
+    for node in nodes:
+        name = node["metadata"]["name"]
+        conditions = {condition["type"]: condition for condition in node.get("status", {}).get("conditions", [])}
+        ready = conditions.get("Ready", {})
+        if ready.get("status") != "True":
+            detail = ready.get("reason") or "no Ready condition"
+            if ready.get("message"):
+                detail += f": {ready['message'][:EVENT_MESSAGE_CHARS]}"
+            findings.append(Finding("critical", "Node", "", name, "NotReady", detail))
+        for condition_type in NODE_PRESSURE_CONDITIONS:
+            if conditions.get(condition_type, {}).get("status") == "True":
+                findings.append(Finding("warning", "Node", "", name, condition_type,
+                                        (conditions[condition_type].get("message") or "")[:EVENT_MESSAGE_CHARS]))
+        if node.get("spec", {}).get("unschedulable"):
+            findings.append(Finding("warning", "Node", "", name, "SchedulingDisabled", "cordoned"))
+    return findings
+
+def pvc_findings(pvcs) -> list:
+    findings = []
+    for pvc in pvcs:
+        meta, phase = pvc["metadata"], pvc.get("status", {}).get("phase")
+        if phase in ("Pending", "Lost"):
+            storage_class = pvc.get("spec", {}).get("storageClassName") or "default storage class"
+            findings.append(Finding("critical" if phase == "Lost" else "warning", "PersistentVolumeClaim",
+                                    meta.get("namespace", ""), meta["name"], phase, storage_class))
+    return findings
+
+def index_events(events) -> dict:
+    """
+    Warning events by involved object as (count, "Reason xCount: message")
+    pairs, most frequent first.
+    """
+    grouped: dict = {}
+    for event in events:
+        if event.get("type") != "Warning":
+            continue
+        obj = event.get("involvedObject", {})
+        count = event.get("count") or (event.get("series") or {}).get("count") or 1
+        message = " ".join((event.get("message") or "").split())[:EVENT_MESSAGE_CHARS]
+        key = _object_key(obj.get("kind", ""), obj.get("namespace", ""), obj.get("name", ""))
+        grouped.setdefault(key, []).append((count, f"{event.get('reason', '')} x{count}: {message}"))
+    return {key: sorted(related, key=lambda pair: (-pair[0], pair[1])) for key, related in grouped.items()}
+
+def analyze(snapshot) -> list:
+    """
+    Deterministic pass over a ClusterSnapshot: failing pods, NotReady or
+    pressured nodes and Pending/Lost PVCs, each with its most frequent Warning
+    events, ranked critical first, then by restarts plus event count. The same
+    cluster state always gives the same list in the same order.
+    """
+    events = index_events(snapshot.events)
+    findings = []
+    for finding in pod_findings(snapshot.pods) + node_findings(snapshot.nodes) + pvc_findings(snapshot.pvcs):
+        related = events.get(_object_key(finding.kind, finding.namespace, finding.name), [])
+        findings.append(Finding(finding.severity, finding.kind, finding.namespace, finding.name, finding.issue,
+                                finding.detail, finding.score + sum(count for count, _ in related),
+                                tuple(text for _, text in related[:EVENTS_PER_FINDING])))
+    return sorted(findings, key=Finding.sort_key)
+
+def render_findings(findings: list, snapshot=None, limit: int = FINDINGS_LIMIT) -> str:
+    """
+    Compact numbered findings list for the agent, with a footer for findings
+    beyond limit and for kinds the snapshot could not read.
+    """
+    counts = {}
+    for finding in findings:
+        counts[finding.severity] = counts.get(finding.severity, 0) + 1
+    header = f"{len(findings)} finding(s)"
+    if counts:
+        header += " (" + ", ".join(f"{count} {severity}" for severity, count in
+                                   sorted(counts.items(), key=lambda item: SEVERITY_ORDER.get(item[0], 9))) + ")"
+    if snapshot is not None:
+        header += f" in {len(snapshot.pods)} pods, {len(snapshot.nodes)} nodes, {len(snapshot.pvcs)} PVCs"
+    lines = [header]
+    lines += [f"{index}. {finding.line()}" for index, finding in enumerate(findings[:limit], 1)]
+    if len(findings) > limit:
+        lines.append(f"... and {len(findings) - limit} more, see the saved report")
+    if snapshot is not None:
+        lines += [f"Not checked: {kind} ({error})" for kind, error in snapshot.errors.items()]
+    return "\n".join(lines)
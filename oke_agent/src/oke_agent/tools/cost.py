@@ -0,0 +1,316 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import yaml
+
+from .analysis import Finding
+
+# ========== Settings ==========
+
+COST_KINDS = ("pods", "nodes", "podmetrics", "nodemetrics")
+PRICE_TABLE_PATH = os.environ.get(
+    "OKE_PRICE_TABLE", os.path.join(os.path.dirname(__file__), "..", "config", "oke_prices.yaml"))
+SHAPE_LABEL = "node.kubernetes.io/instance-type"
+GIB = 2 ** 30
+# A workload is over-provisioned when it requests OVERPROVISION_RATIO times its
+# usage and right-sizing to usage * RIGHTSIZE_HEADROOM frees at least the minimums.
+OVERPROVISION_RATIO = 2.0
+RIGHTSIZE_HEADROOM = 1.3
+MIN_CPU_RECLAIM = 0.25
+MIN_MEMORY_RECLAIM = 256 * 2 ** 20
+# A node is idle when its pods request and use less than these shares of it.
+IDLE_REQUEST_RATIO = 0.2
+IDLE_USAGE_RATIO = 0.1
+# Share of the remaining nodes' allocatable that consolidation may fill.
+PACKING_TARGET = 0.85
+
+# ========== Quantities and Prices ==========
+
+_QUANTITY = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)([a-zA-Z]*)$")
+_SUFFIXES = {
+    "n": 1e-9, "u": 1e-6, "m": 1e-3, "": 1.0, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18,
+    "Ki": 2.0 ** 10, "Mi": 2.0 ** 20, "Gi": 2.0 ** 30, "Ti": 2.0 ** 40, "Pi": 2.0 ** 50, "Ei": 2.0 ** 60,
+}
+
+@lru_cache(maxsize=4096)
+def parse_quantity(quantity: str) -> float:
+    """
+    Kubernetes quantity as a float: "250m" -> 0.25 cores, "1Gi" -> 1073741824
+    bytes. Pods repeat the same few values, so parsing is cached.
+    """
+    match = _QUANTITY.match(str(quantity).strip())
+    if not match or match[2] not in _SUFFIXES:
+        raise ValueError(f"Invalid quantity: {quantity!r}")
+    return float(match[1]) * _SUFFIXES[match[2]]
+
+def load_price_table(path: str = PRICE_TABLE_PATH) -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+def shape_prices(prices: dict, shape: str | None) -> tuple:
+    """
+    (USD per vCPU-hour, USD per GiB-hour) for a shape, falling back to the
+    table's default shape for shapes it does not list.
+    """
+    shapes = prices["shapes"]
+    price = shapes.get(shape) or shapes[prices["default_shape"]]
+    return price["ocpu_hour"] / price.get("vcpus_per_ocpu", 2), price["gb_hour"]
+
+# ========== Columnar Load ==========
+
+@dataclass(frozen=True)
+class NodeColumns:
+    names: list
+    shapes: list
+    cpu_allocatable: np.ndarray
+    memory_allocatable: np.ndarray
+    cpu_usage: np.ndarray
+    memory_usage: np.ndarray
+    # Monthly cost of the whole node.
+    monthly_cost: np.ndarray
+    cpu_price: np.ndarray
+    memory_price: np.ndarray
+
+@dataclass(frozen=True)
+class PodColumns:
+    # (kind, namespace, name) of each workload; pods index into it.
+    workloads: list
+    workload: np.ndarray
+    # Index into NodeColumns, -1 for pods not scheduled yet.
+    node: np.ndarray
+    cpu_request: np.ndarray
+    memory_request: np.ndarray
+    cpu_limit: np.ndarray
+    memory_limit: np.ndarray
+    # NaN where metrics-server has no sample for the pod.
+    cpu_usage: np.ndarray
+    memory_usage: np.ndarray
+
+def _usage(metrics) -> dict:
+    usage = {}
+    for item in metrics:
+        meta = item["metadata"]
+        cpu = memory = 0.0
+        # Pod metrics list containers, node metrics carry usage directly.
+        for container in item.get("containers") or [item]:
+            cpu += parse_quantity(container["usage"].get("cpu", "0"))
+            memory += parse_quantity(container["usage"].get("memory", "0"))
+        usage[(meta.get("namespace", ""), meta["name"])] = cpu, memory
+    return usage
+
+def load_nodes(nodes, node_metrics, prices: dict) -> NodeColumns:
+    usage = _usage(node_metrics)
+    names, shapes, rows = [], [], []
+    for node in nodes:
+        meta, status = node["metadata"], node.get("status", {})
+        allocatable, capacity = status.get("allocatable", {}), status.get("capacity", {})
+        shape = (meta.get("labels") or {}).get(SHAPE_LABEL)
+        cpu_price, memory_price = shape_prices(prices, shape)
+        cpu_usage, memory_usage = usage.get(("", meta["name"]), (np.nan, np.nan))
+        names.append(meta["name"])
+        shapes.append(shape or prices["default_shape"])
+        rows.append((
+            parse_quantity(allocatable.get("cpu", "0")), parse_quantity(allocatable.get("memory", "0")),
+            cpu_usage, memory_usage,
+            parse_quantity(capacity.get("cpu", "0")), parse_quantity(capacity.get("memory", "0")),
+            cpu_price, memory_price,
+        ))
+    columns = np.array(rows, dtype=float).reshape(-1, 8).T
+    hours = prices.get("hours_per_month", 730)
+    return NodeColumns(
+        names, shapes, *columns[:4],
+        monthly_cost=hours * (columns[4] * columns[6] + columns[5] / GIB * columns[7]),
+        cpu_price=columns[6], memory_price=columns[7],
+    )
+
+def _workload(meta: dict) -> tuple:
+    owner = (meta.get("ownerReferences") or [{}])[0]
+    kind, name = owner.get("kind"), owner.get("name")
+    if not kind:
+        return "Pod", meta.get("namespace", ""), meta["name"]
+    template_hash = (meta.get("labels") or {}).get("pod-template-hash")
+    if kind == "ReplicaSet" and template_hash and name.endswith(f"-{template_hash}"):
+        kind, name = "Deployment", name[: -len(template_hash) - 1]
+    return kind, meta.get("namespace", ""), name
+
+def _container_resources(container: dict) -> tuple:
+    resources = container.get("resources") or {}
+    requests, limits = resources.get("requests") or {}, resources.get("limits") or {}
+    return (parse_quantity(requests.get("cpu", "0")), parse_quantity(requests.get("memory", "0")),
+            parse_quantity(limits.get("cpu", "0")), parse_quantity(limits.get("memory", "0")))
+
+def _pod_resources(spec: dict) -> tuple:
+    """
+    Effective (cpu request, memory request, cpu limit, memory limit): the sum
+    over app containers or the largest init container, whichever is higher.
+    """
+    containers, init_containers = spec.get("containers") or [], spec.get("initContainers")
+    if len(containers) == 1 and not init_containers:
+        return _container_resources(containers[0])
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for container in containers:
+        for position, value in enumerate(_container_resources(container)):
+            totals[position] += value
+    for container in init_containers or []:
+        for position, value in enumerate(_container_resources(container)):
+            totals[position] = max(totals[position], value)
+    return tuple(totals)
+
+def load_pods(pods, pod_metrics, node_names: list) -> PodColumns:
+    """
+    One row per running or pending pod: effective requests and limits,
+    metrics-server usage, its workload and node as integer indexes, so every
+    later step is a NumPy reduction instead of a Python loop.
+    """
+    usage = _usage(pod_metrics)
+    node_index = {name: index for index, name in enumerate(node_names)}
+    workload_index: dict = {}
+    rows, workloads, nodes = [], [], []
+    for pod in pods:
+        meta, spec = pod["metadata"], pod.get("spec", {})
+        if pod.get("status", {}).get("phase") in ("Succeeded", "Failed"):
+            continue
+        workload = _workload(meta)
+        workloads.append(workload_index.setdefault(workload, len(workload_index)))
+        nodes.append(node_index.get(spec.get("nodeName"), -1))
+        rows.append(_pod_resources(spec) + usage.get((meta.get("namespace", ""), meta["name"]), (np.nan, np.nan)))
+    columns = np.array(rows, dtype=float).reshape(-1, 6).T
+    return PodColumns(list(workload_index), np.array(workloads, dtype=np.intp), np.array(nodes, dtype=np.intp),
+                      *columns)
+
+# ========== Analysis ==========
+
+@dataclass(frozen=True)
+class CostReport:
+    findings: list
+    monthly_cost: float
+    rightsizing_savings: float
+    nodes_removable: int
+    nodes_removable_after_rightsizing: int
+    consolidation_savings: float
+    consolidation_savings_after_rightsizing: float
+    has_usage: bool
+
+    def summary(self) -> str:
+        lines = [
+            f"Cluster cost: ${self.monthly_cost:,.0f}/month",
+            f"Right-sizing over-provisioned workloads frees ${self.rightsizing_savings:,.0f}/month of requested capacity",
+            f"Bin-packing: {self.nodes_removable} node(s) removable now (${self.consolidation_savings:,.0f}/month), "
+            f"{self.nodes_removable_after_rightsizing} after right-sizing "
+            f"(${self.consolidation_savings_after_rightsizing:,.0f}/month)",
+        ]
+        if not self.has_usage:
+            lines.append("metrics-server usage unavailable: right-sizing and idle-node checks skipped")
+        return "\n".join(lines)
+
+def removable_nodes(nodes: NodeColumns, cpu_requested: np.ndarray, memory_requested: np.ndarray) -> np.ndarray:
+    """
+    Indexes of the nodes that can be drained, emptiest first, while the total
+    requests still fit in PACKING_TARGET of the remaining nodes' allocatable.
+    Ignores per-pod fragmentation and scheduling constraints, so it is an upper
+    bound on what the scheduler could actually pack.
+    """
+    if len(nodes.names) < 2:
+        return np.array([], dtype=np.intp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fullness = np.maximum(cpu_requested / nodes.cpu_allocatable, memory_requested / nodes.memory_allocatable)
+    order = np.argsort(np.nan_to_num(fullness, nan=np.inf), kind="stable")
+    # Capacity left after draining the first k + 1 nodes of the order.
+    cpu_left = nodes.cpu_allocatable.sum() - np.cumsum(nodes.cpu_allocatable[order])
+    memory_left = nodes.memory_allocatable.sum() - np.cumsum(nodes.memory_allocatable[order])
+    fits = ((cpu_requested.sum() <= PACKING_TARGET * cpu_left)
+            & (memory_requested.sum() <= PACKING_TARGET * memory_left))[:-1]
+    # Remaining capacity only shrinks, so the drainable nodes are a prefix of the order.
+    return order[: int(np.argmin(fits)) if not fits.all() else len(fits)]
+
+def analyze_costs(pods: PodColumns, nodes: NodeColumns, prices: dict) -> CostReport:
+    hours = prices.get("hours_per_month", 730)
+    default_cpu_price, default_memory_price = shape_prices(prices, prices["default_shape"])
+    count = len(pods.workloads)
+    scheduled = pods.node >= 0
+    cpu_price = np.where(scheduled, nodes.cpu_price[pods.node] if len(nodes.names) else 0, default_cpu_price)
+    memory_price = np.where(scheduled, nodes.memory_price[pods.node] if len(nodes.names) else 0,
+                            default_memory_price)
+
+    def per_workload(values):
+        return np.bincount(pods.workload, weights=values, minlength=count)
+
+    # Workloads are only judged when every pod has a usage sample.
+    sampled = ~np.isnan(pods.cpu_usage)
+    complete = per_workload(sampled) == per_workload(np.ones_like(pods.cpu_usage))
+    pod_count = per_workload(np.ones_like(pods.cpu_usage))
+    cpu_request, memory_request = per_workload(pods.cpu_request), per_workload(pods.memory_request)
+    cpu_usage = per_workload(np.nan_to_num(pods.cpu_usage))
+    memory_usage = per_workload(np.nan_to_num(pods.memory_usage))
+    cpu_reclaim = np.clip(cpu_request - cpu_usage * RIGHTSIZE_HEADROOM, 0, None)
+    memory_reclaim = np.clip(memory_request - memory_usage * RIGHTSIZE_HEADROOM, 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cpu_ratio = cpu_request / cpu_usage
+        memory_ratio = memory_request / memory_usage
+        over_cpu = complete & (cpu_ratio >= OVERPROVISION_RATIO) & (cpu_reclaim >= MIN_CPU_RECLAIM)
+        over_memory = complete & (memory_ratio >= OVERPROVISION_RATIO) & (memory_reclaim >= MIN_MEMORY_RECLAIM)
+        cpu_reclaim, memory_reclaim = np.where(over_cpu, cpu_reclaim, 0), np.where(over_memory, memory_reclaim, 0)
+        savings = hours * (cpu_reclaim * per_workload(cpu_price) / pod_count
+                           + memory_reclaim / GIB * per_workload(memory_price) / pod_count)
+        # Each pod keeps the share of its workload's requests that right-sizing leaves.
+        cpu_keep = np.where(cpu_request > 0, 1 - cpu_reclaim / cpu_request, 1)[pods.workload]
+        memory_keep = np.where(memory_request > 0, 1 - memory_reclaim / memory_request, 1)[pods.workload]
+
+    findings = []
+    for index in np.flatnonzero(over_cpu | over_memory):
+        kind, namespace, name = pods.workloads[index]
+        detail = [f"{int(pod_count[index])} pod(s)"]
+        if over_cpu[index]:
+            detail.append(f"cpu request {cpu_request[index]:.2f} vs usage {cpu_usage[index]:.2f} "
+                          f"({cpu_ratio[index]:.0f}x)")
+        if over_memory[index]:
+            detail.append(f"memory request {memory_request[index] / GIB:.1f}Gi vs usage "
+                          f"{memory_usage[index] / GIB:.1f}Gi ({memory_ratio[index]:.0f}x)")
+        detail.append(f"~${savings[index]:,.0f}/month")
+        findings.append(Finding("warning", kind, namespace, name, "OverProvisioned", ", ".join(detail),
+                                int(savings[index] * 100)))
+
+    def per_node(values):
+        return np.bincount(pods.node[scheduled], weights=values[scheduled], minlength=len(nodes.names))
+
+    cpu_requested, memory_requested = per_node(pods.cpu_request), per_node(pods.memory_request)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        idle = ((cpu_requested / nodes.cpu_allocatable < IDLE_REQUEST_RATIO)
+                & (memory_requested / nodes.memory_allocatable < IDLE_REQUEST_RATIO)
+                & (nodes.cpu_usage / nodes.cpu_allocatable < IDLE_USAGE_RATIO))
+    for index in np.flatnonzero(idle):
+        findings.append(Finding(
+            "warning", "Node", "", nodes.names[index], "Idle",
+            f"{nodes.shapes[index]}, requests {cpu_requested[index] / nodes.cpu_allocatable[index]:.0%} cpu / "
+            f"{memory_requested[index] / nodes.memory_allocatable[index]:.0%} memory, "
+            f"usage {nodes.cpu_usage[index] / nodes.cpu_allocatable[index]:.0%} cpu, "
+            f"~${nodes.monthly_cost[index]:,.0f}/month",
+            int(nodes.monthly_cost[index] * 100),
+        ))
+
+    removable = removable_nodes(nodes, cpu_requested, memory_requested)
+    removable_after = removable_nodes(nodes, per_node(pods.cpu_request * cpu_keep),
+                                      per_node(pods.memory_request * memory_keep))
+    return CostReport(
+        findings=sorted(findings, key=Finding.sort_key),
+        monthly_cost=float(nodes.monthly_cost.sum()),
+        rightsizing_savings=float(savings.sum()),
+        nodes_removable=len(removable),
+        nodes_removable_after_rightsizing=len(removable_after),
+        consolidation_savings=float(nodes.monthly_cost[removable].sum()),
+        consolidation_savings_after_rightsizing=float(nodes.monthly_cost[removable_after].sum()),
+        has_usage=bool(sampled.any()),
+    )
+
+def cost_report(snapshot, prices: dict | None = None) -> CostReport:
+    """
+    Loads a snapshot of COST_KINDS into columns and analyzes it. Missing
+    metrics-server data only disables the usage-based checks.
+    """
+    prices = prices or load_price_table()
+    nodes = load_nodes(snapshot.nodes, snapshot.items("nodemetrics"), prices)
+    pods = load_pods(snapshot.pods, snapshot.items("podmetrics"), nodes.names)
+    return analyze_costs(pods, nodes, prices)
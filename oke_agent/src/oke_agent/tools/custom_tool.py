@@ -73,16 +73,17 @@ class KubectlTool(BaseTool):
 '''
 from crewai.tools import BaseTool
 from typing import Type
-from pydantic import BaseModel, Field
-import subprocess
+from pydantic import BaseModel, ConfigDict, Field
 import os
 import json
 from datetime import datetime
 
-# ========== Common Helper ==========
+from .analysis import analyze, render_findings
+from .cost import COST_KINDS, cost_report, parse_quantity
+from .security import POD_KINDS, RBAC_KINDS, RbacGraph, audit, parse_who_can, render_who_can
+from .snapshot import SnapshotCache
 
-def run_kubectl_cmd(args: list) -> str:
-    return subprocess.check_output(["kubectl"] + args).decode()
+# ========== Common Helper ==========
 
 def save_output_to_file(filename: str, content: str):
     log_dir = os.path.join(os.getcwd(), "diagnostic_logs")
@@ -93,31 +94,89 @@ def save_output_to_file(filename: str, content: str):
         f.write(content)
     return path
 
+def format_events(events) -> str:
+    lines = []
+    for event in sorted(events, key=lambda event: event["metadata"].get("creationTimestamp") or ""):
+        obj = event.get("involvedObject", {})
+        lines.append(
+            f"{event['metadata'].get('creationTimestamp', '')}  {event.get('type', '')}  {event.get('reason', '')}  "
+            f"{obj.get('namespace', '')}/{obj.get('kind', '').lower()}/{obj.get('name', '')}: "
+            f"{(event.get('message') or '').strip()}"
+        )
+    return "\n".join(lines)
+
+def _top_columns(usage: dict) -> tuple:
+    # kubectl top units: millicores and MiB.
+    return (f"{parse_quantity(usage.get('cpu', '0')) * 1000:.0f}m",
+            f"{parse_quantity(usage.get('memory', '0')) / 2 ** 20:.0f}Mi")
+
+def format_pod_metrics(pod_metrics) -> str:
+    """
+    metrics.k8s.io PodMetrics as `kubectl top pods --all-namespaces` prints them.
+    """
+    lines = ["NAMESPACE  NAME  CPU(cores)  MEMORY(bytes)"]
+    for metrics in sorted(pod_metrics, key=lambda item: (item["metadata"].get("namespace", ""), item["metadata"]["name"])):
+        containers = metrics.get("containers", [])
+        cpu = sum(parse_quantity(container.get("usage", {}).get("cpu", "0")) for container in containers)
+        memory = sum(parse_quantity(container.get("usage", {}).get("memory", "0")) for container in containers)
+        cpu, memory = _top_columns({"cpu": cpu, "memory": memory})
+        lines.append(f"{metrics['metadata'].get('namespace', '')}  {metrics['metadata']['name']}  {cpu}  {memory}")
+    return "\n".join(lines)
+
+def format_node_metrics(node_metrics, nodes) -> str:
+    """
+    metrics.k8s.io NodeMetrics as `kubectl top nodes` prints them, with usage
+    as a share of each node's allocatable capacity.
+    """
+    allocatable = {node["metadata"]["name"]: node.get("status", {}).get("allocatable", {}) for node in nodes}
+    lines = ["NAME  CPU(cores)  CPU%  MEMORY(bytes)  MEMORY%"]
+    for metrics in sorted(node_metrics, key=lambda item: item["metadata"]["name"]):
+        name, usage = metrics["metadata"]["name"], metrics.get("usage", {})
+        capacity = allocatable.get(name, {})
+        shares = [
+            f"{parse_quantity(usage.get(resource, '0')) / parse_quantity(capacity[resource]):.0%}"
+            if parse_quantity(capacity.get(resource, "0")) else "<unknown>"
+            for resource in ("cpu", "memory")
+        ]
+        cpu, memory = _top_columns(usage)
+        lines.append(f"{name}  {cpu}  {shares[0]}  {memory}  {shares[1]}")
+    return "\n".join(lines)
+
+class ClusterTool(BaseTool):
+    """
+    Base for tools that read the cluster. crew.py hands every tool the same
+    run-scoped SnapshotCache, so agents reuse each other's reads; a tool built
+    on its own gets a private cache.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    cache: SnapshotCache = Field(default_factory=SnapshotCache, exclude=True)
+
 # ========== Diagnostic Tool ==========
 
 class KubectlInput(BaseModel):
     trigger: str = Field(..., description="Trigger to start full kubectl diagnostics")
 
-class KubectlTool(BaseTool):
+class KubectlTool(ClusterTool):
     name: str = "kubectl_tool"
-    description: str = "Run a full cluster diagnostic (pods, nodes, PVCs, CrashLoopBackOff)."
+    description: str = "Run a full cluster diagnostic and return ranked findings (failing pods, NotReady nodes, Pending PVCs, related events)."
     args_schema: Type[BaseModel] = KubectlInput
 
     def _run(self, trigger: str) -> str:
         try:
-            pod_info = run_kubectl_cmd(["get", "pods", "--all-namespaces", "-o", "wide"])
-            node_info = run_kubectl_cmd(["get", "nodes", "-o", "wide"])
-            pvc_info = run_kubectl_cmd(["get", "pvc", "--all-namespaces"])
-            events = run_kubectl_cmd(["get", "events", "--all-namespaces", "--sort-by=.metadata.creationTimestamp"])
-
-            report = "\n".join([
-                "=== Pods ===", pod_info,
-                "\n=== Nodes ===", node_info,
-                "\n=== PVCs ===", pvc_info,
-                "\n=== Events ===", events
+            # Pods, nodes, PVCs and events are read concurrently into one snapshot.
+            snapshot = self.cache.snapshot()
+            if not snapshot.resources:
+                return f" Failed to run diagnostic: {'; '.join(snapshot.errors.values())}"
+
+            # The agent gets ranked findings; the raw objects go to the report file only.
+            findings = render_findings(analyze(snapshot), snapshot)
+            sections = {"pods": "Pods", "nodes": "Nodes", "pvcs": "PVCs", "events": "Events"}
+            report = "\n".join([snapshot.summary(), f"\n=== Findings ===\n{findings}"] + [
+                f"\n=== {title} ===\n{json.dumps(list(snapshot.items(kind)), indent=2)}"
+                for kind, title in sections.items()
             ])
-            save_output_to_file("diagnostic_report", report)
-            return " Diagnostic report generated successfully."
+            path = save_output_to_file("diagnostic_report", report)
+            return f"{findings}\nFull report: {path}"
         except Exception as e:
             return f" Failed to run diagnostic: {e}"
 
@@ -126,7 +185,7 @@ class KubectlTool(BaseTool):
 class RemediationInput(BaseModel):
     action: str = Field(..., description="Describe the issue to remediate (e.g., restart pod xyz)")
 
-class RemediationTool(BaseTool):
+class RemediationTool(ClusterTool):
     name: str = "remediation_tool"
     description: str = "Apply safe remediation steps based on diagnostics (e.g., restart pods, drain node)."
     args_schema: Type[BaseModel] = RemediationInput
@@ -139,23 +198,24 @@ class RemediationTool(BaseTool):
 class ObservabilityInput(BaseModel):
     component: str = Field(..., description="Component to observe (pods, nodes, metrics)")
 
-class ObservabilityTool(BaseTool):
+class ObservabilityTool(ClusterTool):
     name: str = "observability_tool"
     description: str = "Fetch resource usage, events, and generate observability reports."
     args_schema: Type[BaseModel] = ObservabilityInput
 
     def _run(self, component: str) -> str:
-       
         try:
-            pod_metrics = run_kubectl_cmd(["top", "pods", "--all-namespaces"])
-            node_metrics = run_kubectl_cmd(["top", "nodes"])
-            events = run_kubectl_cmd(["get", "events", "--all-namespaces", "--sort-by=.metadata.creationTimestamp"])
+            # Metrics come from metrics.k8s.io through the shared cache instead of kubectl top.
+            snapshot = self.cache.snapshot(("podmetrics", "nodemetrics", "nodes", "events"))
+            if not snapshot.resources:
+                return f" Failed to generate observability report: {'; '.join(snapshot.errors.values())}"
+            unavailable = "".join(f"\nNot collected: {kind} ({error})" for kind, error in snapshot.errors.items())
 
             report = "\n".join([
-                "=== Pod Metrics ===", pod_metrics,
-                "\n=== Node Metrics ===", node_metrics,
-                "\n=== Events ===", events
-            ])
+                "=== Pod Metrics ===", format_pod_metrics(snapshot.items("podmetrics")),
+                "\n=== Node Metrics ===", format_node_metrics(snapshot.items("nodemetrics"), snapshot.nodes),
+                "\n=== Events ===", format_events(snapshot.events),
+            ]) + unavailable
             save_output_to_file(f"{component}_observability_report", report)
             return "📈 Observability report generated successfully."
         except Exception as e:
@@ -165,35 +225,72 @@ class ObservabilityTool(BaseTool):
 # ========== Security Audit Tool ==========
 
 class SecurityAuditInput(BaseModel):
-    scan_scope: str = Field(..., description="Scope to audit (e.g., pods, rbac)")
+    scan_scope: str = Field(..., description="Scope to audit (pods, rbac or all), or an RBAC question such as "
+                                             "'who can exec into pods in namespace prod'")
 
-class SecurityAuditTool(BaseTool):
+class SecurityAuditTool(ClusterTool):
     name: str = "security_audit_tool"
-    description: str = "Scan cluster for security risks like privileged pods and risky RBAC roles."
+    description: str = ("Scan cluster for security risks like privileged pods, hostPath mounts, added capabilities "
+                        "and wildcard RBAC, or answer 'who can <verb> <resource> in <namespace>'.")
     args_schema: Type[BaseModel] = SecurityAuditInput
 
     def _run(self, scan_scope: str) -> str:
-        return f" Security audit simulated for: {scan_scope}"  # Extend with real logic later
+        try:
+            query = parse_who_can(scan_scope)
+            scope = "rbac" if query else next((part for part in ("pods", "rbac") if part in scan_scope.lower()), "all")
+            kinds = {"pods": POD_KINDS, "rbac": RBAC_KINDS, "all": POD_KINDS + RBAC_KINDS}[scope]
+            # Pods, roles and bindings are read in bulk once; everything after is in memory.
+            snapshot = self.cache.snapshot(kinds)
+            if not snapshot.resources:
+                return f" Failed to run security audit: {'; '.join(snapshot.errors.values())}"
+            unavailable = "".join(f"\nNot checked: {kind} ({error})" for kind, error in snapshot.errors.items())
+            if query:
+                return render_who_can(RbacGraph.from_snapshot(snapshot), *query) + unavailable
+
+            findings = audit(snapshot, scope=scope)
+            report = render_findings(findings, limit=len(findings))
+            path = save_output_to_file("security_audit", f"{snapshot.summary()}\n\n{report}{unavailable}")
+            return f"{render_findings(findings)}{unavailable}\nFull report: {path}"
+        except Exception as e:
+            return f" Failed to run security audit: {e}"
 
 # ========== Cost Optimization Tool ==========
 
 class CostOptimizationInput(BaseModel):
     scope: str = Field(..., description="Scope for cost analysis (e.g., node-pools, workloads)")
 
-class CostOptimizationTool(BaseTool):
+class CostOptimizationTool(ClusterTool):
     name: str = "cost_optimization_tool"
-    description: str = "Analyze resource usage to identify cost-saving opportunities."
+    description: str = ("Compare pod requests with metrics-server usage to find over-provisioned workloads, idle "
+                        "nodes and bin-packing headroom, with estimated monthly savings in USD.")
     args_schema: Type[BaseModel] = CostOptimizationInput
 
     def _run(self, scope: str) -> str:
-        return f" Cost optimization analysis completed for: {scope}"  # Stub for real pricing logic
+        try:
+            snapshot = self.cache.snapshot(COST_KINDS)
+            if "pods" not in snapshot.resources or "nodes" not in snapshot.resources:
+                return f" Failed to run cost analysis: {'; '.join(snapshot.errors.values())}"
+            report = cost_report(snapshot)
+            findings = report.findings
+            if "workload" in scope.lower():
+                findings = [finding for finding in findings if finding.kind != "Node"]
+            elif "node" in scope.lower():
+                findings = [finding for finding in findings if finding.kind == "Node"]
+            unavailable = "".join(f"\nNot checked: {kind} ({error})" for kind, error in snapshot.errors.items())
+            path = save_output_to_file(
+                "cost_report",
+                f"{snapshot.summary()}\n\n{report.summary()}\n\n{render_findings(findings, limit=len(findings))}",
+            )
+            return f"{report.summary()}\n{render_findings(findings)}{unavailable}\nFull report: {path}"
+        except Exception as e:
+            return f" Failed to run cost analysis: {e}"
 
 # ========== Upgrade Planning Tool ==========
 
 class UpgradeInput(BaseModel):
     target_version: str = Field(..., description="Target Kubernetes version to upgrade to")
 
-class UpgradeTool(BaseTool):
+class UpgradeTool(ClusterTool):
     name: str = "upgrade_planning_tool"
     description: str = "Assess upgrade readiness and identify deprecated APIs or compatibility issues."
     args_schema: Type[BaseModel] = UpgradeInput
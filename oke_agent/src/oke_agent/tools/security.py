@@ -0,0 +1,306 @@
+import re
+
+from .analysis import Finding
+
+# ========== Rules ==========
+
+POD_KINDS = ("pods", "networkpolicies")
+RBAC_KINDS = ("roles", "clusterroles", "rolebindings", "clusterrolebindings")
+# Capabilities that amount to root on the node when added to a container.
+CRITICAL_CAPABILITIES = {"ALL", "SYS_ADMIN", "SYS_PTRACE", "SYS_MODULE", "DAC_READ_SEARCH", "NET_ADMIN", "BPF"}
+# Subjects that hold wildcard rights by design and are not reported.
+TRUSTED_SUBJECTS = {"Group:system:masters"}
+SYSTEM_PREFIX = "system:"
+# Cluster-wide grants are indexed under this namespace.
+ALL_NAMESPACES = "*"
+# Verbs people ask about that are really a create on a pod subresource.
+VERB_ALIASES = {
+    "exec": ("create", "pods/exec"),
+    "attach": ("create", "pods/attach"),
+    "port-forward": ("create", "pods/portforward"),
+    "portforward": ("create", "pods/portforward"),
+}
+# API group of common resources, for questions that name a resource without its group
+# ("deployments" rather than "deployments.apps"). Plurals and kubectl short names.
+RESOURCE_GROUPS = {
+    "deployments": "apps", "replicasets": "apps", "statefulsets": "apps", "daemonsets": "apps",
+    "controllerrevisions": "apps",
+    "jobs": "batch", "cronjobs": "batch",
+    "horizontalpodautoscalers": "autoscaling",
+    "ingresses": "networking.k8s.io", "ingressclasses": "networking.k8s.io", "networkpolicies": "networking.k8s.io",
+    "poddisruptionbudgets": "policy",
+    "roles": "rbac.authorization.k8s.io", "rolebindings": "rbac.authorization.k8s.io",
+    "clusterroles": "rbac.authorization.k8s.io", "clusterrolebindings": "rbac.authorization.k8s.io",
+    "storageclasses": "storage.k8s.io", "volumeattachments": "storage.k8s.io", "csidrivers": "storage.k8s.io",
+    "customresourcedefinitions": "apiextensions.k8s.io",
+    "mutatingwebhookconfigurations": "admissionregistration.k8s.io",
+    "validatingwebhookconfigurations": "admissionregistration.k8s.io",
+    "certificatesigningrequests": "certificates.k8s.io",
+    "leases": "coordination.k8s.io",
+    "priorityclasses": "scheduling.k8s.io",
+}
+RESOURCE_ALIASES = {
+    "po": "pods", "pod": "pods", "svc": "services", "service": "services", "cm": "configmaps",
+    "configmap": "configmaps", "secret": "secrets", "sa": "serviceaccounts", "serviceaccount": "serviceaccounts",
+    "ns": "namespaces", "namespace": "namespaces", "no": "nodes", "node": "nodes",
+    "pvc": "persistentvolumeclaims", "pv": "persistentvolumes",
+    "deploy": "deployments", "deployment": "deployments", "rs": "replicasets", "replicaset": "replicasets",
+    "sts": "statefulsets", "statefulset": "statefulsets", "ds": "daemonsets", "daemonset": "daemonsets",
+    "job": "jobs", "cj": "cronjobs", "cronjob": "cronjobs", "hpa": "horizontalpodautoscalers",
+    "ing": "ingresses", "ingress": "ingresses", "netpol": "networkpolicies", "pdb": "poddisruptionbudgets",
+    "role": "roles", "rolebinding": "rolebindings", "clusterrole": "clusterroles",
+    "clusterrolebinding": "clusterrolebindings", "sc": "storageclasses", "crd": "customresourcedefinitions",
+    "crds": "customresourcedefinitions",
+}
+WHO_CAN_QUERY = re.compile(
+    r"who\s+can\s+(?P<verb>[\w-]+)(?:\s+(?:into|to|on))?(?:\s+(?!in\b)(?P<resource>[\w./*-]+))?"
+    r"(?:\s+in\s+(?:namespace\s+)?(?P<namespace>[\w.*-]+))?",
+    re.IGNORECASE,
+)
+
+# ========== RBAC Graph ==========
+
+def subject_id(subject: dict, binding_namespace: str = "") -> str:
+    """
+    "User:alice", "Group:devs" or "ServiceAccount:ns/name"; a service account
+    without a namespace belongs to the binding's namespace.
+    """
+    if subject.get("kind") == "ServiceAccount":
+        return f"ServiceAccount:{subject.get('namespace') or binding_namespace}/{subject['name']}"
+    return f"{subject.get('kind', 'User')}:{subject['name']}"
+
+def _rule_permissions(rule: dict) -> set:
+    if rule.get("nonResourceURLs"):
+        return set()
+    return {
+        (group, resource, verb)
+        for group in rule.get("apiGroups") or [""]
+        for resource in rule.get("resources", [])
+        for verb in rule.get("verbs", [])
+    }
+
+def _is_wildcard(permission: tuple) -> bool:
+    _, resource, verb = permission
+    return verb == "*" or resource == "*"
+
+class RbacGraph:
+    """
+    Subject -> permission graph built once from Roles, ClusterRoles and their
+    bindings, indexed both ways so questions are dictionary lookups:
+
+    - permission (apiGroup, resource, verb) -> roles granting it
+    - role -> namespace (or ALL_NAMESPACES) -> bound subjects
+    - subject -> (role, namespace) it is bound to
+
+    Building is linear in rules plus binding subjects. who_can() only touches
+    the handful of roles that grant the permission, whatever the cluster size.
+    """
+
+    def __init__(self, roles=(), clusterroles=(), rolebindings=(), clusterrolebindings=()):
+        self.roles: dict = {}
+        self.by_permission: dict = {}
+        self.grants: dict = {}
+        self.by_subject: dict = {}
+        self.bindings: dict = {}
+        for role in roles:
+            self._add_role(("Role", role["metadata"].get("namespace", ""), role["metadata"]["name"]), role)
+        for role in clusterroles:
+            self._add_role(("ClusterRole", "", role["metadata"]["name"]), role)
+        for binding in rolebindings:
+            self._add_binding(binding, binding["metadata"].get("namespace", ""))
+        for binding in clusterrolebindings:
+            self._add_binding(binding, ALL_NAMESPACES)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "RbacGraph":
+        return cls(*(snapshot.items(kind) for kind in RBAC_KINDS))
+
+    def _add_role(self, key: tuple, role: dict):
+        permissions = set()
+        for rule in role.get("rules") or []:
+            permissions |= _rule_permissions(rule)
+        self.roles[key] = permissions
+        for permission in permissions:
+            self.by_permission.setdefault(permission, set()).add(key)
+
+    def _add_binding(self, binding: dict, scope: str):
+        ref, meta = binding.get("roleRef", {}), binding["metadata"]
+        namespace = meta.get("namespace", "")
+        # A RoleBinding can reference a Role in its own namespace or a ClusterRole.
+        key = (ref.get("kind"), namespace if ref.get("kind") == "Role" else "", ref.get("name"))
+        binding_key = ("ClusterRoleBinding" if scope == ALL_NAMESPACES else "RoleBinding", namespace, meta["name"])
+        subjects = {subject_id(subject, namespace) for subject in binding.get("subjects") or []}
+        self.bindings[binding_key] = (key, scope, subjects)
+        self.grants.setdefault(key, {}).setdefault(scope, set()).update(subjects)
+        for subject in subjects:
+            self.by_subject.setdefault(subject, set()).add((key, scope))
+
+    def who_can(self, verb: str, resource: str, namespace: str | None = None, group: str = "") -> dict:
+        """
+        Subjects allowed to `verb` `resource` of API `group`, mapped to the
+        (role, scope) pairs that allow it; scope is a namespace or
+        ALL_NAMESPACES for cluster-wide grants. With a namespace, only grants
+        that reach it count; ALL_NAMESPACES asks for cluster-wide rights only
+        and None for a grant anywhere. Wildcard verbs, resources, "pods/*" and
+        apiGroups are honoured.
+        """
+        resources = {resource, "*"}
+        if "/" in resource:
+            resources.add(resource.split("/", 1)[0] + "/*")
+        scopes = None if namespace is None else {namespace, ALL_NAMESPACES}
+        allowed: dict = {}
+        for permission_group in {group, "*"}:
+            for permission_resource in resources:
+                for permission_verb in {verb, "*"}:
+                    for role in self.by_permission.get((permission_group, permission_resource, permission_verb), ()):
+                        # A namespaced Role only ever grants inside its own namespace.
+                        if role[0] == "Role" and namespace not in (None, role[1], ALL_NAMESPACES):
+                            continue
+                        for scope, subjects in self.grants.get(role, {}).items():
+                            if scopes is None or scope in scopes:
+                                for subject in subjects:
+                                    allowed.setdefault(subject, set()).add((role, scope))
+        return allowed
+
+    def permissions_of(self, subject: str) -> dict:
+        """
+        Everything one subject may do, as namespace -> set of permissions.
+        """
+        permissions: dict = {}
+        for role, scope in self.by_subject.get(subject, ()):
+            permissions.setdefault(scope, set()).update(self.roles.get(role, ()))
+        return permissions
+
+    def wildcard_bindings(self) -> list:
+        """
+        (binding, role, scope, subjects, wildcard permissions) for every
+        binding that grants a wildcard rule to a non-system subject.
+        """
+        wildcards = {role: sorted(filter(_is_wildcard, permissions)) for role, permissions in self.roles.items()}
+        found = []
+        for binding_key, (role, scope, subjects) in sorted(self.bindings.items()):
+            subjects = sorted(subject for subject in subjects if subject not in TRUSTED_SUBJECTS
+                              and not subject.split(":", 1)[1].startswith(SYSTEM_PREFIX))
+            if subjects and wildcards.get(role) and not role[2].startswith(SYSTEM_PREFIX):
+                found.append((binding_key, role, scope, subjects, wildcards[role]))
+        return found
+
+# ========== Pod Security ==========
+
+def _owner(pod: dict) -> tuple:
+    owners = pod["metadata"].get("ownerReferences") or [{}]
+    return owners[0].get("kind") or "Pod", owners[0].get("name") or pod["metadata"]["name"]
+
+def _pod_issues(spec: dict) -> list:
+    issues = []
+    containers = spec.get("initContainers", []) + spec.get("containers", []) + spec.get("ephemeralContainers", [])
+    for container in containers:
+        context = container.get("securityContext") or {}
+        if context.get("privileged"):
+            issues.append(("critical", "Privileged", f"container {container['name']}"))
+        added = (context.get("capabilities") or {}).get("add") or []
+        if added:
+            severity = "critical" if CRITICAL_CAPABILITIES & set(added) else "warning"
+            issues.append((severity, "AddedCapabilities", f"container {container['name']}: {', '.join(sorted(added))}"))
+    for volume in spec.get("volumes", []):
+        if "hostPath" in volume:
+            issues.append(("critical" if volume["hostPath"].get("path") == "/" else "warning", "HostPath",
+                           f"volume {volume['name']}: {volume['hostPath'].get('path')}"))
+    for field in ("hostNetwork", "hostPID", "hostIPC"):
+        if spec.get(field):
+            issues.append(("warning", field, "shares the node's namespace"))
+    return issues
+
+def pod_security_findings(pods) -> list:
+    """
+    Privileged containers, added capabilities, hostPath volumes and host
+    namespaces, reported once per owning workload with its pod count rather
+    than once per replica.
+    """
+    grouped: dict = {}
+    for pod in pods:
+        namespace = pod["metadata"].get("namespace", "")
+        owner_kind, owner_name = _owner(pod)
+        for severity, issue, detail in _pod_issues(pod.get("spec", {})):
+            key = (severity, owner_kind, namespace, owner_name, issue, detail)
+            grouped[key] = grouped.get(key, 0) + 1
+    return [
+        Finding(severity, kind, namespace, name, issue, f"{detail}, {count} pod(s)", count)
+        for (severity, kind, namespace, name, issue, detail), count in grouped.items()
+    ]
+
+def network_policy_findings(pods, networkpolicies) -> list:
+    covered = {policy["metadata"].get("namespace", "") for policy in networkpolicies}
+    counts: dict = {}
+    for pod in pods:
+        namespace = pod["metadata"].get("namespace", "")
+        if namespace not in covered and not namespace.startswith("kube-"):
+            counts[namespace] = counts.get(namespace, 0) + 1
+    return [Finding("warning", "Namespace", "", namespace, "NoNetworkPolicy", f"{count} pod(s) unrestricted", count)
+            for namespace, count in counts.items()]
+
+def rbac_findings(graph: RbacGraph) -> list:
+    findings = []
+    for (binding_kind, namespace, name), role, scope, subjects, permissions in graph.wildcard_bindings():
+        rules = ", ".join(f"{verb} {group + '/' if group else ''}{resource}" for group, resource, verb in permissions[:3])
+        findings.append(Finding(
+            "critical" if scope == ALL_NAMESPACES else "warning", binding_kind, namespace, name, "WildcardRBAC",
+            f"{role[0]} {role[2]} grants {rules}{' ...' if len(permissions) > 3 else ''} to {', '.join(subjects[:5])}"
+            f"{f' and {len(subjects) - 5} more' if len(subjects) > 5 else ''}",
+            len(subjects),
+        ))
+    return findings
+
+def audit(snapshot, graph: RbacGraph | None = None, scope: str = "all") -> list:
+    """
+    Ranked security findings for the pod and/or RBAC parts of a snapshot
+    (scope "pods", "rbac" or "all").
+    """
+    findings = []
+    if scope in ("pods", "all"):
+        findings += pod_security_findings(snapshot.pods)
+        if "networkpolicies" in snapshot.resources:
+            findings += network_policy_findings(snapshot.pods, snapshot.items("networkpolicies"))
+    if scope in ("rbac", "all"):
+        findings += rbac_findings(graph or RbacGraph.from_snapshot(snapshot))
+    return sorted(findings, key=Finding.sort_key)
+
+def resolve_resource(resource: str) -> tuple:
+    """
+    (API group, plural resource) for a resource as typed: "deployments.apps",
+    "deploy", "cronjobs/status" or "pods/exec". Unknown resources are assumed
+    to be in the core group unless they carry a group suffix.
+    """
+    name, slash, subresource = resource.lower().partition("/")
+    name, dot, group = name.partition(".")
+    name = RESOURCE_ALIASES.get(name, name)
+    return (group if dot else RESOURCE_GROUPS.get(name, "")), name + slash + subresource
+
+def parse_who_can(text: str) -> tuple | None:
+    """
+    (verb, resource, group, namespace) from "who can exec into pods in
+    namespace prod", "who can port-forward to pods in prod" or "who can delete
+    deployments", or None if text is not such a query. namespace is None when
+    the question names none, meaning grants in any namespace.
+    """
+    match = WHO_CAN_QUERY.search(text)
+    if not match:
+        return None
+    verb, resource = match["verb"].lower(), (match["resource"] or "pods").lower()
+    if verb in VERB_ALIASES:
+        verb, resource = VERB_ALIASES[verb]
+    group, resource = resolve_resource(resource)
+    return verb, resource, group, match["namespace"]
+
+def render_who_can(graph: RbacGraph, verb: str, resource: str, group: str = "", namespace: str | None = None) -> str:
+    allowed = graph.who_can(verb, resource, namespace, group)
+    target = f"{resource}.{group}" if group else resource
+    where = {None: "in any namespace", ALL_NAMESPACES: "cluster-wide"}.get(namespace, f"in namespace {namespace}")
+    lines = [f"{len(allowed)} subject(s) can {verb} {target} {where}"]
+    for subject in sorted(allowed):
+        grants = sorted(
+            f"{kind} {name} ({'cluster-wide' if scope == ALL_NAMESPACES else f'in {scope}'})"
+            for (kind, _, name), scope in allowed[subject]
+        )
+        lines.append(f"- {subject} via {', '.join(grants)}")
+    return "\n".join(lines)
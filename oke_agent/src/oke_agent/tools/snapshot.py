@@ -0,0 +1,180 @@
+import json
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import monotonic
+from types import MappingProxyType
+from typing import Mapping
+from urllib.parse import urlencode
+
+# ========== Snapshot Queries ==========
+
+# kubectl resource type for each kind a snapshot can hold.
+RESOURCE_TYPES = {
+    "pods": "pods",
+    "nodes": "nodes",
+    "pvcs": "pvc",
+    "events": "events",
+    "networkpolicies": "networkpolicies",
+    "roles": "roles",
+    "clusterroles": "clusterroles",
+    "rolebindings": "rolebindings",
+    "clusterrolebindings": "clusterrolebindings",
+}
+CLUSTER_SCOPED = {"nodes", "clusterroles", "clusterrolebindings", "nodemetrics"}
+# Kinds served by an aggregated API rather than kubectl get <type>, read with kubectl get --raw.
+RAW_PATHS = {
+    "podmetrics": "/apis/metrics.k8s.io/v1beta1/pods",
+    "nodemetrics": "/apis/metrics.k8s.io/v1beta1/nodes",
+}
+DEFAULT_KINDS = ("pods", "nodes", "pvcs", "events")
+KUBECTL_TIMEOUT_SECONDS = 30
+MAX_WORKERS = 8
+# Seconds a cached read is reused within one crew run.
+CACHE_TTL_SECONDS = 300
+
+def kubectl_query(kind: str, namespace: str | None = None, selector: str | None = None) -> list:
+    """
+    kubectl arguments listing one kind as JSON, in one namespace or all of them.
+    """
+    if kind in RAW_PATHS:
+        group, resource = RAW_PATHS[kind].rsplit("/", 1)
+        path = f"{group}/namespaces/{namespace}/{resource}" if namespace and kind not in CLUSTER_SCOPED else RAW_PATHS[kind]
+        return ["get", "--raw", f"{path}?{urlencode({'labelSelector': selector})}" if selector else path]
+    args = ["get", RESOURCE_TYPES[kind]]
+    if kind not in CLUSTER_SCOPED:
+        args += ["-n", namespace] if namespace else ["--all-namespaces"]
+    if selector:
+        args += ["-l", selector]
+    return args + ["-o", "json"]
+
+# ========== Cluster Snapshot ==========
+
+@dataclass(frozen=True)
+class ClusterSnapshot:
+    """
+    Point-in-time view of the cluster: the items of every kind collected, the
+    kinds that could not be read (kind -> error) and how long each read took.
+    Treat the items as read-only; the same snapshot is shared by every tool.
+    """
+    taken_at: datetime
+    resources: Mapping[str, tuple] = field(default_factory=dict)
+    errors: Mapping[str, str] = field(default_factory=dict)
+    durations: Mapping[str, float] = field(default_factory=dict)
+
+    def items(self, kind: str) -> tuple:
+        return self.resources.get(kind, ())
+
+    @property
+    def pods(self) -> tuple:
+        return self.items("pods")
+
+    @property
+    def nodes(self) -> tuple:
+        return self.items("nodes")
+
+    @property
+    def pvcs(self) -> tuple:
+        return self.items("pvcs")
+
+    @property
+    def events(self) -> tuple:
+        return self.items("events")
+
+    def age_seconds(self) -> float:
+        return (datetime.now(timezone.utc) - self.taken_at).total_seconds()
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{len(items)} {kind}" for kind, items in self.resources.items())
+        failed = "".join(f"\n  {kind} unavailable: {error}" for kind, error in self.errors.items())
+        return f"Snapshot taken at {self.taken_at.isoformat(timespec='seconds')}: {counts or 'nothing collected'}{failed}"
+
+# ========== Collector ==========
+
+def run_kubectl_json(args: list, timeout: float = KUBECTL_TIMEOUT_SECONDS) -> dict:
+    result = subprocess.run(["kubectl"] + args, capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode().strip() or f"kubectl exited with {result.returncode}")
+    return json.loads(result.stdout)
+
+def read_items(kind: str, namespace: str | None = None, selector: str | None = None,
+               timeout: float = KUBECTL_TIMEOUT_SECONDS) -> tuple:
+    return tuple(run_kubectl_json(kubectl_query(kind, namespace, selector), timeout).get("items", []))
+
+def _read_kind(read, kind: str, timeout: float) -> tuple:
+    started = monotonic()
+    try:
+        return kind, read(kind, timeout=timeout), None, monotonic() - started
+    except subprocess.TimeoutExpired:
+        return kind, (), f"timed out after {timeout:g}s", monotonic() - started
+    except Exception as e:
+        return kind, (), str(e), monotonic() - started
+
+def collect_snapshot(kinds=DEFAULT_KINDS, timeout: float = KUBECTL_TIMEOUT_SECONDS,
+                     max_workers: int = MAX_WORKERS, read=read_items) -> ClusterSnapshot:
+    """
+    Reads all requested kinds concurrently, each with its own timeout, so a
+    snapshot takes as long as the slowest read instead of the sum of them.
+    A failed or timed-out kind is recorded in `errors` rather than failing the
+    whole snapshot. `read(kind, timeout=...)` returns a kind's items; pass
+    SnapshotCache.get to go through a cache.
+    """
+    taken_at = datetime.now(timezone.utc)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(kinds)) or 1) as pool:
+        results = list(pool.map(lambda kind: _read_kind(read, kind, timeout), kinds))
+    return ClusterSnapshot(
+        taken_at=taken_at,
+        resources=MappingProxyType({kind: items for kind, items, error, _ in results if error is None}),
+        errors=MappingProxyType({kind: error for kind, _, error, _ in results if error is not None}),
+        durations=MappingProxyType({kind: round(seconds, 3) for kind, _, _, seconds in results}),
+    )
+
+# ========== Run-scoped Cache ==========
+
+class SnapshotCache:
+    """
+    Cache of kubectl reads shared by every tool of one crew run, keyed by
+    (kind, namespace, selector). A read is reused for ttl_seconds; concurrent
+    reads of the same key wait for the first one instead of running kubectl
+    again. Failed reads are not cached.
+    """
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS, timeout: float = KUBECTL_TIMEOUT_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict = {}
+        self._key_locks: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, namespace: str | None = None, selector: str | None = None,
+            timeout: float | None = None) -> tuple:
+        key = (kind, namespace, selector)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            items = read_items(kind, namespace, selector, timeout or self.timeout)
+            self._entries[key] = (monotonic() + self.ttl_seconds, items)
+            return items
+
+    def snapshot(self, kinds=DEFAULT_KINDS, max_workers: int = MAX_WORKERS) -> ClusterSnapshot:
+        """
+        collect_snapshot() through the cache: kinds read earlier in the run are
+        reused, so their items can be up to ttl_seconds older than taken_at.
+        """
+        return collect_snapshot(kinds, self.timeout, max_workers, read=self.get)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from oke_agent.tools.cost import cost_report, load_pods, parse_quantity
+from oke_agent.tools.snapshot import ClusterSnapshot
+
+# 1000 hours a month, $0.01 per vCPU-hour and $0.001 per GiB-hour, so a
+# 4 vCPU / 16Gi node costs 1000 * (4 * 0.01 + 16 * 0.001) = $56 a month.
+PRICES = {
+    "hours_per_month": 1000,
+    "default_shape": "Test.Flex",
+    "shapes": {"Test.Flex": {"ocpu_hour": 0.02, "gb_hour": 0.001, "vcpus_per_ocpu": 2}},
+}
+
+
+def node(name):
+    resources = {"cpu": "4", "memory": "16Gi"}
+    return {"metadata": {"name": name, "labels": {"node.kubernetes.io/instance-type": "Test.Flex"}},
+            "status": {"allocatable": resources, "capacity": resources}}
+
+
+def pod(name, node_name, cpu="1", memory="256Mi", owner="web-abc"):
+    return {
+        "metadata": {"namespace": "prod", "name": name, "labels": {"pod-template-hash": "abc"},
+                     "ownerReferences": [{"kind": "ReplicaSet", "name": owner}]},
+        "spec": {"nodeName": node_name,
+                 "containers": [{"name": "app", "resources": {"requests": {"cpu": cpu, "memory": memory}}}]},
+        "status": {"phase": "Running"},
+    }
+
+
+def snapshot(with_metrics=True):
+    pods = [pod(f"web-abc-{index}", f"n{index % 2}") for index in range(6)]
+    resources = {"pods": tuple(pods), "nodes": tuple(node(f"n{index}") for index in range(3))}
+    if with_metrics:
+        resources["podmetrics"] = tuple(
+            {"metadata": {"namespace": "prod", "name": item["metadata"]["name"]},
+             "containers": [{"name": "app", "usage": {"cpu": "100m", "memory": "200Mi"}}]}
+            for item in pods
+        )
+        resources["nodemetrics"] = tuple(
+            {"metadata": {"name": f"n{index}"}, "usage": {"cpu": "300m" if index < 2 else "100m", "memory": "1Gi"}}
+            for index in range(3)
+        )
+    return ClusterSnapshot(datetime.now(timezone.utc), resources)
+
+
+def test_parse_quantity():
+    assert parse_quantity("250m") == pytest.approx(0.25)
+    assert parse_quantity("1Gi") == 2 ** 30
+    assert parse_quantity("1e3") == 1000
+    with pytest.raises(ValueError):
+        parse_quantity("one")
+
+
+def test_pod_requests_count_the_largest_init_container():
+    item = pod("p", "n0")
+    item["spec"]["containers"].append({"name": "sidecar", "resources": {"requests": {"cpu": "500m"}}})
+    item["spec"]["initContainers"] = [{"name": "init", "resources": {"requests": {"cpu": "2", "memory": "128Mi"}}}]
+    pods = load_pods([item, dict(pod("done", "n0"), status={"phase": "Succeeded"})], [], ["n0"])
+    assert pods.cpu_request.tolist() == [2.0]
+    assert pods.memory_request.tolist() == [256 * 2 ** 20]
+    assert pods.workloads == [("Deployment", "prod", "web")]
+
+
+def test_over_provisioned_workload_idle_node_and_bin_packing():
+    report = cost_report(snapshot(), PRICES)
+    assert report.monthly_cost == pytest.approx(3 * 56)
+    # 6 cores requested, 0.6 used: 6 - 0.6 * 1.3 cores reclaimable at $10 per core-month.
+    assert report.rightsizing_savings == pytest.approx(52.2)
+    [over, idle] = sorted(report.findings, key=lambda finding: finding.kind)
+    assert (over.kind, over.name, over.issue) == ("Deployment", "web", "OverProvisioned")
+    assert (idle.kind, idle.name, idle.issue) == ("Node", "n2", "Idle")
+    # 6 cores fit in 85% of two nodes but not one; after right-sizing 0.78 cores fit in one.
+    assert (report.nodes_removable, report.consolidation_savings) == (1, pytest.approx(56))
+    assert (report.nodes_removable_after_rightsizing,
+            report.consolidation_savings_after_rightsizing) == (2, pytest.approx(112))
+    assert "1 node(s) removable now ($56/month), 2 after right-sizing ($112/month)" in report.summary()
+
+
+def test_missing_metrics_only_disable_usage_checks():
+    report = cost_report(snapshot(with_metrics=False), PRICES)
+    assert not report.has_usage
+    assert report.findings == [] and report.rightsizing_savings == 0
+    assert report.nodes_removable == report.nodes_removable_after_rightsizing == 1
+    assert "metrics-server usage unavailable" in report.summary()
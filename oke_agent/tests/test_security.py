@@ -0,0 +1,76 @@
+from oke_agent.tools.security import ALL_NAMESPACES, RbacGraph, parse_who_can, render_who_can
+
+
+def role(name, rules, namespace=None):
+    metadata = {"name": name} if namespace is None else {"name": name, "namespace": namespace}
+    return {"metadata": metadata, "rules": rules}
+
+
+def binding(name, role_kind, role_name, subjects, namespace=None):
+    metadata = {"name": name} if namespace is None else {"name": name, "namespace": namespace}
+    return {"metadata": metadata, "roleRef": {"kind": role_kind, "name": role_name}, "subjects": subjects}
+
+
+def user(name):
+    return {"kind": "User", "name": name}
+
+
+GRAPH = RbacGraph(
+    roles=[
+        role("exec", [{"apiGroups": [""], "resources": ["pods/exec"], "verbs": ["create"]}], "prod"),
+        role("deployer", [{"apiGroups": ["apps"], "resources": ["deployments"], "verbs": ["patch", "update"]}], "prod"),
+    ],
+    clusterroles=[
+        role("admin-all", [{"apiGroups": ["*"], "resources": ["*"], "verbs": ["*"]}]),
+        role("pod-debug", [{"apiGroups": [""], "resources": ["pods/*"], "verbs": ["create"]}]),
+        role("core-deployments", [{"apiGroups": [""], "resources": ["deployments"], "verbs": ["patch"]}]),
+    ],
+    rolebindings=[
+        binding("exec", "Role", "exec", [user("alice"), {"kind": "ServiceAccount", "name": "ci"}], "prod"),
+        binding("deployer", "Role", "deployer", [user("dave")], "prod"),
+        binding("debug", "ClusterRole", "pod-debug", [user("bob")], "dev"),
+        binding("wrong-group", "ClusterRole", "core-deployments", [user("eve")], "prod"),
+    ],
+    clusterrolebindings=[binding("admins", "ClusterRole", "admin-all", [user("carol")])],
+)
+
+
+def test_parse_who_can_resolves_aliases_and_groups():
+    assert parse_who_can("who can exec into pods in namespace prod") == ("create", "pods/exec", "", "prod")
+    assert parse_who_can("Who can port-forward to pods in prod") == ("create", "pods/portforward", "", "prod")
+    assert parse_who_can("who can delete deploy") == ("delete", "deployments", "apps", None)
+    assert parse_who_can("who can get widgets.example.com in dev") == ("get", "widgets", "example.com", "dev")
+    assert parse_who_can("audit everything") is None
+
+
+def test_namespaced_question_counts_grants_that_reach_it():
+    allowed = GRAPH.who_can("create", "pods/exec", "prod")
+    assert set(allowed) == {"User:alice", "ServiceAccount:prod/ci", "User:carol"}
+    assert set(GRAPH.who_can("create", "pods/exec", "dev")) == {"User:bob", "User:carol"}
+
+
+def test_api_group_must_match():
+    allowed = GRAPH.who_can("patch", "deployments", "prod", group="apps")
+    assert set(allowed) == {"User:dave", "User:carol"}
+
+
+def test_cluster_wide_and_any_namespace_scopes():
+    assert set(GRAPH.who_can("create", "pods/exec", ALL_NAMESPACES)) == {"User:carol"}
+    assert set(GRAPH.who_can("create", "pods/exec")) == {"User:alice", "ServiceAccount:prod/ci", "User:bob", "User:carol"}
+
+
+def test_render_labels_each_grant_with_its_scope():
+    text = render_who_can(GRAPH, *parse_who_can("who can exec into pods"))
+    assert text.splitlines()[0] == "4 subject(s) can create pods/exec in any namespace"
+    assert "- User:bob via ClusterRole pod-debug (in dev)" in text
+    assert "- User:carol via ClusterRole admin-all (cluster-wide)" in text
+
+
+def test_wildcard_bindings_skip_system_subjects():
+    graph = RbacGraph(
+        clusterroles=[role("admin-all", [{"apiGroups": ["*"], "resources": ["*"], "verbs": ["*"]}])],
+        clusterrolebindings=[binding("admins", "ClusterRole", "admin-all",
+                                     [user("carol"), {"kind": "Group", "name": "system:masters"}])],
+    )
+    [(_, _, scope, subjects, _)] = graph.wildcard_bindings()
+    assert scope == ALL_NAMESPACES and subjects == ["User:carol"]